@@ -0,0 +1,33 @@
+"""
+backend/apps/alerts/apps.py
+Tunes SQLite for the database channel layer (layers.py), which has several
+processes writing small rows concurrently. Only when that layer is the one
+configured (CHANNEL_BACKEND=database): WAL and synchronous=NORMAL change the
+durability of every write to the database, not just the layer's.
+"""
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+DATABASE_LAYER = 'apps.alerts.layers.DatabaseChannelLayer'
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        # WAL lets readers and one writer work at the same time; NORMAL sync
+        # skips the fsync on every commit (still safe against app crashes,
+        # but the last commits can be lost on a power failure).
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+
+
+class AlertsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.alerts'
+
+    def ready(self):
+        if settings.CHANNEL_LAYERS.get('default', {}).get('BACKEND') == DATABASE_LAYER:
+            connection_created.connect(tune_sqlite, dispatch_uid='alerts_tune_sqlite')
@@ -1,19 +1,27 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from .notifications import alert_group
 
 class AlertConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer — pushes live alerts to connected counselors/admins.
-    Connect: ws://localhost:8000/ws/alerts/
+    Connect: ws://localhost:8000/ws/alerts/?token=<JWT access token>
     """
+    group_name = None
+
     async def connect(self):
         self.user = self.scope['user']
-        self.group_name = f"alerts_{self.user.id}"
+        if not self.user.is_authenticated:
+            # Missing, expired or invalid token (config/websocket_auth.py)
+            await self.close(code=4401)
+            return
+        self.group_name = alert_group(self.user.id)
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     async def send_alert(self, event):
         """Called by Django when a new alert is created."""
@@ -0,0 +1,321 @@
+"""
+backend/apps/alerts/layers.py
+A channel layer that works across processes without Redis.
+
+Messages and group memberships live in two tables of the project database
+(ChannelMessage, ChannelGroupMembership), so every ASGI worker on the host
+sees the same groups — an alert raised in worker A reaches a counselor
+whose WebSocket is connected to worker B.
+
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'apps.alerts.layers.DatabaseChannelLayer',
+            'CONFIG': {'expiry': 60, 'capacity': 100},
+        },
+    }
+
+Process-specific channels (the ones consumers get from new_channel) are
+delivered by one poller per process and event loop, so the polling cost
+grows with the number of workers, not with the number of open sockets.
+Every channel holds at most `capacity` unexpired messages (ChannelFull is
+raised, or the member is skipped on group_send), and messages older than
+`expiry` seconds are dropped together with the group memberships of the
+channel they were addressed to.
+"""
+
+import asyncio
+import collections
+import json
+import logging
+import random
+import string
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+
+class _Buffer:
+    """Messages claimed for one process-specific channel, and the receive() calls waiting for them."""
+
+    def __init__(self):
+        self.messages = collections.deque()   # (expires_at, message), oldest first
+        self.waiters  = collections.deque()   # futures of receive() calls, first come first served
+
+    def put(self, expires_at, message):
+        self.messages.append((expires_at, message))
+        self._wake()
+
+    async def get(self):
+        while not self.messages:
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    self._wake()   # woken, then cancelled: hand the message to the next receiver
+                raise
+        return self.messages.popleft()[1]
+
+    def expire(self, now):
+        while self.messages and self.messages[0][0] < now:
+            self.messages.popleft()
+
+    def idle(self):
+        return not self.messages and not self.waiters
+
+    def _wake(self):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+
+class DatabaseChannelLayer(BaseChannelLayer):
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None,
+                 poll_interval=0.02, max_poll_interval=0.5, batch_size=200, **kwargs):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.channel_capacity  = self.compile_capacities(self.channel_capacity)
+        self.group_expiry      = group_expiry
+        self.poll_interval     = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.batch_size        = batch_size
+        self.client_prefix     = ''.join(random.choice(string.ascii_lowercase) for _ in range(12))
+        self._last_cleanup     = 0.0
+        # Receive buffers and pollers are bound to the event loop that created them
+        self._loops = weakref.WeakKeyDictionary()
+
+    # ── Channel layer API ─────────────────────────────────────
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        assert "__asgi_channel__" not in message
+        await sync_to_async(self._send)(channel, json.dumps(message))
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+
+        if '!' not in channel:
+            return await self._receive_shared(channel)
+
+        state  = self._state()
+        buffer = state['buffers'].setdefault(channel, _Buffer())
+        self._ensure_poller(state, self.non_local_name(channel))
+        try:
+            return await buffer.get()
+        finally:
+            if buffer.idle() and state['buffers'].get(channel) is buffer:
+                del state['buffers'][channel]
+
+    async def new_channel(self, prefix="specific"):
+        return "%s.%s!%s" % (
+            prefix,
+            self.client_prefix,
+            ''.join(random.choice(string.ascii_letters) for _ in range(12)),
+        )
+
+    # ── Groups extension ──────────────────────────────────────
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        await sync_to_async(self._group_add)(group, channel)
+
+    async def group_discard(self, group, channel):
+        assert self.valid_channel_name(channel), "Invalid channel name"
+        assert self.valid_group_name(group), "Invalid group name"
+        await sync_to_async(self._group_discard)(group, channel)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Invalid group name"
+        await sync_to_async(self._group_send)(group, json.dumps(message))
+
+    # ── Flush extension ───────────────────────────────────────
+    async def flush(self):
+        from .models import ChannelGroupMembership, ChannelMessage
+
+        def _flush():
+            ChannelMessage.objects.all().delete()
+            ChannelGroupMembership.objects.all().delete()
+
+        await sync_to_async(_flush)()
+        for state in self._loops.values():
+            state['buffers'].clear()
+
+    async def close(self):
+        for state in list(self._loops.values()):
+            for task in state['pollers'].values():
+                task.cancel()
+            state['pollers'].clear()
+
+    # ── Database side (runs in a worker thread) ───────────────
+    # Called through plain sync_to_async rather than channels' database_sync_to_async:
+    # the latter closes the thread's connection around every call, which costs
+    # a reconnect per message and would close a request's connection mid-request.
+    def _send(self, channel, payload):
+        from .models import ChannelMessage
+
+        now = time.time()
+        pending = ChannelMessage.objects.filter(channel=channel, expires_at__gt=now).count()
+        if pending >= self.get_capacity(channel):
+            raise ChannelFull(channel)
+        ChannelMessage.objects.create(
+            channel=channel, prefix=self.non_local_name(channel),
+            payload=payload, expires_at=now + self.expiry,
+        )
+
+    def _group_add(self, group, channel):
+        from .models import ChannelGroupMembership
+
+        ChannelGroupMembership.objects.bulk_create(
+            [ChannelGroupMembership(group=group, channel=channel, joined_at=time.time())],
+            update_conflicts=True,
+            unique_fields=['group', 'channel'],
+            update_fields=['joined_at'],
+        )
+
+    def _group_discard(self, group, channel):
+        from .models import ChannelGroupMembership
+
+        ChannelGroupMembership.objects.filter(group=group, channel=channel).delete()
+
+    def _group_send(self, group, payload):
+        """One query for the members, one for their queue depth, one bulk insert."""
+        from .models import ChannelGroupMembership, ChannelMessage
+
+        now = time.time()
+        channels = list(
+            ChannelGroupMembership.objects
+            .filter(group=group, joined_at__gte=now - self.group_expiry)
+            .values_list('channel', flat=True)
+        )
+        if not channels:
+            return
+
+        pending = dict(
+            ChannelMessage.objects
+            .filter(channel__in=channels, expires_at__gt=now)
+            .values_list('channel')
+            .annotate(Count('id'))
+        )
+        ChannelMessage.objects.bulk_create([
+            ChannelMessage(
+                channel=channel, prefix=self.non_local_name(channel),
+                payload=payload, expires_at=now + self.expiry,
+            )
+            for channel in channels
+            # A full member is skipped, like the other channel layers do
+            if pending.get(channel, 0) < self.get_capacity(channel)
+        ])
+
+    def _claim_prefix(self, prefix):
+        """Take every waiting message for this process's channels."""
+        from .models import ChannelMessage
+
+        self._maybe_cleanup()
+        # No surrounding transaction: only this process reads its prefix, and
+        # on SQLite a read that upgrades to a write inside one transaction
+        # fails straight away with "database is locked" instead of waiting.
+        rows = list(
+            ChannelMessage.objects
+            .filter(prefix=prefix, expires_at__gt=time.time())
+            .order_by('id')
+            .values_list('id', 'channel', 'expires_at', 'payload')[:self.batch_size]
+        )
+        if rows:
+            ChannelMessage.objects.filter(id__in=[r[0] for r in rows]).delete()
+        return [(channel, expires_at, json.loads(payload)) for _, channel, expires_at, payload in rows]
+
+    def _claim_one(self, channel):
+        """Take the oldest message of a shared channel — the DELETE decides who wins a race."""
+        from .models import ChannelMessage
+
+        self._maybe_cleanup()
+        for row_id, payload in (
+            ChannelMessage.objects
+            .filter(channel=channel, expires_at__gt=time.time())
+            .order_by('id')
+            .values_list('id', 'payload')[:5]
+        ):
+            deleted, _ = ChannelMessage.objects.filter(id=row_id).delete()
+            if deleted:
+                return json.loads(payload)
+        return None
+
+    def _maybe_cleanup(self):
+        """
+        Drop expired messages, and remove their channels from all groups —
+        a channel that lets messages expire has no consumer any more.
+        Runs at most once per `expiry` seconds per process.
+        """
+        from .models import ChannelGroupMembership, ChannelMessage
+
+        now = time.time()
+        if now - self._last_cleanup < min(self.expiry, 60):
+            return
+        self._last_cleanup = now
+
+        expired = ChannelMessage.objects.filter(expires_at__lte=now)
+        dead_channels = set(expired.values_list('channel', flat=True))
+        if dead_channels:
+            ChannelGroupMembership.objects.filter(channel__in=dead_channels).delete()
+        expired.delete()
+        ChannelGroupMembership.objects.filter(joined_at__lt=now - self.group_expiry).delete()
+
+    # ── Event loop side ───────────────────────────────────────
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._loops:
+            self._loops[loop] = {'buffers': {}, 'pollers': {}}
+        return self._loops[loop]
+
+    def _ensure_poller(self, state, prefix):
+        task = state['pollers'].get(prefix)
+        if task is None or task.done():
+            state['pollers'][prefix] = asyncio.ensure_future(self._poll(state, prefix))
+
+    async def _poll(self, state, prefix):
+        delay = self.poll_interval
+        while state['buffers']:
+            try:
+                messages = await sync_to_async(self._claim_prefix)(prefix)
+            except DatabaseError as e:
+                # e.g. "database is locked" on SQLite under write bursts — reconnect and retry
+                logger.warning("Channel layer poll failed, retrying: %s", e)
+                await sync_to_async(close_old_connections)()
+                messages = []
+            now = time.time()
+            for channel, expires_at, message in messages:
+                state['buffers'].setdefault(channel, _Buffer()).put(expires_at, message)
+
+            # Buffered messages nobody is waiting for expire like they would in the table
+            for channel, buffer in list(state['buffers'].items()):
+                buffer.expire(now)
+                if buffer.idle():
+                    del state['buffers'][channel]
+
+            # Back off while idle, poll again immediately while busy
+            delay = self.poll_interval if messages else min(delay * 2, self.max_poll_interval)
+            await asyncio.sleep(0 if len(messages) == self.batch_size else delay)
+
+    async def _receive_shared(self, channel):
+        delay = self.poll_interval
+        while True:
+            message = await sync_to_async(self._claim_one)(channel)
+            if message is not None:
+                return message
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
@@ -0,0 +1,119 @@
+"""
+backend/apps/alerts/management/commands/bench_channel_layer.py
+Measures the database channel layer across processes.
+
+    python manage.py bench_channel_layer --receivers 4 --senders 4 --messages 500
+
+Every receiver process joins one group, every sender process group_sends
+--messages messages to it, so each message is delivered to every receiver.
+Reports sends/s and deliveries/s. The tables are flushed before and after.
+"""
+
+import asyncio
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+GROUP = 'bench'
+
+
+def _make_layer(capacity):
+    from django.conf import settings
+    from django.db.backends.signals import connection_created
+    from apps.alerts.apps import tune_sqlite
+    from apps.alerts.layers import DatabaseChannelLayer
+
+    # The layer is benchmarked as it runs when configured, whatever CHANNEL_BACKEND is now
+    connection_created.connect(tune_sqlite, dispatch_uid='alerts_tune_sqlite')
+    config = dict(settings.CHANNEL_LAYERS['default'].get('CONFIG', {}))
+    config['capacity'] = capacity
+    return DatabaseChannelLayer(**config)
+
+
+def _receiver(expected, capacity, ready, results):
+    import django
+    django.setup()
+    layer = _make_layer(capacity)
+
+    async def run():
+        channel = await layer.new_channel()
+        await layer.group_add(GROUP, channel)
+        ready.put(True)
+        received, first = 0, None
+        try:
+            while received < expected:
+                await asyncio.wait_for(layer.receive(channel), timeout=10)
+                first = first or time.time()
+                received += 1
+        except asyncio.TimeoutError:
+            pass
+        await layer.close()
+        return received, first, time.time()
+
+    results.put(asyncio.run(run()))
+
+
+def _sender(messages, capacity, results):
+    import django
+    django.setup()
+    layer = _make_layer(capacity)
+
+    async def run():
+        start = time.time()
+        for i in range(messages):
+            await layer.group_send(GROUP, {'type': 'send_alert', 'data': {'n': i}})
+        return start, time.time()
+
+    results.put(asyncio.run(run()))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the database channel layer with several sender and receiver processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receivers', type=int, default=4)
+        parser.add_argument('--senders',   type=int, default=4)
+        parser.add_argument('--messages',  type=int, default=500, help='Messages per sender')
+
+    def handle(self, *args, **options):
+        receivers, senders, messages = options['receivers'], options['senders'], options['messages']
+        expected = senders * messages
+        capacity = expected + 1   # measure throughput, not back-pressure
+
+        from asgiref.sync import async_to_sync
+        async_to_sync(_make_layer(capacity).flush)()
+        connections.close_all()
+
+        ctx = multiprocessing.get_context('spawn')
+        ready, received_q, sent_q = ctx.Queue(), ctx.Queue(), ctx.Queue()
+
+        procs = [ctx.Process(target=_receiver, args=(expected, capacity, ready, received_q)) for _ in range(receivers)]
+        for p in procs:
+            p.start()
+        for _ in range(receivers):
+            ready.get()
+
+        procs += [ctx.Process(target=_sender, args=(messages, capacity, sent_q)) for _ in range(senders)]
+        for p in procs[receivers:]:
+            p.start()
+
+        sent     = [sent_q.get() for _ in range(senders)]
+        received = [received_q.get() for _ in range(receivers)]
+        for p in procs:
+            p.join()
+
+        start      = min(s for s, _ in sent)
+        send_end   = max(e for _, e in sent)
+        finish     = max(e for _, _, e in received)
+        delivered  = sum(n for n, _, _ in received)
+        send_time  = send_end - start
+        total_time = finish - start
+
+        self.stdout.write(f"receivers={receivers} senders={senders} messages/sender={messages}")
+        self.stdout.write(f"  group_send : {expected} in {send_time:.2f}s → {expected / send_time:,.0f} msg/s")
+        self.stdout.write(f"  delivered  : {delivered}/{expected * receivers} in {total_time:.2f}s "
+                          f"→ {delivered / total_time:,.0f} msg/s")
+
+        async_to_sync(_make_layer(capacity).flush)()
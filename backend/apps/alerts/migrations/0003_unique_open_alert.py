@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+def close_duplicate_open_alerts(apps, schema_editor):
+    """Keep only the newest unread alert per (student, sent_to, alert_type) so the constraint can be added."""
+    Alert = apps.get_model('alerts', 'Alert')
+    duplicates = (
+        Alert.objects.filter(is_read=False)
+        .values('student_id', 'sent_to_id', 'alert_type')
+        .annotate(newest=models.Max('id'), n=models.Count('id'))
+        .filter(n__gt=1)
+    )
+    for d in duplicates:
+        Alert.objects.filter(
+            student_id=d['student_id'], sent_to_id=d['sent_to_id'],
+            alert_type=d['alert_type'], is_read=False,
+        ).exclude(id=d['newest']).update(is_read=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_alerts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_read', False)), fields=('student', 'sent_to', 'alert_type'), name='unique_open_alert'),
+        ),
+    ]
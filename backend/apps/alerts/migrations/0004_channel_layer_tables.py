@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_unique_open_alert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(max_length=100)),
+                ('prefix', models.CharField(max_length=100)),
+                ('payload', models.TextField()),
+                ('expires_at', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['prefix', 'id'], name='channelmsg_prefix'), models.Index(fields=['channel', 'id'], name='channelmsg_channel'), models.Index(fields=['expires_at'], name='channelmsg_expiry')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChannelGroupMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(max_length=100)),
+                ('channel', models.CharField(max_length=100)),
+                ('joined_at', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['channel'], name='channelgroup_channel')],
+                'unique_together': {('group', 'channel')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0004_channel_layer_tables'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['sent_to', 'is_read', 'alert_type'], name='alert_recipient_state_type'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['sent_to', '-created_at'], name='alert_unread_recent'),
+        ),
+    ]
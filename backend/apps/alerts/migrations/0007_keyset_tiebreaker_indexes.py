@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='alert',
+            name='alert_unread_recent',
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['sent_to', '-created_at', '-id'], name='alert_unread_recent'),
+        ),
+    ]
@@ -14,9 +14,48 @@ class Alert(models.Model):
     message    = models.TextField()
     is_read    = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)    # ETag of the alert list
 
     class Meta:
         ordering = ['-created_at']
+        indexes  = [
+            models.Index(fields=['sent_to', 'is_read', 'alert_type'], name='alert_recipient_state_type'),
+            # Only unread alerts, newest first — a counselor's inbox (MyAlertsView)
+            models.Index(fields=['sent_to', '-created_at', '-id'], condition=models.Q(is_read=False), name='alert_unread_recent'),
+        ]
+        constraints = [
+            # At most one unread alert of each type per student and recipient
+            models.UniqueConstraint(
+                fields=['student', 'sent_to', 'alert_type'],
+                condition=models.Q(is_read=False),
+                name='unique_open_alert',
+            ),
+        ]
 
     def __str__(self):
         return f"Alert → {self.sent_to.username} | {self.alert_type}"
+
+
+# ── Channel layer storage (see layers.py) ─────────────────
+class ChannelMessage(models.Model):
+    """A message waiting to be received on a channel of the database channel layer."""
+    channel    = models.CharField(max_length=100)
+    prefix     = models.CharField(max_length=100)   # non-local part, e.g. "specific.ab12cd!" — one poller per process
+    payload    = models.TextField()                  # JSON-encoded message dict
+    expires_at = models.FloatField()                 # unix time
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['prefix', 'id'],   name='channelmsg_prefix'),
+            models.Index(fields=['channel', 'id'],  name='channelmsg_channel'),
+            models.Index(fields=['expires_at'],     name='channelmsg_expiry'),
+        ]
+
+class ChannelGroupMembership(models.Model):
+    group     = models.CharField(max_length=100)
+    channel   = models.CharField(max_length=100)
+    joined_at = models.FloatField()                  # unix time
+
+    class Meta:
+        unique_together = ('group', 'channel')
+        indexes = [models.Index(fields=['channel'], name='channelgroup_channel')]
@@ -0,0 +1,50 @@
+"""
+backend/apps/alerts/notifications.py
+Pushes new alerts to connected counselors over WebSockets.
+AlertConsumer joins `alerts_<user id>` and relays events of type `send_alert`.
+"""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def alert_group(user_id):
+    return f"alerts_{user_id}"
+
+
+def push_new_alerts(inserted):
+    """
+    Send the unread high-risk alerts inserted as {(student_id, counselor_id):
+    created_at} to each counselor's group. Called after commit, so the rows
+    are read back with their ids — the frontend uses them to mark alerts
+    read. A row with another created_at was inserted by another process,
+    which pushes it itself.
+    """
+    from apps.alerts.models import Alert
+    from apps.alerts.views import AlertSerializer
+
+    layer = get_channel_layer()
+    if layer is None or not inserted:
+        return
+
+    alerts = (
+        Alert.objects
+        .filter(student_id__in={s for s, _ in inserted}, sent_to_id__in={c for _, c in inserted},
+                is_read=False, alert_type='high_risk')
+        .select_related('student')
+    )
+    group_send = async_to_sync(layer.group_send)
+    for alert in alerts:
+        if inserted.get((alert.student_id, alert.sent_to_id)) != alert.created_at:
+            continue
+        try:
+            group_send(alert_group(alert.sent_to_id), {
+                'type': 'send_alert',
+                'data': AlertSerializer(alert).data,
+            })
+        except Exception as e:
+            logger.warning("Alert push failed for counselor %s: %s", alert.sent_to_id, e)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.alerts.layers import DatabaseChannelLayer
+from apps.alerts.models import Alert, ChannelMessage
+from apps.alerts.notifications import alert_group, push_new_alerts
+from apps.risk.calculator import _raise_high_risk_alerts
+from apps.risk.models import RiskScore
+from apps.users.models import User
+from config.asgi import application
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class AlertSocketTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.counselor = User.objects.create(username='counselor', role='counselor')
+
+    async def connect(self, query=''):
+        """(communicator, accepted?) of a handshake on ws/alerts/ with this query string."""
+        communicator = ApplicationCommunicator(application, {
+            'type': 'websocket', 'path': '/ws/alerts/', 'query_string': query.encode(),
+            'headers': [], 'subprotocols': [],
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        reply = await communicator.receive_output(5)
+        return communicator, reply['type'] == 'websocket.accept'
+
+    async def test_access_token_subscribes_to_own_alerts(self):
+        communicator, connected = await self.connect(f"token={AccessToken.for_user(self.counselor)}")
+        self.assertTrue(connected)
+        await get_channel_layer().group_send(alert_group(self.counselor.id),
+                                             {'type': 'send_alert', 'data': {'id': 1}})
+        message = await communicator.receive_output(5)
+        self.assertEqual(json.loads(message['text']), {'id': 1})
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(5)
+
+    async def test_missing_or_invalid_token_is_refused(self):
+        for query in ('', 'token=not-a-jwt'):
+            with self.subTest(query=query):
+                _, connected = await self.connect(query)
+                self.assertFalse(connected)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class AlertPushTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.counselor = User.objects.create(username='counselor', role='counselor')
+        cls.student = User.objects.create(username='student', role='student')
+
+    def setUp(self):
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(alert_group(self.counselor.id), self.channel)
+
+    def pushed(self):
+        """Ids of the alerts pushed to the counselor so far."""
+        async def drain():
+            ids = []
+            while True:
+                try:
+                    message = await asyncio.wait_for(self.layer.receive(self.channel), 0.05)
+                except asyncio.TimeoutError:
+                    return ids
+                ids.append(message['data']['id'])
+        return async_to_sync(drain)()
+
+    def test_new_alert_pushed_once_after_commit(self):
+        risk = RiskScore.objects.create(student=self.student, score=90, category='high')
+        with self.captureOnCommitCallbacks(execute=True):
+            _raise_high_risk_alerts([risk])
+            _raise_high_risk_alerts([risk])
+        alert = Alert.objects.get(student=self.student, sent_to=self.counselor)
+        self.assertEqual(self.pushed(), [alert.id])
+
+    def test_alert_inserted_by_another_process_is_not_pushed(self):
+        # Our insert was skipped: the open alert there has another process's created_at
+        theirs = Alert.objects.create(student=self.student, sent_to=self.counselor,
+                                      alert_type='high_risk', message='theirs')
+        push_new_alerts({(self.student.id, self.counselor.id): theirs.created_at + timedelta(microseconds=1)})
+        self.assertEqual(self.pushed(), [])
+        push_new_alerts({(self.student.id, self.counselor.id): theirs.created_at})
+        self.assertEqual(self.pushed(), [theirs.id])
+
+
+class DatabaseChannelLayerTests(TestCase):
+    """DatabaseChannelLayer on the test database (SQLite here)."""
+
+    def setUp(self):
+        self.layer = DatabaseChannelLayer(expiry=1, capacity=2, poll_interval=0.01, max_poll_interval=0.05)
+
+    async def receive(self, channel, timeout=2):
+        return await asyncio.wait_for(self.layer.receive(channel), timeout)
+
+    async def test_send_and_receive(self):
+        specific = await self.layer.new_channel()
+        for channel in (specific, 'shared.channel'):
+            with self.subTest(channel=channel):
+                await self.layer.send(channel, {'type': 'test', 'n': 1})
+                await self.layer.send(channel, {'type': 'test', 'n': 2})
+                self.assertEqual([(await self.receive(channel))['n'] for _ in range(2)], [1, 2])
+
+    async def test_group_send_reaches_every_member_once(self):
+        members = [await self.layer.new_channel() for _ in range(2)]
+        outsider = await self.layer.new_channel()
+        for channel in members:
+            await self.layer.group_add('counselors', channel)
+        await self.layer.group_add('counselors', members[0])   # joining twice is one membership
+        await self.layer.group_send('counselors', {'type': 'test', 'n': 1})
+
+        for channel in members:
+            self.assertEqual((await self.receive(channel))['n'], 1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.receive(members[0], timeout=0.2)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.receive(outsider, timeout=0.2)
+
+    async def test_expired_messages_are_dropped(self):
+        waiting, idle = await self.layer.new_channel(), await self.layer.new_channel()
+        await self.layer.send('shared.channel', {'type': 'test'})
+        await self.layer.send(idle, {'type': 'test'})
+        # The poller claims the idle channel's message into its buffer while serving `waiting`
+        receiver = asyncio.ensure_future(self.layer.receive(waiting))
+        await asyncio.sleep(1.2)
+        receiver.cancel()
+        for channel in ('shared.channel', idle):
+            with self.subTest(channel=channel), self.assertRaises(asyncio.TimeoutError):
+                await self.receive(channel, timeout=0.2)
+
+    async def test_full_channel(self):
+        full, free = await self.layer.new_channel(), await self.layer.new_channel()
+        for _ in range(2):
+            await self.layer.send(full, {'type': 'test'})
+        with self.assertRaises(ChannelFull):
+            await self.layer.send(full, {'type': 'test'})
+
+        # group_send skips a full member and still delivers to the others
+        for channel in (full, free):
+            await self.layer.group_add('counselors', channel)
+        await self.layer.group_send('counselors', {'type': 'test'})
+        self.assertEqual(await ChannelMessage.objects.filter(channel=full).acount(), 2)
+        self.assertEqual(await ChannelMessage.objects.filter(channel=free).acount(), 1)
@@ -1,6 +1,8 @@
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from config.async_views import AsyncListView
+from config.conditional import ConditionalListMixin
 from .models import Alert
 from rest_framework import serializers
 
@@ -10,13 +12,24 @@ class AlertSerializer(serializers.ModelSerializer):
         model  = Alert
         fields = '__all__'
 
-class MyAlertsView(generics.ListAPIView):
+class MyAlertsView(ConditionalListMixin, generics.ListAPIView):
     """GET /api/alerts/  — counselor sees their own alerts"""
     serializer_class   = AlertSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering           = '-created_at'
+    conditional_timestamp = 'updated_at'
 
     def get_queryset(self):
-        return Alert.objects.filter(sent_to=self.request.user, is_read=False)
+        return Alert.objects.filter(sent_to=self.request.user, is_read=False).select_related('student')
+
+class AsyncMyAlertsView(AsyncListView):
+    """GET /api/async/alerts/  — MyAlertsView on the async ORM"""
+    serializer_class      = AlertSerializer
+    ordering              = '-created_at'
+    conditional_timestamp = 'updated_at'
+
+    def get_queryset(self):
+        return Alert.objects.filter(sent_to=self.request.user, is_read=False).select_related('student')
 
 class MarkReadView(APIView):
     """PATCH /api/alerts/<id>/read/"""
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancelog',
+            index=models.Index(fields=['student', 'date', 'status'], name='attendance_student_date_status'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancelog',
+            index=models.Index(fields=['student', '-date', '-id'], name='attendance_student_recent'),
+        ),
+    ]
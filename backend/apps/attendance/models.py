@@ -10,9 +10,16 @@ class AttendanceLog(models.Model):
     status     = models.CharField(max_length=10, choices=STATUS_CHOICES)
     class_name = models.CharField(max_length=50, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)    # ETag of the attendance list; a re-submitted roster updates it
 
     class Meta:
         unique_together = ('student', 'date', 'class_name')
+        indexes = [
+            # Risk features: a student's marks since a date, counted by status
+            models.Index(fields=['student', 'date', 'status'], name='attendance_student_date_status'),
+            # A student's marks, newest first (AttendanceListView)
+            models.Index(fields=['student', '-date', '-id'], name='attendance_student_recent'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} | {self.date} | {self.status}"
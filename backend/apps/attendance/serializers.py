@@ -1,4 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
+from apps.users.models import User
+from apps.risk import counters
+from apps.risk.triggers import recalculate_on_commit
 from .models import AttendanceLog
 
 class AttendanceSerializer(serializers.ModelSerializer):
@@ -6,3 +10,58 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model  = AttendanceLog
         fields = '__all__'
         read_only_fields = ['marked_by', 'created_at']
+
+class RosterEntrySerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    status  = serializers.ChoiceField(choices=AttendanceLog.STATUS_CHOICES)
+
+class AttendanceRosterSerializer(serializers.Serializer):
+    """
+    A whole class roster for one day:
+    {"date": "2026-03-01", "class_name": "CS-4A",
+     "records": [{"student": 5, "status": "present"}, ...]}
+    """
+    date       = serializers.DateField()
+    class_name = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    records    = RosterEntrySerializer(many=True, allow_empty=False)
+
+    def validate_records(self, records):
+        ids = [r['student'] for r in records]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each student may appear only once in a roster.')
+
+        # One query for the whole roster instead of one lookup per row; only students can be marked
+        found   = set(User.objects.filter(id__in=ids, role='student').values_list('id', flat=True))
+        missing = sorted(set(ids) - found)
+        if missing:
+            raise serializers.ValidationError(f'Unknown student ids: {missing}')
+        return records
+
+    def create(self, validated_data):
+        logs = [
+            AttendanceLog(
+                student_id=r['student'],
+                marked_by=validated_data['marked_by'],
+                date=validated_data['date'],
+                status=r['status'],
+                class_name=validated_data['class_name'],
+            )
+            for r in validated_data['records']
+        ]
+        student_ids = [log.student_id for log in logs]
+
+        with transaction.atomic():
+            # Single INSERT ... ON CONFLICT — re-submitting a roster updates it in place.
+            # bulk_create does not send post_save, so counters and risk are updated here instead.
+            AttendanceLog.objects.bulk_create(
+                logs,
+                update_conflicts=True,
+                unique_fields=['student', 'date', 'class_name'],
+                update_fields=['status', 'marked_by', 'updated_at'],
+            )
+            # The upsert does not say which marks it replaced, so the day is recounted
+            counters.recount(student_ids, validated_data['date'])
+            # Scored in one batch once the roster commits, with anything else this transaction touched
+            recalculate_on_commit(student_ids, trigger='roster')
+        return logs
+
@@ -1,13 +1,42 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from apps.risk import counters
+from apps.risk.triggers import recalculate_on_commit
 from .models import AttendanceLog
 
+
+# ── DailyActivity counters (registered first, so risk below reads them updated) ──
+@receiver(pre_save, sender=AttendanceLog)
+def remember_previous_mark(sender, instance, raw=False, **kwargs):
+    """Keep what an edited mark used to count for, so post_save can take it back out."""
+    instance._counted = None
+    if instance.pk and not raw:
+        instance._counted = (AttendanceLog.objects.filter(pk=instance.pk)
+                             .values_list('student_id', 'date', 'status').first())
+
+
+@receiver(post_save, sender=AttendanceLog)
+def count_mark(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_counted', None)
+    counters.update(
+        removed=[counters.attendance(*previous)] if previous else [],
+        added=[counters.attendance(instance.student_id, instance.date, instance.status)],
+    )
+
+
+@receiver(post_delete, sender=AttendanceLog)
+def uncount_mark(sender, instance, **kwargs):
+    counters.update(removed=[counters.attendance(instance.student_id, instance.date, instance.status)])
+
+
 @receiver(post_save, sender=AttendanceLog)
 def trigger_risk_calculation(sender, instance, created, **kwargs):
     """
     Automatically recalculate risk score every time attendance is saved.
-    This is what makes the system REAL-TIME.
+    This is what makes the system REAL-TIME. The score is computed once the
+    saving transaction commits, once per student however many marks it saved.
     """
     if created:
-        from apps.risk.calculator import calculate_and_save_risk
-        calculate_and_save_risk(student_id=instance.student.id)
+        recalculate_on_commit([instance.student_id], trigger='attendance')
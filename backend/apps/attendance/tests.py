@@ -0,0 +1,53 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.attendance.models import AttendanceLog
+from apps.risk.models import RiskScore
+from apps.users.models import User
+
+URL = '/api/attendance/bulk/'
+
+
+class AttendanceRosterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create(username='teacher', role='teacher')
+        cls.substitute = User.objects.create(username='substitute', role='teacher')
+        cls.students = [User.objects.create(username=f"student{i}", role='student') for i in range(3)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def roster(self, status, student_ids=None):
+        ids = student_ids if student_ids is not None else [s.id for s in self.students]
+        return {'date': '2026-03-02', 'class_name': 'CS-4A',
+                'records': [{'student': sid, 'status': status} for sid in ids]}
+
+    def submit(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(URL, data, format='json')
+
+    def test_resubmission_updates_the_day_in_place(self):
+        self.assertEqual(self.submit(self.roster('present')).status_code, 201)
+        self.client.force_authenticate(self.substitute)
+        self.assertEqual(self.submit(self.roster('absent')).status_code, 201)
+
+        logs = AttendanceLog.objects.filter(class_name='CS-4A')
+        self.assertEqual(logs.count(), len(self.students))
+        self.assertEqual(set(logs.values_list('status', 'marked_by')), {('absent', self.substitute.id)})
+
+    def test_duplicate_or_non_student_ids_are_rejected(self):
+        student = self.students[0].id
+        for ids in ([student, student], [student, self.teacher.id], [student, 999999]):
+            with self.subTest(ids=ids):
+                response = self.submit(self.roster('present', ids))
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('records', response.json())
+        self.assertFalse(AttendanceLog.objects.exists())
+        self.assertFalse(RiskScore.objects.exists())
+
+    def test_each_student_scored_once(self):
+        self.submit(self.roster('present'))
+        scored = sorted(RiskScore.objects.values_list('student_id', flat=True))
+        self.assertEqual(scored, sorted(s.id for s in self.students))
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import MarkAttendanceView, AttendanceListView
+from .views import MarkAttendanceView, BulkAttendanceView, AttendanceListView
 
 urlpatterns = [
-    path('',     MarkAttendanceView.as_view(), name='mark-attendance'),
+    path('',      MarkAttendanceView.as_view(), name='mark-attendance'),
+    path('bulk/', BulkAttendanceView.as_view(), name='bulk-attendance'),
     path('list/', AttendanceListView.as_view(), name='attendance-list'),
 ]
@@ -1,6 +1,9 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from config.async_views import AsyncListView
+from config.conditional import ConditionalListMixin
 from .models import AttendanceLog
-from .serializers import AttendanceSerializer
+from .serializers import AttendanceSerializer, AttendanceRosterSerializer
 
 class MarkAttendanceView(generics.CreateAPIView):
     """Teacher marks attendance — POST /api/attendance/"""
@@ -10,13 +13,42 @@ class MarkAttendanceView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(marked_by=self.request.user)
 
-class AttendanceListView(generics.ListAPIView):
+class BulkAttendanceView(generics.GenericAPIView):
+    """Teacher marks a whole class in one request — POST /api/attendance/bulk/"""
+    serializer_class   = AttendanceRosterSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        logs = serializer.save(marked_by=request.user)
+        return Response({
+            'date':       serializer.validated_data['date'],
+            'class_name': serializer.validated_data['class_name'],
+            'saved':      len(logs),
+        }, status=status.HTTP_201_CREATED)
+
+class AttendanceListView(ConditionalListMixin, generics.ListAPIView):
     """Get attendance records for a student — GET /api/attendance/?student_id=5"""
     serializer_class   = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering           = '-date'
+    conditional_timestamp = 'updated_at'
+
+    def get_queryset(self):
+        student_id = self.request.query_params.get('student_id')
+        if student_id:
+            return AttendanceLog.objects.filter(student_id=student_id)
+        return AttendanceLog.objects.none()
+
+class AsyncAttendanceListView(AsyncListView):
+    """GET /api/async/attendance/list/?student_id=5  — AttendanceListView on the async ORM"""
+    serializer_class      = AttendanceSerializer
+    ordering              = '-date'
+    conditional_timestamp = 'updated_at'
 
     def get_queryset(self):
         student_id = self.request.query_params.get('student_id')
         if student_id:
-            return AttendanceLog.objects.filter(student_id=student_id).order_by('-date')
+            return AttendanceLog.objects.filter(student_id=student_id)
         return AttendanceLog.objects.none()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='graderecord',
+            index=models.Index(fields=['student', 'date', 'score'], name='grade_student_date'),
+        ),
+    ]
@@ -11,6 +11,16 @@ class GradeRecord(models.Model):
     total      = models.FloatField(default=100)
     date       = models.DateField()
     entered_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='entered_grades')
+    updated_at = models.DateTimeField(auto_now=True)    # ETag of the grade list
+
+    class Meta:
+        indexes = [
+            # Risk features (average since a date); the score rides along so the
+            # average is read from the index alone
+            models.Index(fields=['student', 'date', 'score'], name='grade_student_date'),
+            # A student's grades, newest first (StudentGradesView)
+            models.Index(fields=['student', '-date', '-id'], name='grade_student_recent'),
+        ]
 
     def percentage(self):
         return round((self.score / self.total) * 100, 2)
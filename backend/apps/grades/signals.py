@@ -1,19 +1,49 @@
 """
 backend/apps/grades/signals.py
-Triggers risk recalculation when a new grade is saved.
+Keeps the DailyActivity counters in step with grades, and triggers risk
+recalculation when a new grade is saved.
 """
 
-from django.db.models.signals import post_save
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+
+from apps.risk import counters
+from apps.risk.triggers import recalculate_on_commit
 from .models import GradeRecord
 
+logger = logging.getLogger(__name__)
+
+
+# ── DailyActivity counters (registered first, so risk below reads them updated) ──
+@receiver(pre_save, sender=GradeRecord)
+def remember_previous_grade(sender, instance, raw=False, **kwargs):
+    """Keep what an edited grade used to count for, so post_save can take it back out."""
+    instance._counted = None
+    if instance.pk and not raw:
+        instance._counted = (GradeRecord.objects.filter(pk=instance.pk)
+                             .values_list('student_id', 'date', 'score').first())
+
+
+@receiver(post_save, sender=GradeRecord)
+def count_grade(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_counted', None)
+    counters.update(
+        removed=[counters.grade(*previous)] if previous else [],
+        added=[counters.grade(instance.student_id, instance.date, instance.score)],
+    )
+
+
+@receiver(post_delete, sender=GradeRecord)
+def uncount_grade(sender, instance, **kwargs):
+    counters.update(removed=[counters.grade(instance.student_id, instance.date, instance.score)])
+
 
 @receiver(post_save, sender=GradeRecord)
 def trigger_risk_on_grade(sender, instance, created, **kwargs):
     if created:
-        print(f"📡 Grade signal triggered for student {instance.student_id}")
-        try:
-            from apps.risk.calculator import calculate_and_save_risk
-            calculate_and_save_risk(student_id=instance.student.id)
-        except Exception as e:
-            print(f"❌ Risk calculation failed: {e}")
+        logger.debug("Grade signal triggered for student %s", instance.student_id)
+        recalculate_on_commit([instance.student_id], trigger='grade')
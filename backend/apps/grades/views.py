@@ -1,4 +1,6 @@
 from rest_framework import generics, permissions
+from config.async_views import AsyncListView
+from config.conditional import ConditionalListMixin
 from .models import GradeRecord
 from .serializers import GradeSerializer
 
@@ -9,10 +11,22 @@ class AddGradeView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(entered_by=self.request.user)
 
-class StudentGradesView(generics.ListAPIView):
+class StudentGradesView(ConditionalListMixin, generics.ListAPIView):
     serializer_class   = GradeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering           = '-date'
+    conditional_timestamp = 'updated_at'
 
     def get_queryset(self):
         student_id = self.request.query_params.get('student_id')
-        return GradeRecord.objects.filter(student_id=student_id).order_by('-date')
+        return GradeRecord.objects.filter(student_id=student_id)
+
+class AsyncStudentGradesView(AsyncListView):
+    """GET /api/async/grades/list/?student_id=5  — StudentGradesView on the async ORM"""
+    serializer_class      = GradeSerializer
+    ordering              = '-date'
+    conditional_timestamp = 'updated_at'
+
+    def get_queryset(self):
+        student_id = self.request.query_params.get('student_id')
+        return GradeRecord.objects.filter(student_id=student_id)
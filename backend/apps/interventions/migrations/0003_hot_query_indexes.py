@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interventions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='intervention',
+            index=models.Index(fields=['student', '-created_at'], name='intervention_student_recent'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interventions', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='intervention',
+            name='intervention_student_recent',
+        ),
+        migrations.AddIndex(
+            model_name='intervention',
+            index=models.Index(fields=['student', '-created_at', '-id'], name='intervention_student_recent'),
+        ),
+    ]
@@ -18,6 +18,12 @@ class Intervention(models.Model):
     status      = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
     scheduled   = models.DateField(null=True, blank=True)
     created_at  = models.DateTimeField(auto_now_add=True)
+    updated_at  = models.DateTimeField(auto_now=True)   # ETag of the intervention list
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-created_at', '-id'], name='intervention_student_recent'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} | {self.action_type} | {self.status}"
@@ -1,19 +1,34 @@
 """
 backend/apps/interventions/signals.py
-Triggers risk recalculation when a new intervention/incident is recorded.
+Triggers risk recalculation when a new intervention/incident is recorded,
+and invalidates the student's cached risk features when its count changes.
 """
 
-from django.db.models.signals import post_save
+import logging
+
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+
+from apps.risk import cache as risk_cache
+from apps.risk.triggers import recalculate_on_commit
 from .models import Intervention
 
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Intervention)
+def incident_count_changed(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        risk_cache.features_changed([instance.student_id])
+
+
+@receiver(post_delete, sender=Intervention)
+def incident_removed(sender, instance, **kwargs):
+    risk_cache.features_changed([instance.student_id])
+
 
 @receiver(post_save, sender=Intervention)
 def trigger_risk_on_incident(sender, instance, created, **kwargs):
     if created:
-        print(f"📡 Incident signal triggered for student {instance.student_id}")
-        try:
-            from apps.risk.calculator import calculate_and_save_risk
-            calculate_and_save_risk(student_id=instance.student.id)
-        except Exception as e:
-            print(f"❌ Risk calculation failed: {e}")
+        logger.debug("Incident signal triggered for student %s", instance.student_id)
+        recalculate_on_commit([instance.student_id], trigger='intervention')
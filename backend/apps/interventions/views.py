@@ -1,5 +1,7 @@
 from rest_framework import generics, permissions
 from rest_framework import serializers
+from config.async_views import AsyncListView
+from config.conditional import ConditionalListMixin
 from .models import Intervention
 
 class InterventionSerializer(serializers.ModelSerializer):
@@ -17,10 +19,22 @@ class CreateInterventionView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(counselor=self.request.user)
 
-class InterventionListView(generics.ListAPIView):
+class InterventionListView(ConditionalListMixin, generics.ListAPIView):
     serializer_class   = InterventionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering           = '-created_at'
+    conditional_timestamp = 'updated_at'
 
     def get_queryset(self):
         student_id = self.request.query_params.get('student_id')
-        return Intervention.objects.filter(student_id=student_id).order_by('-created_at')
+        return Intervention.objects.filter(student_id=student_id).select_related('student', 'counselor')
+
+class AsyncInterventionListView(AsyncListView):
+    """GET /api/async/interventions/list/?student_id=5  — InterventionListView on the async ORM"""
+    serializer_class      = InterventionSerializer
+    ordering              = '-created_at'
+    conditional_timestamp = 'updated_at'
+
+    def get_queryset(self):
+        student_id = self.request.query_params.get('student_id')
+        return Intervention.objects.filter(student_id=student_id).select_related('student', 'counselor')
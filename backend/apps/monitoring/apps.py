@@ -0,0 +1,18 @@
+"""
+backend/apps/monitoring/apps.py
+Performance tooling — request metrics (/api/metrics/), query budgets and
+other checks run from manage.py.
+"""
+
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.monitoring'
+
+    def ready(self):
+        from apps.monitoring.metrics import install_query_counter
+        from apps.monitoring.middleware import instrument_serializers
+        install_query_counter()
+        instrument_serializers()
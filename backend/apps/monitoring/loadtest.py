@@ -0,0 +1,285 @@
+"""
+backend/apps/monitoring/loadtest.py
+In-process load generator for the ASGI application (HTTP and WebSockets).
+
+The project's real ASGI app (config.asgi.application) is driven with
+asgiref's ApplicationCommunicator — no server, no sockets, so the numbers
+measure Django, DRF, the ORM and the channel layer and nothing else.
+
+Virtual users run in a closed loop on one event loop, each picking a
+scenario from the traffic mix:
+
+    attendance   teacher   POST /api/attendance/          one mark
+    roster       teacher   POST /api/attendance/bulk/     a class of 30
+    alerts       counselor GET  /api/alerts/
+    high_risk    counselor GET  /api/risk/high/
+    dashboard    student   GET  risk, attendance, grades and interventions of their own
+
+With async_reads the GETs go to the async twins under /api/async/
+(config/async_views.py) and are reported under the sync endpoint's name,
+so a sync and an async run compare line by line.
+
+Meanwhile any number of counselor WebSockets stay connected to ws/alerts/
+and count the alerts pushed to them. Every HTTP request records its latency
+and the number of SQL queries it ran, counted with metrics.counting_queries().
+
+Used by `python manage.py loadtest`.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+from django.utils import timezone
+
+from apps.monitoring import metrics
+
+DEFAULT_MIX = {'attendance': 15, 'roster': 5, 'alerts': 30, 'high_risk': 20, 'dashboard': 30}
+ROSTER_SIZE = 30
+
+
+# ── Query counting ────────────────────────────────────────
+def counting(application):
+    """
+    ASGI wrapper that counts the queries of each call into scope['query_count'].
+    ApplicationCommunicator starts the app in an empty context, so the
+    counter travels in the scope and is bound to the context here.
+    """
+    async def app(scope, receive, send):
+        with metrics.counting_queries(scope['query_count']):
+            return await application(scope, receive, send)
+    return app
+
+
+# ── One request ───────────────────────────────────────────
+def _scope(kind, path, headers, **extra):
+    path, _, query = path.partition('?')
+    return {
+        'type':         kind,
+        'asgi':         {'version': '3.0'},
+        'http_version': '1.1',
+        'scheme':       'ws' if kind == 'websocket' else 'http',
+        'path':         path,
+        'raw_path':     path.encode(),
+        'query_string': query.encode(),
+        'root_path':    '',
+        'headers':      [(b'host', b'localhost')] + headers,
+        'client':       ('127.0.0.1', 50000),
+        'server':       ('localhost', 80),
+        **extra,
+    }
+
+
+async def http_request(application, method, path, token, body=None, timeout=60):
+    """One request through the ASGI app → (status, seconds, queries)."""
+    from asgiref.testing import ApplicationCommunicator
+
+    headers = [(b'authorization', f'Bearer {token}'.encode())]
+    payload = b''
+    if body is not None:
+        payload = json.dumps(body).encode()
+        headers += [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())]
+
+    counter = metrics.QueryCounter()
+    started = time.perf_counter()
+    comm = ApplicationCommunicator(application, _scope('http', path, headers, method=method, query_count=counter))
+    await comm.send_input({'type': 'http.request', 'body': payload, 'more_body': False})
+    start = await comm.receive_output(timeout)
+    while True:
+        message = await comm.receive_output(timeout)
+        if not message.get('more_body'):
+            break
+    elapsed = time.perf_counter() - started
+    await comm.wait(timeout)
+    return start['status'], elapsed, counter.queries
+
+
+# ── Traffic ───────────────────────────────────────────────
+class Population:
+    """Ids and access tokens of the users the virtual users act as."""
+
+    def __init__(self, teachers, counselors, students):
+        from rest_framework_simplejwt.tokens import AccessToken
+        self.tokens     = {u.pk: str(AccessToken.for_user(u)) for u in [*teachers, *counselors, *students]}
+        self.teachers   = [u.pk for u in teachers]
+        self.counselors = [u.pk for u in counselors]
+        self.students   = [u.pk for u in students]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)   # endpoint → [(status, seconds, queries)]
+
+    def add(self, endpoint, status, seconds, queries):
+        self.samples[endpoint].append((status, seconds, queries))
+
+
+_marks = iter(range(10 ** 9))
+
+
+def scenario_requests(name, people, rng):
+    """[(method, path, user id, body)] one virtual user sends for a scenario."""
+    today = timezone.localdate().isoformat()
+    if name == 'attendance':
+        student = rng.choice(people.students)
+        # A class name of its own per mark — (student, date, class) is unique
+        body = {'student': student, 'date': today, 'status': rng.choice(['present', 'absent', 'late']),
+                'class_name': f"lt-{next(_marks)}"}
+        return [('POST', '/api/attendance/', rng.choice(people.teachers), body)]
+    if name == 'roster':
+        students = rng.sample(people.students, min(ROSTER_SIZE, len(people.students)))
+        body = {'date': today, 'class_name': f"LT-{rng.randrange(20)}",
+                'records': [{'student': s, 'status': rng.choice(['present', 'present', 'present', 'absent'])}
+                            for s in students]}
+        return [('POST', '/api/attendance/bulk/', rng.choice(people.teachers), body)]
+    if name == 'alerts':
+        return [('GET', '/api/alerts/', rng.choice(people.counselors), None)]
+    if name == 'high_risk':
+        return [('GET', '/api/risk/high/', rng.choice(people.counselors), None)]
+    if name == 'dashboard':
+        student = rng.choice(people.students)
+        return [('GET', f"{path}?student_id={student}", student, None) for path in (
+            '/api/risk/', '/api/attendance/list/', '/api/grades/list/', '/api/interventions/list/',
+        )]
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def async_twin(path):
+    """'/api/risk/high/' → '/api/async/risk/high/'"""
+    return '/api/async/' + path.removeprefix('/api/')
+
+
+async def virtual_user(application, people, mix, deadline, recorder, seed, think, async_reads=False):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        for method, path, user, body in scenario_requests(rng.choices(names, weights)[0], people, rng):
+            sent = async_twin(path) if async_reads and method == 'GET' else path
+            status, seconds, queries = await http_request(application, method, sent, people.tokens[user], body)
+            recorder.add(f"{method} {path.partition('?')[0]}", status, seconds, queries)
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+# ── WebSockets ────────────────────────────────────────────
+class Socket:
+    def __init__(self, application, token):
+        from asgiref.testing import ApplicationCommunicator
+        # ws/alerts/ authenticates with the JWT in the query string (config/websocket_auth.py)
+        self.comm      = ApplicationCommunicator(application, _scope(
+            'websocket', f'/ws/alerts/?token={token}', [], subprotocols=[], query_count=metrics.QueryCounter()))
+        self.connected = False
+        self.delays    = []     # seconds from alert creation to delivery
+        self._reader   = None
+
+    async def connect(self, timeout):
+        started = time.perf_counter()
+        await self.comm.send_input({'type': 'websocket.connect'})
+        reply = await self.comm.receive_output(timeout)
+        self.connected = reply['type'] == 'websocket.accept'
+        if self.connected:
+            self._reader = asyncio.create_task(self._read())
+        return time.perf_counter() - started
+
+    async def _read(self):
+        while True:
+            message = await self.comm.output_queue.get()
+            if message['type'] != 'websocket.send':
+                return
+            created = json.loads(message['text']).get('created_at')
+            if created:
+                self.delays.append((timezone.now() - datetime.fromisoformat(created.replace('Z', '+00:00'))).total_seconds())
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        await self.comm.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        try:
+            await self.comm.wait(5)
+        except Exception:
+            pass
+
+
+async def open_sockets(application, tokens, count, timeout=30, batch=100):
+    """Connect `count` sockets, spread over the tokens; returns (sockets, connect seconds)."""
+    sockets, times = [], []
+    for start in range(0, count, batch):
+        group = [Socket(application, tokens[i % len(tokens)]) for i in range(start, min(count, start + batch))]
+        times += await asyncio.gather(*(s.connect(timeout) for s in group))
+        sockets += group
+    return sockets, times
+
+
+# ── Run and summarize ─────────────────────────────────────
+def percentiles(values):
+    if not values:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1e3, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2), 'p99_ms': round(float(p99), 2)}
+
+
+def summarize(samples, elapsed):
+    statuses = [s for s, _, _ in samples]
+    seconds  = [t for _, t, _ in samples]
+    queries  = [q for _, _, q in samples]
+    counts   = defaultdict(int)
+    for status in statuses:
+        counts[str(status)] += 1
+    return {
+        'requests':            len(samples),
+        'errors':              sum(1 for s in statuses if s >= 400),
+        'rps':                 round(len(samples) / elapsed, 1),
+        **percentiles(seconds),
+        'mean_ms':             round(float(np.mean(seconds)) * 1e3, 2),
+        'max_ms':              round(max(seconds) * 1e3, 2),
+        'queries_per_request': round(float(np.mean(queries)), 2),
+        'max_queries':         max(queries),
+        'status':              dict(counts),
+    }
+
+
+async def sample_threads(deadline, peak, interval=0.05):
+    """Record the most threads alive at once — sync views and ORM calls each run on one."""
+    while time.perf_counter() < deadline:
+        peak[0] = max(peak[0], threading.active_count())
+        await asyncio.sleep(interval)
+
+
+async def run(application, people, mix, duration, users, websockets, think=0.0, seed=0, async_reads=False):
+    """Run the whole test and return the results dict (endpoints, totals, websockets)."""
+    tokens = [people.tokens[pk] for pk in people.counselors]
+    sockets, connect_times = await open_sockets(application, tokens, websockets) if websockets else ([], [])
+
+    recorder = Recorder()
+    started  = time.perf_counter()
+    deadline = started + duration
+    threads  = [threading.active_count()]
+    await asyncio.gather(sample_threads(deadline, threads), *(
+        virtual_user(application, people, mix, deadline, recorder, seed * 100_000 + i, think, async_reads)
+        for i in range(users)
+    ))
+    elapsed = time.perf_counter() - started
+
+    await asyncio.sleep(1)   # let alerts raised by the last requests arrive
+    await asyncio.gather(*(s.close() for s in sockets))
+
+    every = [sample for samples in recorder.samples.values() for sample in samples]
+    delays = [d for s in sockets for d in s.delays]
+    return {
+        'duration_s': round(elapsed, 2),
+        'threads_max': threads[0],
+        'totals':     summarize(every, elapsed) if every else {},
+        'endpoints':  {endpoint: summarize(samples, elapsed) for endpoint, samples in sorted(recorder.samples.items())},
+        'websockets': {
+            'requested':  websockets,
+            'connected':  sum(s.connected for s in sockets),
+            **{f"connect_{k}": v for k, v in percentiles(connect_times).items()},
+            'alerts_received': len(delays),
+            **{f"delivery_{k}": v for k, v in percentiles(delays).items()},
+        },
+    }
@@ -0,0 +1,47 @@
+"""
+backend/apps/monitoring/management/commands/check_query_budget.py
+Fails if any /api/ GET endpoint runs more queries when it returns more rows.
+
+    python manage.py check_query_budget
+    python manage.py check_query_budget --small 5 --large 100
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.monitoring.query_budget import check_query_budget
+
+
+class Command(BaseCommand):
+    help = 'Check that every API list endpoint runs a constant number of queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=3, help='Rows seeded for the first run')
+        parser.add_argument('--large', type=int, default=30, help='Rows seeded for the second run')
+
+    def handle(self, *args, **options):
+        small, large = options['small'], options['large']
+
+        # Seed into a throwaway test database — never the real one
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = check_query_budget(small, large)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"  {'endpoint':<32} {'view':<26} {small:>6} rows {large:>6} rows")
+        failures = []
+        for route, name, (status_s, queries_s), (status_l, queries_l) in results:
+            ok = queries_s == queries_l and status_s == status_l == 200
+            line = f"  {route:<32} {name:<26} {queries_s:>6} q    {queries_l:>6} q"
+            if ok:
+                self.stdout.write(line)
+            else:
+                failures.append(route)
+                reason = 'query count grows' if queries_s != queries_l else f"HTTP {status_s}/{status_l}"
+                self.stdout.write(self.style.ERROR(f"{line}   ✗ {reason}"))
+
+        if failures:
+            raise CommandError(f"Query count depends on row count (or request failed) for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(results)} endpoints within a constant query budget"))
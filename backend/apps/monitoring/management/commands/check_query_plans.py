@@ -0,0 +1,50 @@
+"""
+backend/apps/monitoring/management/commands/check_query_plans.py
+Fails if any hot query is answered by a sequential scan instead of an index.
+
+    python manage.py check_query_plans
+    python manage.py check_query_plans --students 20000 --show-plans
+
+Runs against a throwaway test database seeded like the test suite's
+(query_plans.seed), on whichever backend is configured. The same checks run
+in `manage.py test` (apps/monitoring/tests.py); this prints the plans.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.monitoring.query_plans import explain_hot_queries, seed
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every hot query on a seeded database and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000, help='Students seeded before explaining')
+        parser.add_argument('--show-plans', action='store_true', help='Print every plan, not only failing ones')
+
+    def handle(self, *args, **options):
+        # Seed into a throwaway test database — never the real one
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seed(options['students'])
+            results = explain_hot_queries()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"  {connection.vendor}, {options['students']} students seeded\n")
+        failures = []
+        for name, plan, scans, sorts in results:
+            note = f"   ({sorts} sort{'s' if sorts != 1 else ''} outside an index)" if sorts else ''
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"  ✗ {name:<34} sequential scan of {', '.join(scans)}{note}"))
+            else:
+                self.stdout.write(f"  ✓ {name:<34} indexed{note}")
+            if scans or options['show_plans']:
+                self.stdout.write('      ' + plan.replace('\n', '\n      '))
+
+        if failures:
+            raise CommandError(f"Sequential scans in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(results)} hot queries use indexes"))
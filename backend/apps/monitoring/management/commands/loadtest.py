@@ -0,0 +1,159 @@
+"""
+backend/apps/monitoring/management/commands/loadtest.py
+Load-test the ASGI app in-process and save the results as JSON.
+
+    python manage.py loadtest                                   # seeded throwaway DB, default mix
+    python manage.py loadtest --duration 60 --users 100 --websockets 5000
+    python manage.py loadtest --mix alerts=50,high_risk=50      # counselors only
+    python manage.py loadtest --compare loadtest_results/<earlier run>.json
+    python manage.py loadtest --existing                        # against the configured database
+    python manage.py loadtest --async-reads --compare <sync run>.json   # async read views vs sync
+
+By default a throwaway test database is created and filled with
+`seed_load --score`, so runs are comparable across commits. Results go to
+loadtest_results/<time>-<commit>.json: per endpoint requests/s, p50/p95/p99
+latency and SQL queries per request, plus WebSocket connect and alert
+delivery latency.
+"""
+
+import asyncio
+import io
+import json
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.monitoring.loadtest import DEFAULT_MIX, Population, counting, run
+
+
+def parse_mix(text):
+    """'alerts=30,high_risk=20' → {'alerts': 30, 'high_risk': 20}"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        name, sep, weight = part.partition('=')
+        if not sep or name.strip() not in DEFAULT_MIX:
+            raise CommandError(f"--mix expects name=weight with names from {', '.join(DEFAULT_MIX)} — got {part!r}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = 'Drive the ASGI app with a realistic HTTP + WebSocket mix and report latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=30, help='Seconds of HTTP traffic')
+        parser.add_argument('--users', type=int, default=50, help='Concurrent virtual users')
+        parser.add_argument('--websockets', type=int, default=1000, help='Counselor WebSockets held open on ws/alerts/')
+        parser.add_argument('--mix', help=f"Scenario weights (default: {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})")
+        parser.add_argument('--think-ms', type=float, default=0, help='Mean pause between scenarios of a user')
+        parser.add_argument('--students', type=int, default=2000, help='Students seeded into the throwaway database')
+        parser.add_argument('--existing', action='store_true', help='Use the configured database as it is (no seeding)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Result file (default: loadtest_results/<time>-<commit>.json)')
+        parser.add_argument('--compare', metavar='JSON', help='Earlier result file to show the difference against')
+        parser.add_argument('--async-reads', action='store_true',
+                            help='Send the GETs to their async twins under /api/async/')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        if options['existing']:
+            result = self._run(options, mix)
+        else:
+            old_name = connection.settings_dict['NAME']
+            if connection.vendor == 'sqlite':
+                # A file, not the in-memory default — WAL and fsync behave as in production
+                connection.settings_dict['TEST']['NAME'] = str(settings.BASE_DIR / 'loadtest.sqlite3')
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                self.stdout.write(f"Seeding {options['students']} students...")
+                call_command('seed_load', students=options['students'], teachers=20, counselors=5,
+                             prefix='lt', score=True, stdout=io.StringIO())
+                result = self._run(options, mix)
+            finally:
+                connection.close()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        commit = git_commit()
+        result['meta'] = {
+            'commit':     commit,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'database':   connection.vendor,
+            'channel_backend': getattr(settings, 'CHANNEL_BACKEND', ''),
+            'mix':        mix,
+            **{k: options[k] for k in ('duration', 'users', 'websockets', 'think_ms', 'students', 'existing', 'seed',
+                                        'async_reads')},
+        }
+
+        output = Path(options['output'] or settings.BASE_DIR / 'loadtest_results' / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2))
+
+        self._report(result, baseline)
+        self.stdout.write(self.style.SUCCESS(f"✅ Results saved to {output}"))
+
+    def _run(self, options, mix):
+        from config.asgi import application
+        from apps.users.models import User
+
+        people = Population(
+            teachers=list(User.objects.filter(role='teacher')[:200]),
+            counselors=list(User.objects.filter(role='counselor')[:50]),
+            students=list(User.objects.filter(role='student').order_by('?')[:2000]),
+        )
+        if not (people.teachers and people.counselors and people.students):
+            raise CommandError('Need at least one teacher, counselor and student — run seed_load first')
+
+        self.stdout.write(f"Running {options['users']} users for {options['duration']:g}s "
+                          f"with {options['websockets']} WebSockets open...")
+        return asyncio.run(run(
+            counting(application), people, mix, options['duration'], options['users'],
+            options['websockets'], think=options['think_ms'] / 1000, seed=options['seed'],
+            async_reads=options['async_reads'],
+        ))
+
+    def _report(self, result, baseline):
+        old = (baseline or {}).get('endpoints', {})
+        self.stdout.write(f"\n  {'endpoint':<34} {'reqs':>7} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} "
+                          f"{'p99 ms':>8} {'queries':>8} {'errors':>7}")
+        rows = list(result['endpoints'].items()) + [('total', result['totals'])]
+        for endpoint, s in rows:
+            if not s:
+                continue
+            line = (f"  {endpoint:<34} {s['requests']:>7} {s['rps']:>7.1f} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} "
+                    f"{s['p99_ms']:>8.1f} {s['queries_per_request']:>8.1f} {s['errors']:>7}")
+            before = (baseline or {}).get('totals') if endpoint == 'total' else old.get(endpoint)
+            if before:
+                line += f"   p95 {s['p95_ms'] - before['p95_ms']:+.1f} ms, rps {s['rps'] - before['rps']:+.1f}"
+            self.stdout.write(line if not s['errors'] else self.style.WARNING(line))
+
+        self.stdout.write(f"\n  reads served by {'async' if result['meta']['async_reads'] else 'sync'} views, "
+                          f"at most {result['threads_max']} threads alive")
+        ws = result['websockets']
+        if ws['requested']:
+            self.stdout.write(
+                f"\n  ws/alerts/  {ws['connected']}/{ws['requested']} connected  "
+                f"connect p50/p95/p99 {ws['connect_p50_ms']}/{ws['connect_p95_ms']}/{ws['connect_p99_ms']} ms  "
+                f"{ws['alerts_received']} alerts received, delivery p95 {ws['delivery_p95_ms']} ms"
+            )
+        if baseline:
+            self.stdout.write(f"\n  (differences against commit {baseline.get('meta', {}).get('commit', '?')})")
@@ -0,0 +1,185 @@
+"""
+backend/apps/monitoring/management/commands/seed_load.py
+Fill the database with synthetic students and their raw histories for load testing.
+
+    python manage.py seed_load --students 100000                  # ~2M attendance rows
+    python manage.py seed_load --students 1000000 --chunk-size 20000
+    python manage.py seed_load --students 5000 --score            # also compute risk scores
+
+Students and histories come from ml_engine/generate_data.py, so every
+student's attendance, grades and incidents match its risk profile. Rows are
+inserted a chunk of students at a time, by executemany() of a single-row
+INSERT in batches of BATCH_ROWS (COPY on PostgreSQL) — no model instances,
+and none of the per-row post_save signals that would recalculate risk after
+every insert. The per-day DailyActivity counters those signals would keep
+are computed from the same DataFrames and inserted alongside. Use --score or
+`manage.py rescore_all` afterwards to compute the scores in bulk.
+"""
+
+import csv
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+BATCH_ROWS = 2000   # rows per executemany() round trip on the INSERT path
+
+
+def _iso_dates(column):
+    return column.to_numpy().astype('datetime64[D]').astype(str).tolist()
+
+
+def _insert_rows(model, columns, values, method):
+    """
+    Insert `values` (equal-length lists, one per column) into the model's
+    table, bypassing the ORM — and therefore its signals.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = [model._meta.get_field(c).column for c in columns]
+    cols  = ', '.join(connection.ops.quote_name(n) for n in names)
+
+    with connection.cursor() as cursor:
+        if method == 'copy':
+            buf = io.StringIO()
+            csv.writer(buf).writerows(zip(*values))
+            buf.seek(0)
+            cursor.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+            return
+
+        rows = list(zip(*values))
+        sql  = f"INSERT INTO {table} ({cols}) VALUES ({', '.join(['%s'] * len(names))})"
+        for start in range(0, len(rows), BATCH_ROWS):
+            cursor.executemany(sql, rows[start:start + BATCH_ROWS])
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load synthetic students with attendance, grade and intervention histories'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=30, help='Calendar days of history per student')
+        parser.add_argument('--teachers', type=int, default=50)
+        parser.add_argument('--counselors', type=int, default=10)
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Students generated and inserted per transaction')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='load', help='Username prefix of the created users')
+        parser.add_argument('--method', choices=['auto', 'insert', 'copy'], default='auto',
+                            help='auto = COPY on PostgreSQL, batched INSERT elsewhere')
+        parser.add_argument('--score', action='store_true', help='Calculate risk scores for the loaded students')
+
+    def handle(self, *args, **options):
+        import apps.risk.calculator  # noqa: F401 — puts ml_engine on sys.path
+        from generate_data import generate_histories, generate_students
+
+        from apps.users.models import User
+
+        prefix = options['prefix']
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'insert'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('--method copy needs PostgreSQL')
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Users named {prefix}_* already exist — pass another --prefix")
+
+        # Unusable password — hashing a real one would dominate the run time
+        password = make_password(None)
+        teachers = [u.pk for u in User.objects.bulk_create([
+            User(username=f"{prefix}_teacher{i}", role='teacher', password=password)
+            for i in range(options['teachers'])
+        ])]
+        counselors = [u.pk for u in User.objects.bulk_create([
+            User(username=f"{prefix}_counselor{i}", role='counselor', password=password)
+            for i in range(options['counselors'])
+        ])]
+
+        total, chunk_size = options['students'], options['chunk_size']
+        self.stdout.write(f"Loading {total} students in chunks of {chunk_size} ({method})...")
+        started = time.perf_counter()
+        counts  = {'students': 0, 'attendance': 0, 'grades': 0, 'interventions': 0}
+
+        for number, offset in enumerate(range(0, total, chunk_size)):
+            size = min(chunk_size, total - offset)
+            # Seeded per chunk, so the same options always load the same data
+            students  = generate_students(size, seed=[options['seed'], number])
+            histories = generate_histories(students, options['days'], seed=[options['seed'], number, 1])
+
+            with transaction.atomic():
+                ids = [u.pk for u in User.objects.bulk_create([
+                    User(username=f"{prefix}_student{offset + i}", role='student', password=password)
+                    for i in range(size)
+                ])]
+                self._load_histories(histories, ids, teachers, counselors, method, number)
+
+            if options['score']:
+                from apps.risk.calculator import calculate_risk_for_students
+                calculate_risk_for_students(ids)
+
+            counts['students'] += size
+            for name, table in histories.items():
+                counts[name] += len(table)
+            rate = counts['students'] / (time.perf_counter() - started)
+            self.stdout.write(f"  {counts['students']:>9}/{total} students  ({rate:,.0f} students/s)")
+
+        elapsed = time.perf_counter() - started
+        rows    = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {counts['students']} students, {counts['attendance']} attendance logs, "
+            f"{counts['grades']} grades, {counts['interventions']} interventions "
+            f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)"
+        ))
+
+    def _load_histories(self, histories, ids, teachers, counselors, method, number):
+        from apps.attendance.models import AttendanceLog
+        from apps.grades.models import GradeRecord
+        from apps.interventions.models import Intervention
+        from apps.risk.models import DailyActivity
+
+        rng = np.random.default_rng(number)
+        ids = np.asarray(ids)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+        def staff(pool, n):
+            return np.asarray(pool)[rng.integers(0, len(pool), n)].tolist() if pool else [None] * n
+
+        att = histories['attendance']
+        n   = len(att)
+        _insert_rows(AttendanceLog, ['student', 'marked_by', 'date', 'status', 'class_name', 'created_at', 'updated_at'], [
+            ids[att['student']].tolist(), staff(teachers, n),
+            _iso_dates(att['date']), att['status'].tolist(), [''] * n, [now] * n, [now] * n,
+        ], method)
+
+        grades = histories['grades']
+        n      = len(grades)
+        _insert_rows(GradeRecord, ['student', 'entered_by', 'subject', 'exam_type', 'score', 'total', 'date', 'updated_at'], [
+            ids[grades['student']].tolist(), staff(teachers, n), grades['subject'].tolist(),
+            grades['exam_type'].tolist(), grades['score'].tolist(), [100.0] * n,
+            _iso_dates(grades['date']), [now] * n,
+        ], method)
+
+        # What the signals would have counted: one row per student and day with any history
+        daily = pd.concat([
+            att.assign(attendance_present=(att['status'] == 'present').astype(int), attendance_total=1,
+                       grade_sum=0.0, grade_count=0),
+            grades.assign(attendance_present=0, attendance_total=0, grade_sum=grades['score'], grade_count=1),
+        ])[['student', 'date', 'attendance_present', 'attendance_total', 'grade_sum', 'grade_count']]
+        daily = daily.groupby(['student', 'date'], as_index=False).sum()
+        _insert_rows(DailyActivity, ['student', 'date', 'attendance_present', 'attendance_total',
+                                     'grade_sum', 'grade_count'], [
+            ids[daily['student']].tolist(), _iso_dates(daily['date']),
+            daily['attendance_present'].tolist(), daily['attendance_total'].tolist(),
+            daily['grade_sum'].tolist(), daily['grade_count'].tolist(),
+        ], method)
+
+        inter = histories['interventions']
+        n     = len(inter)
+        _insert_rows(Intervention, ['student', 'counselor', 'action_type', 'notes', 'status', 'scheduled', 'created_at', 'updated_at'], [
+            ids[inter['student']].tolist(), staff(counselors, n), inter['action_type'].tolist(), [''] * n,
+            inter['status'].tolist(), _iso_dates(inter['scheduled']), [now] * n, [now] * n,
+        ], method)
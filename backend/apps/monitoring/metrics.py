@@ -0,0 +1,303 @@
+"""
+backend/apps/monitoring/metrics.py
+In-process metrics registry rendered in the Prometheus text format.
+
+    from apps.monitoring import metrics
+
+    metrics.REQUEST_LATENCY.observe(0.042, route='api/alerts/', method='GET', status='200')
+    with metrics.risk_stage('inference', mode='single'):
+        ...
+    with metrics.counting_queries() as queries:
+        ...                                   # queries.queries, queries.seconds
+
+Values live in the memory of each worker process, like the channel layer's
+receive buffers; scrape every worker (or run one) to see all of them.
+Served at GET /api/metrics/ (admins only).
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS   = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS    = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name       = name
+        self.doc        = documentation
+        self.labelnames = tuple(labelnames)
+        self._values    = {}
+        self._lock      = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines += self._lines(list(zip(self.labelnames, key)), value)
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def _lines(self, pairs, value):
+        return [f"{self.name}{_labels(pairs)} {_number(value)}"]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * len(self.buckets), 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[0][i] += 1
+                    break
+            counts[1] += value
+
+    def _lines(self, pairs, value):
+        buckets, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, buckets):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(pairs)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics    = []
+        self._collectors = []   # called before rendering, to refresh gauges read from elsewhere
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# ── HTTP (filled by apps.monitoring.middleware) ───────────
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, per URL route.',
+    ['route', 'method', 'status']))
+REQUEST_QUERIES = REGISTRY.register(Histogram(
+    'http_request_db_queries', 'SQL queries run while serving a request.',
+    ['route', 'method'], QUERY_BUCKETS))
+REQUEST_DB_TIME = REGISTRY.register(Histogram(
+    'http_request_db_seconds', 'Time spent in SQL queries while serving a request.',
+    ['route', 'method']))
+REQUEST_SERIALIZER_TIME = REGISTRY.register(Histogram(
+    'http_request_serializer_seconds', 'Time spent building serializer output (DRF .data).',
+    ['route', 'method']))
+RESPONSE_SIZE = REGISTRY.register(Histogram(
+    'http_response_size_bytes', 'Size of the response body.',
+    ['route', 'method'], SIZE_BUCKETS))
+
+# ── Risk calculation ──────────────────────────────────────
+RISK_STAGE_TIME = REGISTRY.register(Histogram(
+    'risk_calculation_stage_seconds',
+    'Time per stage of a risk calculation: features, inference, save, alerts.',
+    ['stage', 'mode']))
+RISK_FAILURES = REGISTRY.register(Counter(
+    'risk_calculation_failures_total', 'Risk recalculations that raised, per trigger.',
+    ['trigger']))
+RISK_FALLBACKS = REGISTRY.register(Counter(
+    'risk_model_fallbacks_total', 'Scores computed by the fallback rules because the model failed.'))
+
+# ── Recalculation queue (RISK_RECOMPUTE_MODE = 'queue') ──
+RISK_JOBS = REGISTRY.register(Counter(
+    'risk_recompute_jobs_total', 'Queued recalculations finished by this worker process, per outcome.',
+    ['outcome']))
+RISK_JOB_LATENCY = REGISTRY.register(Histogram(
+    'risk_recompute_job_latency_seconds', 'Time from enqueueing a recalculation to its score being saved.',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)))
+RISK_QUEUE_JOBS = REGISTRY.register(Gauge(
+    'risk_recompute_queue_jobs', 'Jobs in the recalculation queue: pending, claimed, failed.',
+    ['state']))
+RISK_QUEUE_LAG = REGISTRY.register(Gauge(
+    'risk_recompute_queue_lag_seconds', 'Age of the oldest pending recalculation job.'))
+
+# ── Read-through cache (apps.risk.cache) ─────────────────
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    'risk_cache_requests_total', 'Reads of the risk cache per cached item (responses, features), hit or miss.',
+    ['cache', 'result']))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    'risk_cache_hit_ratio', 'Share of risk cache reads answered from the cache since the process started.',
+    ['cache']))
+
+PREDICTION_CACHE = REGISTRY.register(Gauge(
+    'risk_prediction_cache', 'predict_risk cache counters (hits, misses, size, maxsize, invalidations).',
+    ['field']))
+
+
+@REGISTRY.collector
+def _collect_prediction_cache():
+    # Only if the model has been imported in this process — never load it just to report
+    predict = sys.modules.get('predict')
+    if predict is None:
+        return
+    for field, value in predict.prediction_cache_info().items():
+        if value is not None:
+            PREDICTION_CACHE.set(value, field=field)
+
+
+@REGISTRY.collector
+def _collect_cache_hit_ratio():
+    with CACHE_REQUESTS._lock:
+        names = {name for name, _ in CACHE_REQUESTS._values}
+    for name in names:
+        hits   = CACHE_REQUESTS.value(cache=name, result='hit')
+        misses = CACHE_REQUESTS.value(cache=name, result='miss')
+        CACHE_HIT_RATIO.set(hits / (hits + misses) if hits + misses else 0.0, cache=name)
+
+
+@REGISTRY.collector
+def _collect_recompute_queue():
+    # One aggregate query per scrape, and only when the queue is in use
+    from django.conf import settings
+    if getattr(settings, 'RISK_RECOMPUTE_MODE', 'inline') != 'queue':
+        return
+    from apps.risk.queue import queue_stats
+    stats = queue_stats()
+    for state in ('pending', 'claimed', 'failed'):
+        RISK_QUEUE_JOBS.set(stats[state], state=state)
+    RISK_QUEUE_LAG.set(stats['lag_seconds'])
+
+
+@contextmanager
+def risk_stage(stage, mode):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        RISK_STAGE_TIME.observe(time.perf_counter() - started, stage=stage, mode=mode)
+
+
+# ── SQL queries ───────────────────────────────────────────
+# Every database connection gets one execute wrapper (install_query_counter),
+# which charges each query to the counter of the current context. Connections
+# are per thread, and an async view's ORM calls run on a worker thread, but
+# the context — and so the counter — travels with them.
+_query_counter = ContextVar('query_counter', default=None)
+
+
+class QueryCounter:
+    """Queries run, and seconds spent in them, while counting — charged to every enclosing counter too."""
+    __slots__ = ('queries', 'seconds', 'parent')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.parent  = None
+
+
+@contextmanager
+def counting_queries(counter=None):
+    """Count the queries run in this context into `counter` (a new QueryCounter by default)."""
+    counter = counter or QueryCounter()
+    counter.parent = _query_counter.get()
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
+def _count_queries(execute, sql, params, many, context):
+    counter = _query_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        while counter is not None:
+            counter.queries += 1
+            counter.seconds += elapsed
+            counter = counter.parent
+
+
+def _add_query_counter(connection, **kwargs):
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+def install_query_counter():
+    """Count queries on every database connection, including ones opened later in other threads."""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_add_query_counter, dispatch_uid='query_counter')
+    for connection in connections.all(initialized_only=True):
+        _add_query_counter(connection)
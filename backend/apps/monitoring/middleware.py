@@ -0,0 +1,115 @@
+"""
+backend/apps/monitoring/middleware.py
+Records latency, SQL queries and time, serializer time and response size
+of every request, labelled with the URL route it matched (config/urls.py).
+
+    MIDDLEWARE = ['apps.monitoring.middleware.MetricsMiddleware', ...]
+
+The route pattern ('api/alerts/<int:pk>/read/') is used rather than the
+path, so ids do not create a new series per object.
+
+Queries are counted with metrics.counting_queries() around the request;
+serializer time is charged to the RequestStats of the current context.
+"""
+
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from apps.monitoring import metrics
+
+UNMATCHED = '<unmatched>'
+
+# Stats of the request being served in this context; None outside a request
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    __slots__ = ('serializer_seconds', 'serializing')
+
+    def __init__(self):
+        self.serializer_seconds = 0.0
+        self.serializing        = False
+
+
+def _timed_data(fget):
+    def data(self):
+        stats = _current.get()
+        if stats is None or stats.serializing:
+            return fget(self)   # outside a request, or nested inside an outer serializer
+        stats.serializing = True
+        started = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            stats.serializer_seconds += time.perf_counter() - started
+            stats.serializing = False
+    data.timed = True
+    return data
+
+
+def instrument_serializers():
+    """
+    Time DRF serialization. DRF has no hook around it, so the `data`
+    property of Serializer and ListSerializer is wrapped once at startup.
+    """
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        fget = cls.__dict__['data'].fget
+        if not getattr(fget, 'timed', False):
+            cls.data = property(_timed_data(fget))
+
+
+def _response_size(response):
+    if getattr(response, 'streaming', False):
+        return int(response.get('Content-Length', 0) or 0)
+    return len(response.content)
+
+
+class MetricsMiddleware:
+    # Both, so under ASGI the chain stays async for the async views (config/async_views.py)
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats   = RequestStats()
+        token   = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with metrics.counting_queries() as queries:
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, queries, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats   = RequestStats()
+        token   = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with metrics.counting_queries() as queries:
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, queries, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, stats, queries, elapsed):
+        match  = getattr(request, 'resolver_match', None)
+        route  = match.route if match is not None else UNMATCHED
+        method = request.method
+        metrics.REQUEST_LATENCY.observe(elapsed, route=route, method=method, status=response.status_code)
+        metrics.REQUEST_QUERIES.observe(queries.queries, route=route, method=method)
+        metrics.REQUEST_DB_TIME.observe(queries.seconds, route=route, method=method)
+        metrics.REQUEST_SERIALIZER_TIME.observe(stats.serializer_seconds, route=route, method=method)
+        metrics.RESPONSE_SIZE.observe(_response_size(response), route=route, method=method)
@@ -0,0 +1,125 @@
+"""
+Query-budget harness.
+
+Every GET endpoint under /api/ must run the same number of SQL queries no
+matter how many rows it returns — a count that grows with the data is an
+N+1 (usually a serializer reading `student.username` without
+select_related). check_query_budget() seeds a small and a large dataset,
+calls each endpoint once per size and compares the counts.
+
+Run by the test suite (apps/monitoring/tests.py) and by
+`python manage.py check_query_budget`; the functions can be reused
+by any other check that needs to count queries per request.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+
+
+def discover_get_endpoints(prefix='api/'):
+    """[(route, view name)] for every parameter-free route under `prefix` that answers GET."""
+    endpoints = []
+
+    def walk(patterns, route):
+        for pattern in patterns:
+            full = route + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, full)
+            elif full.startswith(prefix) and '<' not in full:
+                view_class = getattr(pattern.callback, 'view_class', None)
+                if view_class is not None and hasattr(view_class, 'get'):
+                    endpoints.append(('/' + full, view_class.__name__))
+
+    walk(get_resolver().url_patterns, '')
+    return endpoints
+
+
+def count_queries(client, url):
+    """Run one GET and return (status code, number of SQL queries)."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response.status_code, len(queries)
+
+
+def seed(rows):
+    """
+    Create `rows` rows for every list endpoint, attached to one probe student
+    and one counselor (role admin, so admin-only endpoints answer too), with
+    bulk_create so no risk-recalculation signals fire.
+    Returns (student, counselor).
+    """
+    from apps.alerts.models import Alert
+    from apps.attendance.models import AttendanceLog
+    from apps.grades.models import GradeRecord
+    from apps.interventions.models import Intervention
+    from apps.risk.models import CurrentRisk, RiskScore
+    from apps.users.models import User
+
+    tag       = f"budget{rows}"
+    counselor = User.objects.create(username=f"{tag}_counselor", role='admin')
+    students  = User.objects.bulk_create([
+        User(username=f"{tag}_student{i}", role='student') for i in range(rows)
+    ])
+    student = students[0]
+    today   = timezone.now().date()
+
+    AttendanceLog.objects.bulk_create([
+        AttendanceLog(student=student, marked_by=counselor, date=today - timedelta(days=i),
+                      status='present', class_name=tag)
+        for i in range(rows)
+    ])
+    GradeRecord.objects.bulk_create([
+        GradeRecord(student=student, entered_by=counselor, subject='Math', exam_type='quiz',
+                    score=50, date=today - timedelta(days=i))
+        for i in range(rows)
+    ])
+    Intervention.objects.bulk_create([
+        Intervention(student=student, counselor=counselor, action_type='counseling')
+        for _ in range(rows)
+    ])
+    scores = RiskScore.objects.bulk_create([
+        RiskScore(student=s, score=90, category='high') for s in students
+    ] + [
+        RiskScore(student=student, score=90, category='high') for _ in range(rows - 1)
+    ])
+    CurrentRisk.objects.bulk_create([
+        CurrentRisk(student_id=r.student_id, risk_score=r, score=r.score,
+                    category=r.category, calculated_at=r.calculated_at)
+        for r in scores[:rows]
+    ])
+    Alert.objects.bulk_create([
+        Alert(student=s, sent_to=counselor, alert_type='high_risk', message=tag)
+        for s in students
+    ])
+    return student, counselor
+
+
+def check_query_budget(small=3, large=30):
+    """
+    Query counts per endpoint at `small` and `large` rows.
+    Returns [(route, view name, (status, queries) small, (status, queries) large)].
+    All seeded rows are rolled back afterwards.
+    """
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    endpoints = discover_get_endpoints()
+    counts = {route: {} for route, _ in endpoints}
+
+    for rows in (small, large):
+        # Count what a cache miss costs; rolled-back ids are reused by the next run
+        caches['risk'].clear()
+        with transaction.atomic():
+            student, counselor = seed(rows)
+            token  = RefreshToken.for_user(counselor).access_token
+            client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+            for route, _ in endpoints:
+                counts[route][rows] = count_queries(client, f"{route}?student_id={student.id}&page_size={large}")
+            transaction.set_rollback(True)
+
+    return [(route, name, counts[route][small], counts[route][large]) for route, name in endpoints]
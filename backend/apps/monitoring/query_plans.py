@@ -0,0 +1,155 @@
+"""
+backend/apps/monitoring/query_plans.py
+EXPLAIN the hot queries and flag the ones that read a whole table.
+
+HOT_QUERIES lists, by name, the queries the API and the risk calculator run
+most — built the same way the views and calculator.py build them. explain()
+runs each through the database's own EXPLAIN and classifies the plan:
+
+    SQLite       "SCAN <table>" without an index        → sequential scan
+    PostgreSQL   "Seq Scan on <table>"                   → sequential scan
+
+On PostgreSQL the plans are taken with enable_seqscan off. A small seeded
+table is cheaper to scan than to search, so the planner would pick a
+sequential scan even with a perfect index; with the setting off it still
+falls back to one only when no index can answer the query. That branch
+has not been run against a PostgreSQL server yet — only SQLite is checked
+so far.
+
+seed() gives every student a score history of SCORE_ROUNDS rows, as any
+student who has been recalculated has. With a single row per student,
+ANALYZE tells SQLite that a student's history is one row long, and it
+sorts that "one row" instead of reading riskscore_student_recent in order.
+
+Run by the test suite (apps/monitoring/tests.py) and by
+`python manage.py check_query_plans`.
+"""
+
+import io
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+PAGE = 51   # default page size + 1, what keyset pagination fetches
+
+SCORE_ROUNDS = 3   # risk scores per seeded student
+
+
+def _context():
+    """Ids the queries are run for: a busy student, a counselor with alerts, a batch of students."""
+    from apps.alerts.models import Alert
+    from apps.users.models import User
+
+    students  = list(User.objects.filter(role='student').order_by('id').values_list('id', flat=True)[:2000])
+    counselor = (Alert.objects.values_list('sent_to_id', flat=True).first()
+                 or User.objects.filter(role='counselor').values_list('id', flat=True).first())
+    return {
+        'student':   students[len(students) // 2] if students else 0,
+        'students':  students,
+        'counselor': counselor or 0,
+        'since':     timezone.now().date() - timedelta(days=30),
+    }
+
+
+def _hot_queries():
+    from apps.alerts.models import Alert
+    from apps.attendance.models import AttendanceLog
+    from apps.grades.models import GradeRecord
+    from apps.interventions.models import Intervention
+    from apps.risk.calculator import _feature_queryset, _grouped_feature_querysets
+    from apps.risk.models import CurrentRisk, RiskScore
+    from apps.risk.queue import MAX_ATTEMPTS, _claimable
+
+    def batch(position):
+        return lambda c: _grouped_feature_querysets(c['students'], c['since'])[position]
+
+    return {
+        # calculator.py
+        'features (one student)':  lambda c: _feature_queryset(c['since']).filter(pk=c['student']),
+        'features: daily activity': batch(0),
+        'features: incidents':     batch(1),
+        # A roster's worth of students — what one request recalculates
+        'open high-risk alerts':   lambda c: Alert.objects.filter(student_id__in=c['students'][:30], is_read=False,
+                                                                  alert_type='high_risk').order_by()
+                                                           .values_list('student_id', 'sent_to_id'),
+        # risk_worker — the oldest claimable jobs
+        'queue claim':             lambda c: _claimable(timezone.now(), MAX_ATTEMPTS).values('id')[:500],
+        # views
+        'risk history (StudentRiskView)':  lambda c: RiskScore.objects.filter(student_id=c['student'])
+                                                     .select_related('student').order_by('-calculated_at', '-pk')[:11],
+        'high risk (AllHighRiskView)':     lambda c: CurrentRisk.objects.filter(category='high')
+                                                     .select_related('student').order_by('-calculated_at', '-pk')[:PAGE],
+        'current risk by category':        lambda c: CurrentRisk.objects.filter(category='medium')
+                                                     .select_related('student').order_by('-score', '-pk')[:PAGE],
+        'unread alerts (MyAlertsView)':    lambda c: Alert.objects.filter(sent_to_id=c['counselor'], is_read=False)
+                                                     .select_related('student').order_by('-created_at', '-pk')[:PAGE],
+        'alerts by recipient and type':    lambda c: Alert.objects.filter(sent_to_id=c['counselor'], is_read=False,
+                                                                          alert_type='high_risk').values('id'),
+        'attendance list':                 lambda c: AttendanceLog.objects.filter(student_id=c['student']).order_by('-date', '-pk')[:PAGE],
+        'grade list':                      lambda c: GradeRecord.objects.filter(student_id=c['student']).order_by('-date', '-pk')[:PAGE],
+        'intervention list':               lambda c: Intervention.objects.filter(student_id=c['student'])
+                                                     .select_related('student', 'counselor').order_by('-created_at', '-pk')[:PAGE],
+        # config/conditional.py — the rows each ETag aggregate reads (COUNT, MAX(pk), MAX(timestamp))
+        'list fingerprint (MyAlertsView)':    lambda c: Alert.objects.filter(sent_to_id=c['counselor'], is_read=False)
+                                                        .order_by().values('pk', 'updated_at'),
+        'list fingerprint (AllHighRiskView)': lambda c: CurrentRisk.objects.filter(category='high')
+                                                        .order_by().values('pk', 'calculated_at'),
+    }
+
+
+def _sequential_scans(plan, tables):
+    """Tables of ours that `plan` reads front to back."""
+    if connection.vendor == 'postgresql':
+        found = re.findall(r'Seq Scan on (\w+)', plan)
+    else:
+        found = [m.group(1) for m in re.finditer(r'\bSCAN (\w+)(.*)', plan) if 'USING' not in m.group(2)]
+    return sorted({t for t in found if t in tables})
+
+
+def _sorts(plan):
+    if connection.vendor == 'postgresql':
+        return len(re.findall(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b', plan, re.M))
+    # 'RIGHT PART OF ORDER BY': the index gives the first columns, the rest are sorted
+    return len(re.findall(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY', plan))
+
+
+def explain_hot_queries():
+    """
+    [(name, plan text, tables scanned sequentially, sorts outside an index)]
+    for every hot query, on the current database.
+    """
+    tables  = {model._meta.db_table for model in apps.get_models()}
+    context = _context()
+    results = []
+    for name, build in _hot_queries().items():
+        query = build(context)
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = query.explain()
+        results.append((name, plan, _sequential_scans(plan, tables), _sorts(plan)))
+    return results
+
+
+def analyze():
+    """Refresh planner statistics, as autovacuum / a periodic ANALYZE would in production."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def seed(students):
+    """Seed `students` with 30 days of history and SCORE_ROUNDS scores each, then ANALYZE."""
+    from apps.risk.calculator import calculate_risk_for_students
+    from apps.users.models import User
+
+    call_command('seed_load', students=students, teachers=10, counselors=5,
+                 prefix='plans', score=True, stdout=io.StringIO())
+    ids = list(User.objects.filter(username__startswith='plans_student').values_list('id', flat=True))
+    for _ in range(SCORE_ROUNDS - 1):
+        calculate_risk_for_students(ids)
+    analyze()
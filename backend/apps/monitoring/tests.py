@@ -0,0 +1,56 @@
+from django.test import TestCase, override_settings
+
+from apps.monitoring import metrics
+from apps.monitoring.query_budget import check_query_budget
+from apps.monitoring.query_plans import explain_hot_queries, seed
+from apps.users.models import User
+
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'risk':    {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'monitoring-tests'},
+}
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class QueryBudgetTests(TestCase):
+    def test_every_endpoint_runs_a_constant_number_of_queries(self):
+        results = check_query_budget(small=3, large=30)
+        self.assertTrue(results)
+        for route, name, small, large in results:
+            with self.subTest(route=route, view=name):
+                self.assertEqual((small[0], large[0]), (200, 200))
+                self.assertEqual(small[1], large[1], 'query count grows with the rows returned')
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(500)
+        cls.results = explain_hot_queries()
+
+    def test_hot_queries_use_an_index(self):
+        for name, plan, scans, _ in self.results:
+            with self.subTest(query=name):
+                self.assertEqual(scans, [], f"sequential scan:\n{plan}")
+
+    def test_hot_queries_read_rows_in_index_order(self):
+        for name, plan, _, sorts in self.results:
+            with self.subTest(query=name):
+                self.assertEqual(sorts, 0, f"sorted outside an index:\n{plan}")
+
+
+class QueryCounterTests(TestCase):
+    def test_nested_counters_both_count(self):
+        with metrics.counting_queries() as outer:
+            User.objects.count()
+            with metrics.counting_queries() as inner:
+                User.objects.count()
+                User.objects.exists()
+        self.assertEqual((outer.queries, inner.queries), (3, 2))
+
+    def test_queries_outside_a_counter_are_not_counted(self):
+        with metrics.counting_queries() as counter:
+            pass
+        User.objects.count()
+        self.assertEqual(counter.queries, 0)
@@ -0,0 +1,11 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from apps.users.permissions import IsAdmin
+from .metrics import REGISTRY
+
+class MetricsView(APIView):
+    """GET /api/metrics/  — Prometheus text format, admins only"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
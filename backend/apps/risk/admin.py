@@ -1,10 +1,30 @@
 # ── risk/admin.py ────────────────────────────────────────
 from django.contrib import admin
-from .models import RiskScore
+from .models import RiskScore, CurrentRisk, DailyActivity, RiskRecomputeJob
 
 @admin.register(RiskScore)
 class RiskAdmin(admin.ModelAdmin):
-    list_display  = ['student', 'score', 'category', 'attendance_pct', 'grade_avg', 'incidents', 'calculated_at']
-    list_filter   = ['category']
+    list_display  = ['student', 'score', 'category', 'attendance_pct', 'grade_avg', 'incidents', 'model_version', 'calculated_at']
+    list_filter   = ['category', 'model_version']
     search_fields = ['student__username']
     ordering      = ['-calculated_at']
+
+@admin.register(CurrentRisk)
+class CurrentRiskAdmin(admin.ModelAdmin):
+    list_display  = ['student', 'score', 'category', 'attendance_pct', 'grade_avg', 'incidents', 'model_version', 'calculated_at']
+    list_filter   = ['category', 'model_version']
+    search_fields = ['student__username']
+    ordering      = ['-score']
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display  = ['student', 'date', 'attendance_present', 'attendance_total', 'grade_sum', 'grade_count']
+    search_fields = ['student__username']
+    ordering      = ['-date']
+
+@admin.register(RiskRecomputeJob)
+class RiskRecomputeJobAdmin(admin.ModelAdmin):
+    list_display  = ['student', 'trigger', 'enqueued_at', 'claimed_by', 'lease_until', 'attempts', 'requeued']
+    list_filter   = ['trigger']
+    search_fields = ['student__username']
+    ordering      = ['enqueued_at']
@@ -0,0 +1,25 @@
+"""
+backend/apps/risk/apps.py
+Loads the risk model once per process at startup, so no request pays for it.
+The compiled forest is memory-mapped read-only, so all workers on a host
+share one copy of it.
+"""
+
+import logging
+
+from django.apps import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class RiskConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.risk'
+
+    def ready(self):
+        import apps.risk.calculator  # puts ml_engine on sys.path
+        try:
+            from predict import get_forest
+            get_forest()
+        except Exception as e:
+            logger.warning("ML error: %s — risk scores will use fallback rules", e)
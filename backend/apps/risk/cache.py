@@ -0,0 +1,161 @@
+"""
+backend/apps/risk/cache.py
+Read-through cache for the most-polled risk reads, in the 'risk' cache
+alias (settings.CACHES — memory, file or Redis, see CACHE_BACKEND).
+
+    GET /api/risk/?student_id=X    per student           (StudentRiskView)
+    GET /api/risk/high/            one high-risk list    (AllHighRiskView)
+    risk features                  per student and 30-day window (calculator.py)
+
+Every key carries the version tokens of the scopes it depends on —
+`student:<id>`, `high`, `features:<id>`. Invalidating a scope gives it a new
+random token, so every entry built on the old one is never read again and
+ages out of the LRU; nothing has to be found and deleted. Writing a RiskScore
+invalidates the student (and `high` when the student is or was high risk);
+changing a student's attendance, grades or incidents invalidates its
+features. Tokens are replaced after the writing transaction commits, so a
+reader can never cache pre-commit data under the new token.
+
+aread_through() is the same for the async views (config/async_views.py).
+
+Nothing is cached with the memory backend: it is private to each process,
+and a process cannot invalidate another's entries, so callers check shared()
+and read the database instead — a stale response would show an old score, a
+stale feature tuple would compute a wrong one.
+"""
+
+import hashlib
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from apps.monitoring.metrics import CACHE_REQUESTS
+
+ALIAS = 'risk'
+
+
+def _cache():
+    return caches[ALIAS]
+
+
+def shared():
+    """True when every process reads and invalidates the same entries."""
+    return not isinstance(_cache(), LocMemCache)
+
+
+def _new_token():
+    return uuid.uuid4().hex[:12]
+
+
+def _tokens(scopes):
+    """{scope: current token} in one round trip; scopes never seen (or evicted) get a fresh one."""
+    cache  = _cache()
+    keys   = {f"version:{scope}": scope for scope in scopes}
+    tokens = cache.get_many(list(keys))
+    for key in keys.keys() - tokens.keys():
+        cache.add(key, _new_token(), timeout=None)
+        tokens[key] = cache.get(key)
+    return {scope: tokens[key] for key, scope in keys.items()}
+
+
+def _entry_key(name, tokens, parts):
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"{name}:{'.'.join(tokens)}:{digest}"
+
+
+def read_through(name, scopes, parts, compute):
+    """The cached value for `parts` under `scopes`, or compute() stored for next time."""
+    cache  = _cache()
+    tokens = _tokens(scopes)
+    key    = _entry_key(name, [tokens[s] for s in scopes], parts)
+    value  = cache.get(key)
+    if value is not None:
+        CACHE_REQUESTS.inc(cache=name, result='hit')
+        return value
+    CACHE_REQUESTS.inc(cache=name, result='miss')
+    value = compute()
+    cache.set(key, value)
+    return value
+
+
+def read_through_many(name, ids, parts, compute_missing):
+    """
+    {id: value} for many per-id scopes (`<name>:<id>`) in two cache round trips;
+    compute_missing(ids) → {id: value} is called once for the misses.
+    """
+    cache  = _cache()
+    tokens = _tokens([f"{name}:{i}" for i in ids])
+    keys   = {_entry_key(name, [tokens[f"{name}:{i}"]], (i, parts)): i for i in ids}
+    found  = {keys[k]: v for k, v in cache.get_many(list(keys)).items()}
+    missing = [i for i in ids if i not in found]
+    CACHE_REQUESTS.inc(len(found), cache=name, result='hit')
+    CACHE_REQUESTS.inc(len(missing), cache=name, result='miss')
+    if missing:
+        computed = compute_missing(missing)
+        cache.set_many({k: computed[i] for k, i in keys.items() if i in computed})
+        found.update(computed)
+    return found
+
+
+async def _acache(method, *args, **kwargs):
+    """A cache call from async code: the memory backend directly (no I/O to wait on), others through their async API."""
+    cache = _cache()
+    if shared():
+        return await getattr(cache, f"a{method}")(*args, **kwargs)
+    return getattr(cache, method)(*args, **kwargs)
+
+
+async def _atokens(scopes):
+    """_tokens() from async code."""
+    keys   = {f"version:{scope}": scope for scope in scopes}
+    tokens = await _acache('get_many', list(keys))
+    for key in keys.keys() - tokens.keys():
+        await _acache('add', key, _new_token(), timeout=None)
+        tokens[key] = await _acache('get', key)
+    return {scope: tokens[key] for key, scope in keys.items()}
+
+
+async def aread_through(name, scopes, parts, compute):
+    """read_through() for async views; compute is a coroutine function."""
+    tokens = await _atokens(scopes)
+    key    = _entry_key(name, [tokens[s] for s in scopes], parts)
+    value  = await _acache('get', key)
+    if value is not None:
+        CACHE_REQUESTS.inc(cache=name, result='hit')
+        return value
+    CACHE_REQUESTS.inc(cache=name, result='miss')
+    value = await compute()
+    await _acache('set', key, value)
+    return value
+
+
+def invalidate(scopes):
+    """
+    Give each scope a new token once the current transaction commits. Call it
+    after the writes and inside their transaction: outside one, on_commit
+    replaces the tokens at once.
+    """
+    scopes = list(scopes)
+    if scopes:
+        transaction.on_commit(
+            lambda: _cache().set_many({f"version:{s}": _new_token() for s in scopes}, timeout=None))
+
+
+# ── Named scopes ──────────────────────────────────────────
+def response_parts(request):
+    """Everything in a request the response depends on: host (links), path and query."""
+    return request.build_absolute_uri()
+
+
+def risk_changed(student_ids, high):
+    """New RiskScores for these students; `high` if the high-risk list changed with them."""
+    invalidate([f"student:{sid}" for sid in student_ids] + (['high'] if high else []))
+
+
+def features_changed(student_ids):
+    """These students' attendance, grades or incidents changed."""
+    if shared():
+        invalidate([f"features:{sid}" for sid in student_ids])
+
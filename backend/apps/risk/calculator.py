@@ -1,77 +1,355 @@
+import logging
 import sys, os
-from django.db.models import Avg
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
 from django.utils import timezone
 from datetime import timedelta
 
+from apps.monitoring.metrics import RISK_FALLBACKS, risk_stage
+from apps.risk import cache as risk_cache
+
 # Add ml_engine folder to path so Django can import predict.py
 BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 ML_PATH = os.path.join(BASE, 'ml_engine')
 if ML_PATH not in sys.path:
     sys.path.insert(0, ML_PATH)
 
+logger = logging.getLogger(__name__)
 
-def get_student_features(student_id):
-    from apps.attendance.models import AttendanceLog
-    from apps.grades.models import GradeRecord
+
+def _feature_queryset(since):
+    """
+    Students annotated with their raw risk inputs as correlated subqueries,
+    so any number of students can be read in a single round trip. Attendance
+    and grades come from the DailyActivity counters — at most one row per day
+    of the window, however much history the student has.
+    """
     from apps.interventions.models import Intervention
+    from apps.risk.models import DailyActivity
+    from apps.users.models import User
 
-    since   = timezone.now().date() - timedelta(days=30)
-    logs    = AttendanceLog.objects.filter(student_id=student_id, date__gte=since)
-    total   = logs.count()
-    present = logs.filter(status='present').count()
+    def per_student(qs, aggregate):
+        # GROUP BY student_id inside the subquery — one value per outer row
+        return Subquery(
+            qs.filter(student_id=OuterRef('pk'))
+              .values('student_id')
+              .annotate(value=aggregate)
+              .values('value')
+        )
+
+    days = DailyActivity.objects.filter(date__gte=since)
+    return User.objects.annotate(
+        attendance_total=per_student(days, Sum('attendance_total')),
+        attendance_present=per_student(days, Sum('attendance_present')),
+        grade_sum=per_student(days, Sum('grade_sum')),
+        grade_count=per_student(days, Sum('grade_count')),
+        incident_count=per_student(Intervention.objects.all(), Count('id')),
+    ).values('pk', 'attendance_total', 'attendance_present', 'grade_sum', 'grade_count', 'incident_count')
+
+
+def _features_from_row(row):
+    total   = row['attendance_total'] or 0
+    present = row['attendance_present'] or 0
     attendance_pct = round((present / total * 100), 2) if total > 0 else 100.0
 
-    grades    = GradeRecord.objects.filter(student_id=student_id, date__gte=since)
-    grade_avg = grades.aggregate(avg=Avg('score'))['avg'] or 75.0
+    # 75.0 only without grades: the old `Avg(...) or 75.0` also gave it to an average of 0
+    count     = row['grade_count'] or 0
+    grade_avg = (row['grade_sum'] or 0) / count if count > 0 else 75.0
     grade_avg = round(grade_avg, 2)
 
-    incidents = Intervention.objects.filter(student_id=student_id).count()
+    incidents = row['incident_count'] or 0
 
     return attendance_pct, grade_avg, incidents
 
 
+def _student_features(student_id, since):
+    row = _feature_queryset(since).filter(pk=student_id).first()
+    if row is None:
+        # Unknown student — same defaults as a student with no history
+        return 100.0, 75.0, 0
+    return _features_from_row(row)
+
+
+def get_student_features(student_id):
+    since = timezone.now().date() - timedelta(days=30)
+    if not risk_cache.shared():
+        return _student_features(student_id, since)
+    return risk_cache.read_through('features', [f"features:{student_id}"], (student_id, since.isoformat()),
+                                   lambda: _student_features(student_id, since))
+
+
+def _grouped_feature_querysets(student_ids, since):
+    """The two GROUP BY student_id queries behind get_features_for_students."""
+    from apps.interventions.models import Intervention
+    from apps.risk.models import DailyActivity
+
+    activity = (
+        DailyActivity.objects
+            .filter(student_id__in=student_ids, date__gte=since)
+            .values('student_id')
+            .annotate(
+                attendance_total=Sum('attendance_total'),
+                attendance_present=Sum('attendance_present'),
+                grade_sum=Sum('grade_sum'),
+                grade_count=Sum('grade_count'),
+            )
+    )
+    incidents = (
+        Intervention.objects
+            .filter(student_id__in=student_ids)
+            .values_list('student_id')
+            .annotate(Count('id'))
+    )
+    return activity, incidents
+
+
+def get_features_for_students(student_ids):
+    """
+    Features for many students at once — {student_id: (attendance_pct, grade_avg, incidents)}.
+    Two GROUP BY queries for the whole set instead of one query per student,
+    and only for the students not in the risk cache.
+    """
+    student_ids = list(student_ids)
+    since = timezone.now().date() - timedelta(days=30)
+    if not risk_cache.shared():
+        return _features_for_students(student_ids, since)
+    return risk_cache.read_through_many('features', student_ids, since.isoformat(),
+                                        lambda missing: _features_for_students(missing, since))
+
+
+def _features_for_students(student_ids, since):
+    activity, incidents = _grouped_feature_querysets(student_ids, since)
+    activity  = {row['student_id']: row for row in activity}
+    incidents = dict(incidents)
+
+    features = {}
+    for student_id in student_ids:
+        row = activity.get(student_id, {})
+        features[student_id] = _features_from_row({
+            'attendance_total':   row.get('attendance_total'),
+            'attendance_present': row.get('attendance_present'),
+            'grade_sum':          row.get('grade_sum'),
+            'grade_count':        row.get('grade_count'),
+            'incident_count':     incidents.get(student_id),
+        })
+    return features
+
+
+# RiskScore.model_version of scores computed by fallback_risk
+FALLBACK_VERSION = 'fallback'
+
+
+def fallback_risk(attendance_pct, grade_avg, incidents):
+    """Rule-based score used when the ML model is unavailable."""
+    score = 0
+    if attendance_pct < 60:   score += 40
+    elif attendance_pct < 75: score += 20
+    if grade_avg < 40:        score += 40
+    elif grade_avg < 55:      score += 20
+    score += incidents * 5
+    score = min(score, 100)
+    category = 'high' if score >= 70 else 'medium' if score >= 40 else 'low'
+    return category, score
+
+
+def _alert_message(risk):
+    return (
+        f"Risk: {risk.score:.0f}% | Attendance: {risk.attendance_pct:.0f}% | "
+        f"Grade: {risk.grade_avg:.0f} | Incidents: {risk.incidents}"
+    )
+
+
 def calculate_and_save_risk(student_id):
     from apps.risk.models import RiskScore
-    from apps.alerts.models import Alert
-    from apps.users.models import User
 
-    attendance_pct, grade_avg, incidents = get_student_features(student_id)
+    # Each stage is timed into risk_calculation_stage_seconds (see /api/metrics/)
+    with risk_stage('features', 'single'):
+        attendance_pct, grade_avg, incidents = get_student_features(student_id)
 
+    with risk_stage('inference', 'single'):
+        try:
+            from predict import predict_risk_with_version
+            category, score, model_version = predict_risk_with_version(attendance_pct, grade_avg, incidents)
+        except Exception as e:
+            logger.warning("ML error: %s — using fallback rules", e)
+            RISK_FALLBACKS.inc()
+            category, score = fallback_risk(attendance_pct, grade_avg, incidents)
+            model_version = FALLBACK_VERSION
+
+    with risk_stage('save', 'single'), transaction.atomic():
+        risk = RiskScore.objects.create(
+            student_id=student_id,
+            score=score,
+            category=category,
+            attendance_pct=attendance_pct,
+            grade_avg=grade_avg,
+            incidents=incidents,
+            model_version=model_version,
+        )
+        _update_current_risk([risk])
+
+    with risk_stage('alerts', 'single'):
+        _raise_high_risk_alerts([risk])
+
+    return risk
+
+
+def _update_current_risk(risks):
+    """
+    Upsert the one-row-per-student CurrentRisk projection from freshly saved
+    RiskScores, unless a student's row already holds a newer score, and
+    invalidate the cached risk responses they change once the write commits.
+    """
+    from apps.risk.models import CurrentRisk
+
+    student_ids = [r.student_id for r in risks]
+    # Read before the upsert: a student who was high risk leaves the list too
+    high_changed = any(r.category == 'high' for r in risks) or (
+        CurrentRisk.objects.filter(student_id__in=student_ids, category='high').exists())
+
+    # Only move forward: when two recalculations of a student commit in the
+    # opposite order they ran, the older score must not replace the newer one.
+    quote = connection.ops.quote_name
+    table = quote(CurrentRisk._meta.db_table)
+    cols  = ['student_id', 'risk_score_id', 'score', 'category', 'attendance_pct',
+             'grade_avg', 'incidents', 'model_version', 'calculated_at']
+    newer = (f"(excluded.{quote('calculated_at')}, excluded.{quote('risk_score_id')}) > "
+             f"({table}.{quote('calculated_at')}, {table}.{quote('risk_score_id')})")
+    # In a transaction of its own if the caller has none, so the invalidation
+    # below still waits for the upsert to commit (on_commit runs at once outside one)
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(quote(c) for c in cols)}) "
+            f"VALUES ({', '.join(['%s'] * len(cols))}) "
+            f"ON CONFLICT ({quote('student_id')}) DO UPDATE SET "
+            + ', '.join(f"{quote(c)} = excluded.{quote(c)}" for c in cols[1:])
+            + f" WHERE {newer}",
+            [(r.student_id, r.id, r.score, r.category, r.attendance_pct, r.grade_avg, r.incidents,
+              r.model_version, connection.ops.adapt_datetimefield_value(r.calculated_at))
+             for r in risks],
+        )
+        # Registered after the write, inside its transaction: new tokens only once it is visible
+        risk_cache.risk_changed(student_ids, high=high_changed)
+
+
+def _predict_many(features):
+    """One predict_proba pass over an N×3 feature matrix → (categories, scores, model version)."""
     try:
-        from predict import predict_risk
-        category, score = predict_risk(attendance_pct, grade_avg, incidents)
+        from predict import predict_risk_batch_with_version
+        categories, scores, model_version = predict_risk_batch_with_version(features)
+        return categories.tolist(), scores.tolist(), model_version
     except Exception as e:
-        print(f"ML error: {e} — using fallback rules")
-        score = 0
-        if attendance_pct < 60:   score += 40
-        elif attendance_pct < 75: score += 20
-        if grade_avg < 40:        score += 40
-        elif grade_avg < 55:      score += 20
-        score += incidents * 5
-        score = min(score, 100)
-        category = 'high' if score >= 70 else 'medium' if score >= 40 else 'low'
-
-    risk = RiskScore.objects.create(
-        student_id=student_id,
-        score=score,
-        category=category,
-        attendance_pct=attendance_pct,
-        grade_avg=grade_avg,
-        incidents=incidents,
+        logger.warning("ML error: %s — using fallback rules", e)
+        RISK_FALLBACKS.inc(len(features))
+        results = [fallback_risk(*row) for row in features.tolist()]
+        return [r[0] for r in results], [r[1] for r in results], FALLBACK_VERSION
+
+
+def _raise_high_risk_alerts(risks):
+    """
+    Alert every counselor about each high-risk score, unless they already
+    have an unread high-risk alert for that student.
+
+    One query for the existing alerts and one bulk insert for the rest.
+    The unique_open_alert constraint makes concurrent recalculations safe —
+    a duplicate insert is simply skipped. The alerts this call inserted are
+    pushed to the counselors' WebSocket groups once the transaction commits;
+    a skipped one belongs to the process that inserted it, which pushes it.
+    """
+    from apps.alerts.models import Alert
+    from apps.alerts.notifications import push_new_alerts
+    from apps.users.models import User
+
+    high = [r for r in risks if r.category == 'high']
+    if not high:
+        return
+
+    counselor_ids = list(User.objects.filter(role='counselor').values_list('id', flat=True))
+    if not counselor_ids:
+        return
+
+    student_ids = [r.student_id for r in high]
+    already_alerted = set(
+        Alert.objects.filter(
+            student_id__in=student_ids,
+            is_read=False, alert_type='high_risk',
+        ).order_by().values_list('student_id', 'sent_to_id')
     )
+    alerts = [
+        Alert(
+            student_id=risk.student_id, sent_to_id=counselor_id,
+            alert_type='high_risk',
+            message=_alert_message(risk),
+        )
+        for risk in high
+        for counselor_id in counselor_ids
+        if (risk.student_id, counselor_id) not in already_alerted
+    ]
+    if not alerts:
+        return
 
-    if category == 'high':
-        counselors = User.objects.filter(role='counselor')
-        for counselor in counselors:
-            exists = Alert.objects.filter(
-                student_id=student_id, sent_to=counselor,
-                is_read=False, alert_type='high_risk'
-            ).exists()
-            if not exists:
-                Alert.objects.create(
-                    student_id=student_id, sent_to=counselor,
-                    alert_type='high_risk',
-                    message=f"Risk: {score:.0f}% | Attendance: {attendance_pct:.0f}% | Grade: {grade_avg:.0f} | Incidents: {incidents}",
-                )
+    Alert.objects.bulk_create(alerts, ignore_conflicts=True)
+    # Skipped rows get no id back; created_at (set on our objects by bulk_create) tells ours apart
+    inserted = {(a.student_id, a.sent_to_id): a.created_at for a in alerts}
+    transaction.on_commit(lambda: push_new_alerts(inserted))
 
-    return risk
+
+def get_current_categories(student_ids):
+    """{student_id: current category} — students never scored are left out."""
+    from apps.risk.models import CurrentRisk
+
+    return dict(
+        CurrentRisk.objects
+            .filter(student_id__in=list(student_ids))
+            .values_list('student_id', 'category')
+    )
+
+
+def calculate_risk_for_students(student_ids=None, batch_size=2000, save=True):
+    """
+    Score many students at once — pass a list of ids, or None for every student.
+
+    Each batch costs two grouped feature queries, one predict_proba call,
+    one bulk insert of RiskScore rows and at most two alert queries.
+    Returns the new RiskScore objects; with save=False they are only
+    computed, not written, and no alerts are raised.
+    """
+    from apps.risk.models import RiskScore
+    from apps.users.models import User
+
+    if student_ids is None:
+        student_ids = list(User.objects.filter(role='student').order_by('id').values_list('id', flat=True))
+    else:
+        student_ids = sorted(set(student_ids))
+
+    risks = []
+    for start in range(0, len(student_ids), batch_size):
+        batch = student_ids[start:start + batch_size]
+        with risk_stage('features', 'batch'):
+            features = get_features_for_students(batch)
+        with risk_stage('inference', 'batch'):
+            matrix = np.array([features[sid] for sid in batch], dtype=float)
+            categories, scores, model_version = _predict_many(matrix)
+
+        batch_risks = [
+            RiskScore(
+                student_id=sid,
+                score=score,
+                category=category,
+                attendance_pct=features[sid][0],
+                grade_avg=features[sid][1],
+                incidents=features[sid][2],
+                model_version=model_version,
+            )
+            for sid, category, score in zip(batch, categories, scores)
+        ]
+        if save:
+            with risk_stage('save', 'batch'), transaction.atomic():
+                batch_risks = RiskScore.objects.bulk_create(batch_risks)
+                _update_current_risk(batch_risks)
+            with risk_stage('alerts', 'batch'):
+                _raise_high_risk_alerts(batch_risks)
+        risks.extend(batch_risks)
+
+    return risks
@@ -0,0 +1,154 @@
+"""
+backend/apps/risk/counters.py
+Keeps DailyActivity — per-student, per-day attendance and grade totals —
+in step with the raw AttendanceLog and GradeRecord rows.
+
+Every change is expressed as the counts a raw row contributes to its day:
+
+    attendance  (present 0/1, total 1, grade sum 0,     grade count 0)
+    grade       (present 0,   total 0, grade sum score, grade count 1)
+
+update(removed, added) subtracts what rows used to contribute and adds what
+they contribute now, merged per (student, date), in one statement per day
+touched. Days that gain something are upserted (INSERT ... ON CONFLICT DO
+UPDATE — SQLite 3.24+ and PostgreSQL); days that only lose something are
+updated in place and never created, so cascading deletes cannot leave
+negative rows behind.
+
+Bulk writes that send no signals call recount(student_ids, date) instead.
+Every change also invalidates the students' cached risk features (cache.py).
+Raw rows changed behind the ORM's back (QuerySet.update, raw SQL) are not
+seen here — `manage.py check_daily_activity --fix` repairs the counters.
+"""
+
+from collections import defaultdict
+
+from django.db import connection
+
+from apps.risk import cache as risk_cache
+
+COLUMNS = ('attendance_present', 'attendance_total', 'grade_sum', 'grade_count')
+
+
+def _date(value):
+    from .models import DailyActivity
+    return DailyActivity._meta.get_field('date').to_python(value)
+
+
+def attendance(student_id, date, status):
+    """What one attendance mark adds to its day."""
+    return (student_id, _date(date)), (1 if status == 'present' else 0, 1, 0.0, 0)
+
+
+def grade(student_id, date, score):
+    """What one grade adds to its day."""
+    return (student_id, _date(date)), (0, 0, float(score), 1)
+
+
+def update(removed=(), added=()):
+    """Apply contributions removed and added (lists of attendance()/grade() results)."""
+    net = defaultdict(lambda: [0, 0, 0.0, 0])
+    for sign, items in ((-1, removed), (1, added)):
+        for key, counts in items:
+            for i, value in enumerate(counts):
+                net[key][i] += sign * value
+
+    gains, losses = [], []
+    for (student_id, date), counts in net.items():
+        if not any(counts):
+            continue
+        row = (student_id, connection.ops.adapt_datefield_value(date), *counts)
+        (gains if any(v > 0 for v in counts) else losses).append(row)
+
+    from .models import DailyActivity
+    quote = connection.ops.quote_name
+    table = quote(DailyActivity._meta.db_table)
+    cols  = [quote(c) for c in COLUMNS]
+    risk_cache.features_changed({student_id for student_id, *_ in gains + losses})
+
+    with connection.cursor() as cursor:
+        if gains:
+            cursor.executemany(
+                f"INSERT INTO {table} ({quote('student_id')}, {quote('date')}, {', '.join(cols)}) "
+                f"VALUES (%s, %s, %s, %s, %s, %s) "
+                f"ON CONFLICT ({quote('student_id')}, {quote('date')}) DO UPDATE SET "
+                + ', '.join(f"{c} = {table}.{c} + excluded.{c}" for c in cols),
+                gains,
+            )
+        if losses:
+            cursor.executemany(
+                f"UPDATE {table} SET " + ', '.join(f"{c} = {c} + %s" for c in cols)
+                + f" WHERE {quote('student_id')} = %s AND {quote('date')} = %s",
+                [(*counts, student_id, date) for student_id, date, *counts in losses],
+            )
+            # A day with nothing left on it is dropped
+            cursor.executemany(
+                f"DELETE FROM {table} WHERE {quote('student_id')} = %s AND {quote('date')} = %s "
+                f"AND {quote('attendance_total')} = 0 AND {quote('grade_count')} = 0",
+                [(student_id, date) for student_id, date, *_ in losses],
+            )
+
+
+# ── Rebuilding from the raw tables ────────────────────────
+def expected_sql(where=''):
+    """
+    SELECT student_id, date, present, total, grade sum, grade count — the
+    counters recomputed from the raw rows. `where` filters both raw tables
+    (e.g. 'student_id BETWEEN %s AND %s', parameters passed twice).
+    """
+    from apps.attendance.models import AttendanceLog
+    from apps.grades.models import GradeRecord
+
+    quote = connection.ops.quote_name
+    where = f"WHERE {where}" if where else ''
+    return (
+        f"SELECT student_id, date, SUM(present), SUM(total), SUM(grade_sum), SUM(grade_count) FROM ("
+        f" SELECT student_id, date, CASE WHEN status = 'present' THEN 1 ELSE 0 END AS present,"
+        f" 1 AS total, 0.0 AS grade_sum, 0 AS grade_count"
+        f" FROM {quote(AttendanceLog._meta.db_table)} {where}"
+        f" UNION ALL"
+        f" SELECT student_id, date, 0, 0, score, 1 FROM {quote(GradeRecord._meta.db_table)} {where}"
+        f") raw GROUP BY student_id, date"
+    )
+
+
+def recount(student_ids, date):
+    """
+    Recompute the given students' counters for one day from the raw rows —
+    for bulk writes (the roster upsert) that send no signals. Runs after the
+    write, so on SQLite the transaction already holds the write lock.
+    """
+    from .models import DailyActivity
+
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    risk_cache.features_changed(student_ids)
+    quote  = connection.ops.quote_name
+    table  = quote(DailyActivity._meta.db_table)
+    marks  = ', '.join(['%s'] * len(student_ids))
+    where  = f"student_id IN ({marks}) AND date = %s"
+    params = [*student_ids, connection.ops.adapt_datefield_value(_date(date))]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {where}", params)
+        cursor.execute(
+            f"INSERT INTO {table} (student_id, date, {', '.join(quote(c) for c in COLUMNS)}) "
+            + expected_sql(where),
+            params * 2,
+        )
+
+
+def rebuild(first_student_id, last_student_id):
+    """Recompute the counters of every student with an id in [first, last] from the raw rows."""
+    from .models import DailyActivity
+
+    quote  = connection.ops.quote_name
+    table  = quote(DailyActivity._meta.db_table)
+    params = [first_student_id, last_student_id]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE student_id BETWEEN %s AND %s", params)
+        cursor.execute(
+            f"INSERT INTO {table} (student_id, date, {', '.join(quote(c) for c in COLUMNS)}) "
+            + expected_sql('student_id BETWEEN %s AND %s'),
+            params * 2,
+        )
@@ -0,0 +1,106 @@
+"""
+backend/apps/risk/management/commands/check_daily_activity.py
+Verify the DailyActivity counters against the raw attendance and grade rows.
+
+    python manage.py check_daily_activity              # report mismatches, exit 1 if any
+    python manage.py check_daily_activity --fix        # rebuild the students that drifted
+
+The counters are kept up to date by signals (apps/risk/counters.py); rows
+changed without them — QuerySet.update(), raw SQL, a restored dump — make
+them drift. Students are checked a chunk of ids at a time: one GROUP BY over
+the raw tables and one read of the counters per chunk.
+"""
+
+import math
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.risk import cache as risk_cache
+from apps.risk import counters
+
+GRADE_SUM_TOLERANCE = 1e-6   # float sums added up in a different order
+
+
+def _same(expected, actual):
+    return (expected[:2] == actual[:2] and expected[3] == actual[3]
+            and math.isclose(expected[2], actual[2], rel_tol=GRADE_SUM_TOLERANCE, abs_tol=GRADE_SUM_TOLERANCE))
+
+
+class Command(BaseCommand):
+    help = 'Check the per-day DailyActivity counters against AttendanceLog and GradeRecord'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Rebuild the counters of every student found out of step')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Student ids checked per round trip')
+        parser.add_argument('--show', type=int, default=10,
+                            help='Mismatched days to print')
+
+    def handle(self, *args, **options):
+        from apps.users.models import User
+
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        started  = time.monotonic()
+        checked  = 0
+        drifted  = set()
+        shown    = 0
+        after_id = 0
+        while True:
+            ids = list(User.objects.filter(id__gt=after_id).order_by('id')
+                       .values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            first, last = ids[0], ids[-1]
+            after_id = last
+            checked += len(ids)
+
+            mismatches = self._compare(first, last)
+            for student_id, date, expected, actual in mismatches:
+                drifted.add(student_id)
+                if shown < options['show']:
+                    shown += 1
+                    self.stdout.write(f"  student {student_id} {date}: expected {expected}, counted {actual}")
+
+            if mismatches and options['fix']:
+                with transaction.atomic():
+                    counters.rebuild(first, last)
+                    risk_cache.features_changed({student_id for student_id, *_ in mismatches})
+
+        elapsed = time.monotonic() - started
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Counters of {checked} users match the raw rows ({elapsed:.1f}s)"))
+            return
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Rebuilt the counters of {len(drifted)} out-of-step students ({elapsed:.1f}s)"))
+            return
+        raise CommandError(f"{len(drifted)} students have counters out of step with the raw rows "
+                           f"— run with --fix to rebuild them")
+
+    def _compare(self, first, last):
+        """[(student_id, date, expected, counted)] for every day that differs; missing side is None."""
+        from apps.risk.models import DailyActivity
+
+        with connection.cursor() as cursor:
+            cursor.execute(counters.expected_sql('student_id BETWEEN %s AND %s'), [first, last] * 2)
+            expected = {(row[0], str(row[1])): tuple(row[2:]) for row in cursor.fetchall()}
+
+        actual = {
+            (row[0], str(row[1])): tuple(row[2:])
+            for row in DailyActivity.objects.filter(student_id__gte=first, student_id__lte=last)
+                                            .values_list('student_id', 'date', *counters.COLUMNS)
+        }
+
+        mismatches = []
+        for key in sorted(expected.keys() | actual.keys()):
+            want, have = expected.get(key), actual.get(key)
+            if want is None or have is None or not _same(want, have):
+                mismatches.append((*key, want, have))
+        return mismatches
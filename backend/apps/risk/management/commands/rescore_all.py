@@ -0,0 +1,158 @@
+"""
+backend/apps/risk/management/commands/rescore_all.py
+Nightly full-population rescoring.
+
+    python manage.py rescore_all                    # score every student
+    python manage.py rescore_all --workers 8        # 8 worker processes
+    python manage.py rescore_all --resume           # continue a killed run
+    python manage.py rescore_all --dry-run          # show how categories would change
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+CATEGORIES = ['low', 'medium', 'high']
+
+
+def _init_worker():
+    """Runs once in every worker process: own Django setup, own DB connection, model mapped once."""
+    import django
+    django.setup()   # RiskConfig.ready maps the shared model
+
+
+def _score_chunk(student_ids, dry_run):
+    from apps.risk.calculator import calculate_risk_for_students, get_current_categories
+
+    before = get_current_categories(student_ids) if dry_run else {}
+    risks  = calculate_risk_for_students(student_ids, save=not dry_run)
+    transitions = Counter((before.get(r.student_id), r.category) for r in risks)
+    return student_ids[-1], len(risks), transitions
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the risk score of every student using a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: all cores)')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Students per chunk sent to a worker')
+        parser.add_argument('--checkpoint', default=str(settings.BASE_DIR / 'rescore_all.checkpoint.json'),
+                            help='Where progress is saved so a killed run can be resumed')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the last student recorded in the checkpoint')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Score without saving and report how the category distribution would change')
+
+    def handle(self, *args, **options):
+        from apps.users.models import User
+
+        workers    = options['workers']
+        chunk_size = options['chunk_size']
+        dry_run    = options['dry_run']
+        checkpoint = options['checkpoint']
+        if workers < 1 or chunk_size < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1')
+
+        after_id = 0
+        if options['resume']:
+            after_id = self._read_checkpoint(checkpoint)
+            self.stdout.write(f"Resuming after student id {after_id}")
+
+        students = User.objects.filter(role='student', id__gt=after_id)
+        total    = students.count()
+        self.stdout.write(f"Scoring {total} students in chunks of {chunk_size} with {workers} workers"
+                          + (' (dry run)' if dry_run else ''))
+
+        # Workers must open their own connections — never share the parent's.
+        connections.close_all()
+
+        done, transitions = 0, Counter()
+        started = time.monotonic()
+        in_flight = deque()   # futures in submission order, so the checkpoint only moves forward
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        ) as pool:
+            for chunk in self._chunks(students, after_id, chunk_size):
+                in_flight.append(pool.submit(_score_chunk, chunk, dry_run))
+                # Keep a bounded number of chunks queued so ids are streamed, not loaded all at once
+                while len(in_flight) >= workers * 2:
+                    done += self._collect(in_flight.popleft(), transitions, checkpoint, dry_run)
+                    self._progress(done, total, started)
+            while in_flight:
+                done += self._collect(in_flight.popleft(), transitions, checkpoint, dry_run)
+                self._progress(done, total, started)
+
+        if not dry_run and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Scored {done} students in {elapsed:.1f}s"))
+        if dry_run:
+            self._report(transitions)
+
+    # ── Helpers ───────────────────────────────────────────────
+    def _chunks(self, students, after_id, chunk_size):
+        """Keyset-paginate student ids — each chunk is one short query."""
+        while True:
+            chunk = list(students.filter(id__gt=after_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            after_id = chunk[-1]
+
+    def _collect(self, future, transitions, checkpoint, dry_run):
+        last_id, count, chunk_transitions = future.result()
+        transitions.update(chunk_transitions)
+        if not dry_run:
+            self._write_checkpoint(checkpoint, last_id)
+        return count
+
+    def _progress(self, done, total, started):
+        rate = done / max(time.monotonic() - started, 1e-9)
+        pct  = done / total * 100 if total else 100.0
+        self.stdout.write(f"  {done}/{total} ({pct:.0f}%) — {rate:.0f} students/s")
+
+    def _read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            return json.load(f)['last_id']
+
+    def _write_checkpoint(self, path, last_id):
+        # Write then rename, so a kill mid-write never leaves a corrupt checkpoint
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'last_id': last_id}, f)
+        os.replace(tmp, path)
+
+    def _report(self, transitions):
+        before, after = Counter(), Counter()
+        for (old, new), n in transitions.items():
+            before[old or 'unscored'] += n
+            after[new] += n
+
+        self.stdout.write("\nCategory distribution (dry run — nothing was saved):")
+        self.stdout.write(f"  {'category':<10} {'current':>9} {'new':>9} {'change':>9}")
+        for category in CATEGORIES + ['unscored']:
+            if not before[category] and not after[category]:
+                continue
+            change = after[category] - before[category]
+            self.stdout.write(f"  {category:<10} {before[category]:>9} {after[category]:>9} {change:>+9}")
+
+        moved = sum(n for (old, new), n in transitions.items() if old != new)
+        self.stdout.write(f"\n  {moved} students would change category")
+        for (old, new), n in sorted(transitions.items(), key=lambda t: -t[1]):
+            if old != new:
+                self.stdout.write(f"    {old or 'unscored'} → {new}: {n}")
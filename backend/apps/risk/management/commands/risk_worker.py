@@ -0,0 +1,145 @@
+"""
+backend/apps/risk/management/commands/risk_worker.py
+Score the students queued by RISK_RECOMPUTE_MODE = 'queue'.
+
+    python manage.py risk_worker                          # one process, runs until stopped
+    python manage.py risk_worker --processes 4            # a local pool of 4 worker processes
+    python manage.py risk_worker --once                   # drain the queue and exit
+    python manage.py risk_worker --metrics-port 9100      # serve /metrics (port + n for process n)
+    python manage.py risk_worker --retry-failed           # make failed jobs claimable again
+
+Workers share nothing but the database, so any number of them can run on
+any number of hosts, independently of the web processes. SIGINT/SIGTERM
+stop a worker after its current batch.
+"""
+
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.risk import queue
+
+
+def _serve_metrics(port):
+    """Expose this process's metrics (jobs done, latency, queue depth) for Prometheus."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from django.db import connection
+
+    from apps.monitoring.metrics import REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                body = REGISTRY.render().encode()
+            finally:
+                connection.close()   # this thread's connection, opened by the queue collector
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def _work(options, stop, log=print):
+    """The claim → score → complete loop of one worker process."""
+    if options['metrics_port']:
+        _serve_metrics(options['metrics_port'])
+
+    token = queue.worker_token()
+    log(f"Risk worker {token} started")
+    scored = 0
+    while not stop.is_set():
+        done = queue.process_batch(token, options['batch_size'], options['lease'], options['max_attempts'])
+        scored += done
+        if done:
+            continue
+        if options['once']:
+            break
+        stop.wait(options['poll'])
+    log(f"Risk worker {token} stopped after scoring {scored} students")
+    return scored
+
+
+def _child(options, index):
+    """Entry point of a pool process: own Django setup and DB connection, own metrics port."""
+    import django
+    django.setup()
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    if options['metrics_port']:
+        options = {**options, 'metrics_port': options['metrics_port'] + index}
+    _work(options, stop)
+
+
+class Command(BaseCommand):
+    help = 'Score the students queued for risk recalculation (RISK_RECOMPUTE_MODE=queue)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker processes to run on this host')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Jobs claimed and scored together')
+        parser.add_argument('--lease', type=int, default=queue.LEASE_SECONDS,
+                            help='Seconds a claim lasts before another worker may take the jobs over')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-attempts', type=int, default=queue.MAX_ATTEMPTS,
+                            help='Failed batches after which a job is left alone')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty')
+        parser.add_argument('--metrics-port', type=int, default=0,
+                            help='Serve Prometheus metrics on this port (process n uses port + n)')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Reset the attempts of failed jobs and exit')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            count = queue.retry_failed(options['max_attempts'])
+            self.stdout.write(self.style.SUCCESS(f"✅ {count} failed jobs queued again"))
+            return
+        if options['processes'] < 1 or options['batch_size'] < 1 or options['lease'] < 1:
+            raise CommandError('--processes, --batch-size and --lease must be at least 1')
+
+        started = time.monotonic()
+        if options['processes'] == 1:
+            stop = threading.Event()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+            scored = _work(options, stop, log=self.stdout.write)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Scored {scored} students in {time.monotonic() - started:.1f}s"))
+            return
+
+        # Children must open their own connections — never share the parent's.
+        from django.db import connections
+        connections.close_all()
+
+        context = multiprocessing.get_context('spawn')
+        children = [context.Process(target=_child, args=(options, i), name=f"risk-worker-{i}")
+                    for i in range(options['processes'])]
+        for child in children:
+            child.start()
+
+        def stop_children(*_):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()   # SIGTERM — each finishes its batch first
+        signal.signal(signal.SIGTERM, stop_children)
+        signal.signal(signal.SIGINT, stop_children)
+
+        for child in children:
+            child.join()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(children)} workers stopped after {time.monotonic() - started:.1f}s"))
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_current_risk(apps, schema_editor):
+    """Seed CurrentRisk from the newest RiskScore of every student already scored."""
+    RiskScore   = apps.get_model('risk', 'RiskScore')
+    CurrentRisk = apps.get_model('risk', 'CurrentRisk')
+
+    latest_ids = list(
+        RiskScore.objects.values('student_id')
+        .annotate(latest=models.Max('id'))
+        .values_list('latest', flat=True)
+    )
+    for start in range(0, len(latest_ids), 1000):
+        CurrentRisk.objects.bulk_create([
+            CurrentRisk(
+                student_id=r.student_id, risk_score_id=r.id,
+                score=r.score, category=r.category,
+                attendance_pct=r.attendance_pct, grade_avg=r.grade_avg,
+                incidents=r.incidents, calculated_at=r.calculated_at,
+            )
+            for r in RiskScore.objects.filter(id__in=latest_ids[start:start + 1000])
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('risk', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentRisk',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_risk', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('score', models.FloatField()),
+                ('category', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('attendance_pct', models.FloatField(default=0)),
+                ('grade_avg', models.FloatField(default=0)),
+                ('incidents', models.IntegerField(default=0)),
+                ('calculated_at', models.DateTimeField()),
+                ('risk_score', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='risk.riskscore')),
+            ],
+            options={
+                'ordering': ['-calculated_at'],
+                'indexes': [models.Index(fields=['category', '-score'], name='currentrisk_category_score'), models.Index(fields=['category', '-calculated_at'], name='currentrisk_category_recent')],
+            },
+        ),
+        migrations.RunPython(backfill_current_risk, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('risk', '0003_currentrisk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currentrisk',
+            name='model_version',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='riskscore',
+            name='model_version',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+    ]
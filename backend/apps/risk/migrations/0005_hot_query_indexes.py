@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('risk', '0004_model_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='currentrisk',
+            name='currentrisk_category_recent',
+        ),
+        migrations.AddIndex(
+            model_name='currentrisk',
+            index=models.Index(condition=models.Q(('category', 'high')), fields=['-calculated_at'], name='currentrisk_high_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='riskscore',
+            index=models.Index(fields=['student', '-calculated_at'], name='riskscore_student_recent'),
+        ),
+    ]
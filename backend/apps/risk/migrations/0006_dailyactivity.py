@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_daily_activity(apps, schema_editor):
+    """Count the attendance and grades already recorded into DailyActivity, in one INSERT ... SELECT."""
+    quote  = schema_editor.quote_name
+    daily  = quote(apps.get_model('risk', 'DailyActivity')._meta.db_table)
+    logs   = quote(apps.get_model('attendance', 'AttendanceLog')._meta.db_table)
+    grades = quote(apps.get_model('grades', 'GradeRecord')._meta.db_table)
+    schema_editor.execute(
+        f"INSERT INTO {daily} (student_id, date, attendance_present, attendance_total, grade_sum, grade_count) "
+        f"SELECT student_id, date, SUM(present), SUM(total), SUM(grade_sum), SUM(grade_count) FROM ("
+        f" SELECT student_id, date, CASE WHEN status = 'present' THEN 1 ELSE 0 END AS present,"
+        f" 1 AS total, 0.0 AS grade_sum, 0 AS grade_count FROM {logs}"
+        f" UNION ALL"
+        f" SELECT student_id, date, 0, 0, score, 1 FROM {grades}"
+        f") raw GROUP BY student_id, date"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('risk', '0005_hot_query_indexes'),
+        ('attendance', '0003_hot_query_indexes'),
+        ('grades', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('attendance_present', models.IntegerField(default=0)),
+                ('attendance_total', models.IntegerField(default=0)),
+                ('grade_sum', models.FloatField(default=0)),
+                ('grade_count', models.IntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyactivity',
+            constraint=models.UniqueConstraint(fields=('student', 'date'), name='daily_activity_student_date'),
+        ),
+        migrations.RunPython(backfill_daily_activity, migrations.RunPython.noop),
+    ]
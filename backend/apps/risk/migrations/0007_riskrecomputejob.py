@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('risk', '0006_dailyactivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiskRecomputeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigger', models.CharField(max_length=20)),
+                ('enqueued_at', models.DateTimeField()),
+                ('claimed_by', models.CharField(blank=True, default='', max_length=64)),
+                ('lease_until', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('requeued', models.BooleanField(default=False)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['enqueued_at'], name='riskjob_enqueued')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('risk', '0007_riskrecomputejob'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='currentrisk',
+            name='currentrisk_category_score',
+        ),
+        migrations.RemoveIndex(
+            model_name='currentrisk',
+            name='currentrisk_high_recent',
+        ),
+        migrations.RemoveIndex(
+            model_name='riskscore',
+            name='riskscore_student_recent',
+        ),
+        migrations.AddIndex(
+            model_name='currentrisk',
+            index=models.Index(fields=['category', '-score', '-student'], name='currentrisk_category_score'),
+        ),
+        migrations.AddIndex(
+            model_name='currentrisk',
+            index=models.Index(condition=models.Q(('category', 'high')), fields=['-calculated_at', '-student'], name='currentrisk_high_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='riskscore',
+            index=models.Index(fields=['student', '-calculated_at', '-id'], name='riskscore_student_recent'),
+        ),
+    ]
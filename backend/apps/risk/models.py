@@ -10,10 +10,93 @@ class RiskScore(models.Model):
     attendance_pct = models.FloatField(default=0)
     grade_avg    = models.FloatField(default=0)
     incidents    = models.IntegerField(default=0)
+    # ml_engine registry version that produced the score, or 'fallback' for the rule-based score
+    model_version = models.CharField(max_length=40, blank=True, default='')
     calculated_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-calculated_at']
+        indexes  = [
+            # A student's score history, newest first (StudentRiskView)
+            models.Index(fields=['student', '-calculated_at', '-id'], name='riskscore_student_recent'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} | Score:{self.score} | {self.category.upper()}"
+
+class CurrentRisk(models.Model):
+    """
+    The latest RiskScore of each student — exactly one row per student.
+    Written in the same transaction as every new RiskScore (see calculator.py),
+    so reads like "who is high risk right now" never have to scan the history.
+    """
+    student        = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='current_risk')
+    risk_score     = models.ForeignKey(RiskScore, on_delete=models.CASCADE, related_name='+')
+    score          = models.FloatField()
+    category       = models.CharField(max_length=10, choices=RiskScore.CATEGORY_CHOICES)
+    attendance_pct = models.FloatField(default=0)
+    grade_avg      = models.FloatField(default=0)
+    incidents      = models.IntegerField(default=0)
+    model_version  = models.CharField(max_length=40, blank=True, default='')
+    calculated_at  = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-calculated_at']
+        indexes  = [
+            models.Index(fields=['category', '-score', '-student'], name='currentrisk_category_score'),
+            # Only the high-risk rows — what counselors poll (AllHighRiskView)
+            models.Index(fields=['-calculated_at', '-student'], condition=models.Q(category='high'), name='currentrisk_high_recent'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} | Current:{self.score} | {self.category.upper()}"
+
+class DailyActivity(models.Model):
+    """
+    A student's attendance and grade totals for one day, so the 30-day risk
+    features read at most 31 small rows however long the raw history is.
+    Kept in step with AttendanceLog and GradeRecord on every insert, update
+    and delete (see counters.py); `manage.py check_daily_activity` verifies it.
+    """
+    student            = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    date               = models.DateField()
+    attendance_present = models.IntegerField(default=0)
+    attendance_total   = models.IntegerField(default=0)
+    grade_sum          = models.FloatField(default=0)
+    grade_count        = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'date'], name='daily_activity_student_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} | {self.date} | {self.attendance_present}/{self.attendance_total} present | {self.grade_count} grades"
+
+
+class RiskRecomputeJob(models.Model):
+    """
+    A student waiting to be re-scored by `manage.py risk_worker` — at most one
+    row per student. Written in the same transaction as the attendance, grade
+    or intervention that triggered it when RISK_RECOMPUTE_MODE is 'queue'
+    (see queue.py). A worker claims a batch by writing its token and a lease;
+    a lease that runs out makes the job claimable again.
+    """
+    student     = models.OneToOneField(User, on_delete=models.CASCADE, related_name='+')
+    trigger     = models.CharField(max_length=20)
+    enqueued_at = models.DateTimeField()
+    claimed_by  = models.CharField(max_length=64, blank=True, default='')
+    lease_until = models.DateTimeField(null=True, blank=True)
+    attempts    = models.IntegerField(default=0)
+    # Triggered again while a worker held it — scored once more after that worker finishes
+    requeued    = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Claim order: oldest first
+            models.Index(fields=['enqueued_at'], name='riskjob_enqueued'),
+        ]
+
+    def __str__(self):
+        state = f"claimed by {self.claimed_by}" if self.claimed_by else 'pending'
+        return f"{self.student_id} | {self.trigger} | {state}"
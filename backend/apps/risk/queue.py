@@ -0,0 +1,165 @@
+"""
+backend/apps/risk/queue.py
+The durable risk recalculation queue behind RISK_RECOMPUTE_MODE = 'queue'.
+
+    enqueue([student_id], trigger='grade')        # in the writing transaction
+    python manage.py risk_worker --processes 4    # scores what was queued
+
+enqueue() upserts one RiskRecomputeJob per student, so a student triggered
+many times before a worker gets to it is scored once. Workers take the
+oldest jobs in batches:
+
+    PostgreSQL   SELECT ... FOR UPDATE SKIP LOCKED, then mark them with the
+                 worker's token — concurrent workers skip each other's rows
+    SQLite       one UPDATE ... WHERE id IN (oldest claimable) writing the
+                 token; SQLite runs it under its single write lock
+
+A claim is a lease: a worker that dies leaves its jobs to be claimed again
+once `lease_until` passes. Each batch is scored with one
+calculate_risk_for_students call (grouped feature queries, one
+predict_proba). A job triggered again while claimed is flagged `requeued`
+and handed back to the queue when the batch completes, so the newer data is
+scored too. Jobs that fail MAX_ATTEMPTS times stay in the table as failed
+until `risk_worker --retry-failed`.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from apps.monitoring.metrics import RISK_FAILURES, RISK_JOB_LATENCY, RISK_JOBS
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS  = 5
+LEASE_SECONDS = 120
+
+
+def worker_token():
+    """Identifies one worker process in `claimed_by`: host, pid and a random suffix."""
+    return f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def enqueue(student_ids, trigger, using=DEFAULT_DB_ALIAS):
+    """Queue a recalculation of each student, in the caller's transaction."""
+    from .models import RiskRecomputeJob
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(RiskRecomputeJob._meta.db_table)
+    now   = connection.ops.adapt_datetimefield_value(timezone.now())
+    claimed = f"{table}.{quote('claimed_by')} <> ''"
+    requeued = f"{table}.{quote('requeued')}"
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({quote('student_id')}, {quote('trigger')}, {quote('enqueued_at')}, "
+            f"{quote('claimed_by')}, {quote('attempts')}, {quote('requeued')}) "
+            f"VALUES (%s, %s, %s, '', 0, %s) "
+            f"ON CONFLICT ({quote('student_id')}) DO UPDATE SET "
+            # Waiting already: keep its place in the queue. Being scored: go again afterwards.
+            f"{quote('enqueued_at')} = CASE WHEN {claimed} AND NOT {requeued} "
+            f"THEN excluded.{quote('enqueued_at')} ELSE {table}.{quote('enqueued_at')} END, "
+            f"{quote('requeued')} = ({requeued} OR {claimed})",
+            [(student_id, trigger, now, False) for student_id in sorted(set(student_ids))],
+        )
+
+
+def _claimable(now, max_attempts):
+    from .models import RiskRecomputeJob
+
+    return RiskRecomputeJob.objects.filter(
+        Q(claimed_by='') | Q(lease_until__lt=now),
+        attempts__lt=max_attempts,
+    ).order_by('enqueued_at')
+
+
+def claim(token, batch_size, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """Claim up to `batch_size` of the oldest jobs → [(student_id, enqueued_at)]."""
+    from .models import RiskRecomputeJob
+
+    now    = timezone.now()
+    update = dict(claimed_by=token, lease_until=now + timedelta(seconds=lease_seconds),
+                  attempts=F('attempts') + 1, requeued=False)
+    jobs   = _claimable(now, max_attempts)
+
+    if connections[jobs.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(jobs.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+            RiskRecomputeJob.objects.filter(id__in=ids).update(**update)
+    else:
+        RiskRecomputeJob.objects.filter(id__in=jobs.values('id')[:batch_size]).update(**update)
+
+    return list(RiskRecomputeJob.objects.filter(claimed_by=token).values_list('student_id', 'enqueued_at'))
+
+
+def complete(token):
+    """Drop the worker's finished jobs; put back the ones triggered again meanwhile."""
+    from .models import RiskRecomputeJob
+
+    with transaction.atomic():
+        jobs = RiskRecomputeJob.objects.filter(claimed_by=token)
+        jobs.filter(requeued=False).delete()
+        jobs.update(claimed_by='', lease_until=None, attempts=0, requeued=False)
+
+
+def release(token):
+    """Hand a failed batch back to the queue; its attempts stay counted."""
+    from .models import RiskRecomputeJob
+
+    RiskRecomputeJob.objects.filter(claimed_by=token).update(claimed_by='', lease_until=None, requeued=False)
+
+
+def process_batch(token, batch_size, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """Claim, score and complete one batch → students scored (0 when idle or on failure)."""
+    from apps.risk.calculator import calculate_risk_for_students
+
+    jobs = claim(token, batch_size, lease_seconds, max_attempts)
+    if not jobs:
+        return 0
+    try:
+        calculate_risk_for_students([student_id for student_id, _ in jobs])
+    except Exception:
+        release(token)
+        RISK_FAILURES.inc(trigger='worker')
+        RISK_JOBS.inc(len(jobs), outcome='failed')
+        logger.exception("Risk worker failed a batch of %d students", len(jobs))
+        return 0
+    complete(token)
+
+    now = timezone.now()
+    for _, enqueued_at in jobs:
+        RISK_JOB_LATENCY.observe((now - enqueued_at).total_seconds())
+    RISK_JOBS.inc(len(jobs), outcome='scored')
+    return len(jobs)
+
+
+def retry_failed(max_attempts=MAX_ATTEMPTS):
+    """Make jobs that used up their attempts claimable again → how many."""
+    from .models import RiskRecomputeJob
+
+    return RiskRecomputeJob.objects.filter(claimed_by='', attempts__gte=max_attempts).update(attempts=0)
+
+
+def queue_stats():
+    """{'pending', 'claimed', 'failed', 'lag_seconds'} — lag is the age of the oldest pending job."""
+    from .models import RiskRecomputeJob
+
+    now   = timezone.now()
+    live  = ~Q(claimed_by='') & Q(lease_until__gte=now)
+    ready = ~live & Q(attempts__lt=MAX_ATTEMPTS)
+    stats = RiskRecomputeJob.objects.aggregate(
+        pending=Count('pk', filter=ready),
+        claimed=Count('pk', filter=live),
+        failed=Count('pk', filter=~live & Q(attempts__gte=MAX_ATTEMPTS)),
+        oldest=Min('enqueued_at', filter=ready),
+    )
+    oldest = stats.pop('oldest')
+    stats['lag_seconds'] = (now - oldest).total_seconds() if oldest else 0.0
+    return stats
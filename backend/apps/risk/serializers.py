@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import RiskScore
+from .models import RiskScore, CurrentRisk
 
 class RiskScoreSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.username', read_only=True)
@@ -7,3 +7,13 @@ class RiskScoreSerializer(serializers.ModelSerializer):
     class Meta:
         model  = RiskScore
         fields = '__all__'
+
+class CurrentRiskSerializer(serializers.ModelSerializer):
+    """Same shape as RiskScoreSerializer — `id` is the id of the underlying RiskScore."""
+    id           = serializers.IntegerField(source='risk_score_id', read_only=True)
+    student_name = serializers.CharField(source='student.username', read_only=True)
+
+    class Meta:
+        model  = CurrentRisk
+        fields = ['id', 'student_name', 'score', 'category', 'attendance_pct',
+                  'grade_avg', 'incidents', 'model_version', 'calculated_at', 'student']
@@ -0,0 +1,457 @@
+import shutil
+import signal
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.serializers import AttendanceRosterSerializer
+from apps.grades.models import GradeRecord
+from apps.interventions.models import Intervention
+from apps.risk import cache as risk_cache
+from apps.risk import queue
+from apps.risk.calculator import _update_current_risk, get_features_for_students, get_student_features
+from apps.risk.models import CurrentRisk, DailyActivity, RiskRecomputeJob, RiskScore
+from apps.users.models import User
+
+# Features read from the database on every call — no shared risk cache in front of them
+UNCACHED = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'risk':    {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'risk-tests'},
+}
+
+
+def seed_history(student, teacher, days):
+    """`days` days of attendance and grades, one intervention every 10 days; saved one by one so the signals count them."""
+    today = timezone.now().date()
+    for day in range(days):
+        date = today - timedelta(days=day)
+        AttendanceLog.objects.create(student=student, marked_by=teacher, date=date,
+                                     status='absent' if day % 4 == 0 else 'present')
+        GradeRecord.objects.create(student=student, entered_by=teacher, subject='Math',
+                                   exam_type='quiz', score=60 + day % 20, date=date)
+        if day % 10 == 0:
+            Intervention.objects.create(student=student, counselor=teacher, action_type='counseling')
+
+
+@override_settings(CACHES=UNCACHED)
+class FeatureQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher  = User.objects.create(username='teacher', role='teacher')
+        cls.students = [User.objects.create(username=f"student{i}", role='student') for i in range(12)]
+        for i, student in enumerate(cls.students):
+            seed_history(student, cls.teacher, days=5 + i * 5)   # 5 to 60 days of history
+
+    def test_student_features_take_one_query(self):
+        for student in (self.students[0], self.students[-1]):
+            with self.assertNumQueries(1):
+                get_student_features(student.id)
+
+    def test_student_features_from_the_window(self):
+        student = self.students[-1]   # 60 days of history, the last 30 counted
+        since   = timezone.now().date() - timedelta(days=30)
+        marks   = AttendanceLog.objects.filter(student=student, date__gte=since)
+        grades  = GradeRecord.objects.filter(student=student, date__gte=since)
+        expected = (
+            round(marks.filter(status='present').count() / marks.count() * 100, 2),
+            round(sum(g.score for g in grades) / grades.count(), 2),
+            Intervention.objects.filter(student=student).count(),
+        )
+        self.assertEqual(get_student_features(student.id), expected)
+
+    def test_features_for_students_take_two_queries_at_any_size(self):
+        ids = [s.id for s in self.students]
+        for batch in (ids[:2], ids):
+            with self.assertNumQueries(2):
+                features = get_features_for_students(batch)
+            self.assertEqual(set(features), set(batch))
+
+    def test_features_for_students_match_one_at_a_time(self):
+        ids = [s.id for s in self.students]
+        self.assertEqual(get_features_for_students(ids), {i: get_student_features(i) for i in ids})
+
+    def test_unknown_student_gets_defaults(self):
+        self.assertEqual(get_student_features(10 ** 9), (100.0, 75.0, 0))
+
+    def test_zero_grade_average_is_not_the_default(self):
+        # Only a student without grades gets the 75.0 default; zeros are a real average
+        student = User.objects.create(username='zeros', role='student')
+        GradeRecord.objects.create(student=student, entered_by=self.teacher, subject='Math',
+                                   exam_type='quiz', score=0, date=timezone.now().date())
+        self.assertEqual(get_student_features(student.id)[1], 0.0)
+        self.assertEqual(get_features_for_students([student.id])[student.id][1], 0.0)
+
+
+class CurrentRiskTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(username='student', role='student')
+
+    def score(self, category, minutes_ago):
+        risk = RiskScore.objects.create(student=self.student, score=50, category=category)
+        risk.calculated_at = timezone.now() - timedelta(minutes=minutes_ago)
+        risk.save(update_fields=['calculated_at'])
+        return risk
+
+    def test_newer_score_replaces_current(self):
+        older, newer = self.score('low', 10), self.score('high', 5)
+        _update_current_risk([older])
+        _update_current_risk([newer])
+        self.assertEqual(CurrentRisk.objects.get(student=self.student).risk_score_id, newer.id)
+
+    def test_older_score_committed_last_is_ignored(self):
+        older, newer = self.score('low', 10), self.score('high', 5)
+        _update_current_risk([newer])
+        _update_current_risk([older])
+        current = CurrentRisk.objects.get(student=self.student)
+        self.assertEqual((current.risk_score_id, current.category), (newer.id, 'high'))
+
+    @override_settings(CACHES=UNCACHED)
+    def test_cached_responses_invalidated_after_commit(self):
+        scope = f"student:{self.student.id}"
+        before = risk_cache._tokens([scope])
+        with self.captureOnCommitCallbacks() as callbacks:
+            _update_current_risk([self.score('high', 5)])
+            self.assertEqual(risk_cache._tokens([scope]), before)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertNotEqual(risk_cache._tokens([scope]), before)
+
+
+@override_settings(CACHES=UNCACHED)
+class KeysetPaginationTests(TestCase):
+    """1200 students tied on score and time: more than DRF's offset cutoff of 1000."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        User.objects.bulk_create([User(username=f"tied{i}", role='student') for i in range(1200)])
+        students = User.objects.filter(role='student')
+        RiskScore.objects.bulk_create([RiskScore(student=s, score=90, category='high') for s in students])
+        CurrentRisk.objects.bulk_create([
+            CurrentRisk(student_id=r.student_id, risk_score=r, score=90, category='high', calculated_at=now)
+            for r in RiskScore.objects.all()])
+        cls.counselor = User.objects.create(username='counselor', role='counselor')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.counselor)
+
+    def walk(self, url, link='next'):
+        """Ids of every row, page by page, following `link` from `url`."""
+        ids, pages = [], 0
+        while url and pages < 100:
+            body = self.client.get(url).json()
+            ids += [row['student'] for row in body['results']]
+            url, pages = body[link], pages + 1
+        self.assertIsNone(url, 'pagination did not end')
+        return ids
+
+    def test_tied_rows_each_listed_once(self):
+        for url in ('/api/risk/current/?page_size=100', '/api/risk/high/?page_size=100'):
+            ids = self.walk(url)
+            self.assertEqual(len(ids), 1200)
+            self.assertEqual(ids, sorted(set(ids), reverse=True))   # ties broken by pk, descending
+
+    def test_previous_links_walk_back(self):
+        forward = self.client.get('/api/risk/current/?page_size=100').json()
+        for _ in range(5):
+            forward = self.client.get(forward['next']).json()
+        backward = self.walk(forward['previous'], link='previous')
+        self.assertEqual(len(backward), 500)
+        self.assertEqual(len(set(backward)), 500)
+
+    def test_malformed_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/risk/current/?cursor=cD1ub3Rqc29u').status_code, 404)
+
+
+class CachedResponseTests(TestCase):
+    """The risk views with a shared (file) cache in front of them."""
+
+    @classmethod
+    def setUpClass(cls):
+        location = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, location)
+        cls.enterClassContext(override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'risk':    {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create(username='student', role='student')
+        cls.counselor = User.objects.create(username='counselor', role='counselor')
+        RiskScore.objects.create(student=cls.student, score=50, category='medium')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.counselor)}")
+
+    def test_etag_always_describes_the_body_sent(self):
+        # A score saved without invalidating the cache (e.g. before its commit ran)
+        for url in (f"/api/risk/?student_id={self.student.id}", f"/api/async/risk/?student_id={self.student.id}"):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                RiskScore.objects.create(student=self.student, score=90, category='high')
+                second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(second.status_code, 200)
+                self.assertNotEqual(second['ETag'], first['ETag'])
+                self.assertEqual(len(second.json()['results']), len(first.json()['results']) + 1)
+
+
+class DailyActivityTests(TestCase):
+    """The counters after edits, date moves, deletes and rosters — checked by check_daily_activity."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create(username='teacher', role='teacher')
+        cls.student = User.objects.create(username='student', role='student')
+        cls.today = timezone.now().date()
+        cls.yesterday = cls.today - timedelta(days=1)
+
+    def tearDown(self):
+        call_command('check_daily_activity', stdout=StringIO())   # raises CommandError on any mismatch
+
+    def counted(self, date):
+        """(present, total, grade sum, grade count) of the student's day, or None without a row."""
+        return (DailyActivity.objects.filter(student=self.student, date=date)
+                .values_list('attendance_present', 'attendance_total', 'grade_sum', 'grade_count').first())
+
+    def grade(self, score, date):
+        return GradeRecord.objects.create(student=self.student, entered_by=self.teacher, subject='Math',
+                                          exam_type='quiz', score=score, date=date)
+
+    def test_mark_status_edited(self):
+        mark = AttendanceLog.objects.create(student=self.student, marked_by=self.teacher,
+                                            date=self.today, status='present')
+        mark.status = 'absent'
+        mark.save()
+        self.assertEqual(self.counted(self.today), (0, 1, 0.0, 0))
+
+    def test_grade_moved_to_another_day(self):
+        self.grade(80, self.today)
+        moved = self.grade(60, self.today)
+        moved.date = self.yesterday
+        moved.score = 50
+        moved.save()
+        self.assertEqual(self.counted(self.today), (0, 0, 80.0, 1))
+        self.assertEqual(self.counted(self.yesterday), (0, 0, 50.0, 1))
+
+        moved.date = self.today
+        moved.save()
+        self.assertIsNone(self.counted(self.yesterday))   # emptied day removed
+
+    def test_deleted_rows_empty_their_day(self):
+        mark = AttendanceLog.objects.create(student=self.student, marked_by=self.teacher,
+                                            date=self.today, status='present')
+        grade = self.grade(70, self.today)
+        AttendanceLog.objects.create(student=self.student, marked_by=self.teacher,
+                                     date=self.yesterday, status='late')
+        mark.delete()
+        self.assertEqual(self.counted(self.today), (0, 0, 70.0, 1))
+        grade.delete()
+        self.assertIsNone(self.counted(self.today))
+        AttendanceLog.objects.filter(date=self.yesterday).delete()
+        self.assertFalse(DailyActivity.objects.exists())
+
+    def test_roster_submitted_and_resubmitted(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        self.grade(90, self.today)
+        for status in ('present', 'absent'):
+            response = client.post('/api/attendance/bulk/', {
+                'date': self.today.isoformat(), 'class_name': 'CS-4A',
+                'records': [{'student': self.student.id, 'status': status}],
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counted(self.today), (0, 1, 90.0, 1))
+
+    def test_fix_repairs_corrupted_counters(self):
+        self.grade(70, self.today)
+        AttendanceLog.objects.create(student=self.student, marked_by=self.teacher,
+                                     date=self.yesterday, status='present')
+        DailyActivity.objects.filter(date=self.today).update(grade_sum=7, grade_count=3)
+        DailyActivity.objects.filter(date=self.yesterday).delete()
+        with self.assertRaises(CommandError):
+            call_command('check_daily_activity', stdout=StringIO())
+
+        call_command('check_daily_activity', '--fix', stdout=StringIO())
+        self.assertEqual(self.counted(self.today), (0, 0, 70.0, 1))
+        self.assertEqual(self.counted(self.yesterday), (1, 1, 0.0, 0))
+
+
+class RecalculateMixin:
+    def create_users(self):
+        self.teacher  = User.objects.create(username='teacher', role='teacher')
+        self.students = [User.objects.create(username=f"student{i}", role='student') for i in range(3)]
+
+    def touch(self, student):
+        """An attendance mark, a grade and an intervention — three saves that each trigger a score."""
+        date = timezone.now().date() - timedelta(days=AttendanceLog.objects.filter(student=student).count())
+        AttendanceLog.objects.create(student=student, marked_by=self.teacher, date=date, status='absent')
+        GradeRecord.objects.create(student=student, entered_by=self.teacher, subject='Math',
+                                   exam_type='quiz', score=40, date=date)
+        Intervention.objects.create(student=student, counselor=self.teacher, action_type='counseling')
+
+    def scored(self):
+        """student id → RiskScores written."""
+        return {s.id: RiskScore.objects.filter(student=s).count() for s in self.students}
+
+
+@override_settings(RISK_RECOMPUTE_MODE='inline', CACHES=UNCACHED)
+class RecalculateOnCommitTests(RecalculateMixin, TestCase):
+    """Students are scored once per transaction, after it commits (triggers.py)."""
+
+    def setUp(self):
+        self.create_users()
+
+    def test_many_saves_score_once_after_commit(self):
+        student = self.students[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.touch(student)
+                self.touch(student)
+                self.assertFalse(RiskScore.objects.exists())   # nothing before the commit
+        self.assertEqual(self.scored()[student.id], 1)
+
+    def test_rolled_back_savepoint_drops_only_its_students(self):
+        outer, released, rolled_back = self.students
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.touch(outer)
+                with transaction.atomic():
+                    self.touch(released)
+                    self.touch(outer)
+                try:
+                    with transaction.atomic():
+                        self.touch(rolled_back)
+                        self.touch(released)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+        self.assertEqual(self.scored(), {outer.id: 1, released.id: 1, rolled_back.id: 0})
+
+    def test_roster_scores_each_student_once(self):
+        ids = [s.id for s in self.students]
+        roster = AttendanceRosterSerializer(data={
+            'date': timezone.now().date().isoformat(), 'class_name': 'CS-4A',
+            'records': [{'student': i, 'status': 'absent'} for i in ids],
+        })
+        self.assertTrue(roster.is_valid(), roster.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.touch(self.students[0])            # also triggered by its own signals
+                roster.save(marked_by=self.teacher)     # trigger='roster', no signals
+        self.assertEqual(self.scored(), {i: 1 for i in ids})
+
+
+@override_settings(RISK_RECOMPUTE_MODE='inline', CACHES=UNCACHED)
+class RecalculateOnRealCommitTests(RecalculateMixin, TransactionTestCase):
+    """Outermost transactions that really commit or roll back, without the TestCase wrapper."""
+
+    def setUp(self):
+        self.create_users()
+
+    def test_commit_scores_once(self):
+        student = self.students[0]
+        with transaction.atomic():
+            self.touch(student)
+            self.touch(student)
+        self.assertEqual(self.scored()[student.id], 1)
+
+    def test_rollback_scores_nothing_and_is_forgotten(self):
+        student = self.students[0]
+        with transaction.atomic():
+            self.touch(student)
+            transaction.set_rollback(True)
+        self.assertFalse(RiskScore.objects.exists())
+
+        # The next transaction does not add to the rolled-back one's pending set
+        with transaction.atomic():
+            self.touch(student)
+        self.assertEqual(self.scored()[student.id], 1)
+
+
+@override_settings(RISK_RECOMPUTE_MODE='queue', CACHES=UNCACHED)
+class RiskQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher  = User.objects.create(username='teacher', role='teacher')
+        cls.students = [User.objects.create(username=f"student{i}", role='student') for i in range(3)]
+        cls.ids      = [s.id for s in cls.students]
+
+    def jobs(self):
+        """student id → (claimed_by, attempts, requeued)."""
+        return {job.student_id: (job.claimed_by, job.attempts, job.requeued)
+                for job in RiskRecomputeJob.objects.all()}
+
+    def test_enqueue_keeps_one_job_per_student(self):
+        queue.enqueue([self.ids[0], self.ids[0], self.ids[1]], trigger='grade')
+        first = RiskRecomputeJob.objects.get(student_id=self.ids[0]).enqueued_at
+        queue.enqueue([self.ids[0]], trigger='attendance')
+        self.assertEqual(RiskRecomputeJob.objects.count(), 2)
+        # Still waiting: keeps its place in the queue
+        self.assertEqual(RiskRecomputeJob.objects.get(student_id=self.ids[0]).enqueued_at, first)
+
+    def test_enqueue_while_claimed_requeues(self):
+        queue.enqueue(self.ids[:2], trigger='grade')
+        queue.claim('worker-a', batch_size=10)
+        queue.enqueue(self.ids[:1], trigger='grade')
+        self.assertEqual(self.jobs(), {self.ids[0]: ('worker-a', 1, True), self.ids[1]: ('worker-a', 1, False)})
+
+    def test_expired_lease_can_be_claimed_by_another_worker(self):
+        queue.enqueue(self.ids, trigger='grade')
+        self.assertEqual(len(queue.claim('worker-a', batch_size=10)), 3)
+        self.assertEqual(queue.claim('worker-b', batch_size=10), [])
+
+        RiskRecomputeJob.objects.update(lease_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(sorted(sid for sid, _ in queue.claim('worker-b', batch_size=10)), self.ids)
+        self.assertEqual({claimed_by for claimed_by, *_ in self.jobs().values()}, {'worker-b'})
+
+    def test_complete_keeps_requeued_jobs(self):
+        queue.enqueue(self.ids, trigger='grade')
+        queue.claim('worker-a', batch_size=10)
+        queue.enqueue(self.ids[:1], trigger='grade')
+        queue.complete('worker-a')
+        self.assertEqual(self.jobs(), {self.ids[0]: ('', 0, False)})
+
+    def test_release_counts_attempts_until_retry_failed(self):
+        queue.enqueue(self.ids[:1], trigger='grade')
+        for attempt in (1, 2):
+            self.assertEqual(len(queue.claim('worker-a', batch_size=10, max_attempts=2)), 1)
+            queue.release('worker-a')
+            self.assertEqual(self.jobs(), {self.ids[0]: ('', attempt, False)})
+        self.assertEqual(queue.claim('worker-a', batch_size=10, max_attempts=2), [])
+
+        self.assertEqual(queue.retry_failed(max_attempts=2), 1)
+        self.assertEqual(len(queue.claim('worker-a', batch_size=10, max_attempts=2)), 1)
+
+    def test_rolled_back_write_leaves_no_job(self):
+        with transaction.atomic():
+            AttendanceLog.objects.create(student=self.students[0], marked_by=self.teacher,
+                                         date=timezone.now().date(), status='absent')
+            self.assertEqual(RiskRecomputeJob.objects.count(), 1)
+            transaction.set_rollback(True)
+        self.assertFalse(RiskRecomputeJob.objects.exists())
+
+    def test_worker_once_drains_the_queue(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+        for student in self.students:
+            for days in range(2):
+                AttendanceLog.objects.create(student=student, marked_by=self.teacher, status='absent',
+                                             date=timezone.now().date() - timedelta(days=days))
+        self.assertEqual(RiskRecomputeJob.objects.count(), 3)
+        self.assertFalse(RiskScore.objects.exists())   # nothing scored inline
+
+        call_command('risk_worker', '--once', '--batch-size', '2', stdout=StringIO())
+        self.assertFalse(RiskRecomputeJob.objects.exists())
+        self.assertEqual(sorted(RiskScore.objects.values_list('student_id', flat=True)), self.ids)
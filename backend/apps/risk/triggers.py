@@ -0,0 +1,122 @@
+"""
+backend/apps/risk/triggers.py
+Recalculate risk once per student per transaction, after it commits.
+
+    from apps.risk.triggers import recalculate_on_commit
+    recalculate_on_commit([student_id], trigger='grade')
+
+The post_save receivers, and bulk paths that send no signals (the roster
+upsert), register the students they touched. Inside a transaction the ids
+collect in a pending set on the database connection; when the transaction
+commits, one flush scores every distinct student — calculate_and_save_risk
+for a single student, calculate_risk_for_students for several. Nothing is
+scored if the transaction rolls back.
+
+The pending set is kept per savepoint level, each level flushed by its own
+transaction.on_commit callback, so students registered inside a savepoint
+that rolls back are dropped with it (Django discards that savepoint's
+callbacks). Outside a transaction the write has already committed, and the
+students are scored straight away.
+
+Scoring after the commit also means the writing transaction no longer holds
+its locks during feature reads and inference. With RISK_RECOMPUTE_MODE =
+'queue' the request does not score at all: a RiskRecomputeJob is written in
+the same transaction and `manage.py risk_worker` scores it (see queue.py).
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.monitoring.metrics import RISK_FAILURES
+
+logger = logging.getLogger(__name__)
+
+MODES = ('inline', 'queue')
+
+
+def _recalculate(student_ids, triggers):
+    from apps.risk.calculator import calculate_and_save_risk, calculate_risk_for_students
+
+    logger.debug("Recalculating risk for %d students (%s)", len(student_ids), ', '.join(triggers))
+    try:
+        if len(student_ids) == 1:
+            calculate_and_save_risk(student_id=student_ids[0])
+        else:
+            calculate_risk_for_students(student_ids)
+    except Exception:
+        for trigger in triggers:
+            RISK_FAILURES.inc(trigger=trigger)
+        logger.exception("Risk calculation failed for %d students (%s)", len(student_ids), ', '.join(triggers))
+
+
+class _Level:
+    """Students registered at one savepoint level; called by on_commit."""
+
+    def __init__(self, pending):
+        self.pending  = pending
+        self.students = set()
+        self.triggers = set()
+
+    def __call__(self):
+        pending = self.pending
+        if pending.connection.__dict__.get('risk_pending') is pending:
+            del pending.connection.risk_pending
+
+        # A student registered at several levels is scored by the first of them to run
+        student_ids = sorted(self.students - pending.scored)
+        pending.scored.update(student_ids)
+        if student_ids:
+            _recalculate(student_ids, sorted(self.triggers))
+
+
+class _Pending:
+    """Students registered during the current transaction of one connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.levels     = {}      # frozenset of active savepoint ids → _Level
+        self.scored     = set()
+
+    def is_current(self):
+        """False once the transaction it belonged to has rolled back and dropped its callbacks."""
+        levels = list(self.levels.values())
+        return any(func is level for _, func, _ in self.connection.run_on_commit for level in levels)
+
+    def add(self, student_ids, trigger):
+        savepoints = frozenset(self.connection.savepoint_ids)
+        level = self.levels.get(savepoints)
+        if level is None:
+            level = self.levels[savepoints] = _Level(self)
+            transaction.on_commit(level, using=self.connection.alias)
+        level.students.update(student_ids)
+        level.triggers.add(trigger)
+
+
+def recalculate_on_commit(student_ids, trigger, using=DEFAULT_DB_ALIAS):
+    """
+    Score `student_ids` once the current transaction commits — or now, in
+    autocommit. In queue mode, queue them in the current transaction instead.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    mode = settings.RISK_RECOMPUTE_MODE
+    if mode not in MODES:
+        raise ImproperlyConfigured(f"RISK_RECOMPUTE_MODE must be one of {MODES}, not {mode!r}")
+    if mode == 'queue':
+        from apps.risk.queue import enqueue
+        enqueue(student_ids, trigger, using=using)
+        return
+
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        _recalculate(sorted(set(student_ids)), [trigger])
+        return
+
+    pending = connection.__dict__.get('risk_pending')
+    if pending is None or not pending.is_current():
+        pending = connection.risk_pending = _Pending(connection)
+    pending.add(student_ids, trigger)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import StudentRiskView, AllHighRiskView
+from .views import StudentRiskView, AllHighRiskView, CurrentRiskView
 
 urlpatterns = [
-    path('',     StudentRiskView.as_view(),  name='student-risk'),
-    path('high/', AllHighRiskView.as_view(), name='high-risk-list'),
+    path('',         StudentRiskView.as_view(),  name='student-risk'),
+    path('high/',    AllHighRiskView.as_view(),  name='high-risk-list'),
+    path('current/', CurrentRiskView.as_view(),  name='current-risk-list'),
 ]
@@ -1,20 +1,118 @@
 from rest_framework import generics, permissions
-from .models import RiskScore
-from .serializers import RiskScoreSerializer
+from rest_framework.response import Response
+from config.async_views import AsyncListView
+from config.conditional import ConditionalListMixin
+from config.pagination import KeysetPagination
+from . import cache as risk_cache
+from .models import RiskScore, CurrentRisk
+from .serializers import RiskScoreSerializer, CurrentRiskSerializer
 
-class StudentRiskView(generics.ListAPIView):
-    """GET /api/risk/?student_id=5  — latest risk scores for a student"""
+class LatestRiskPagination(KeysetPagination):
+    page_size = 10
+
+class CachedListMixin:
+    """
+    Serve list() through the risk read-through cache (cache.py). The
+    response is the same for every user allowed to see it, so one entry
+    per URL serves them all; cache_scopes() names what invalidates it.
+    Entries are also keyed by the list's fingerprint (list_stamp, set by
+    ConditionalListMixin), so a body cached before a write is never sent
+    under the ETag computed after it.
+    """
+    cache_name = 'responses'
+
+    def cache_scopes(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        if not risk_cache.shared():
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+        parts = (risk_cache.response_parts(request), getattr(self, 'list_stamp', None))
+        return Response(risk_cache.read_through(self.cache_name, self.cache_scopes(), parts, build))
+
+class AsyncCachedListMixin:
+    """CachedListMixin for AsyncListView: the page is read and serialized only on a miss."""
+    cache_name = 'responses'
+
+    def cache_scopes(self):
+        raise NotImplementedError
+
+    async def alist(self, queryset):
+        if not risk_cache.shared():
+            return await super().alist(queryset)
+
+        async def build():
+            return await super(AsyncCachedListMixin, self).alist(queryset)
+        parts = (risk_cache.response_parts(self.request), self.list_stamp)
+        return await risk_cache.aread_through(self.cache_name, self.cache_scopes(), parts, build)
+
+class StudentRiskView(ConditionalListMixin, CachedListMixin, generics.ListAPIView):
+    """GET /api/risk/?student_id=5  — latest risk scores for a student (10 per page)"""
     serializer_class   = RiskScoreSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class   = LatestRiskPagination
+    ordering           = '-calculated_at'
+    conditional_timestamp = 'calculated_at'
+
+    def cache_scopes(self):
+        return [f"student:{self.request.query_params.get('student_id')}"]
 
     def get_queryset(self):
         student_id = self.request.query_params.get('student_id')
-        return RiskScore.objects.filter(student_id=student_id)[:10]
+        return RiskScore.objects.filter(student_id=student_id).select_related('student')
 
-class AllHighRiskView(generics.ListAPIView):
-    """GET /api/risk/high/  — all currently high-risk students"""
-    serializer_class   = RiskScoreSerializer
+class AllHighRiskView(ConditionalListMixin, CachedListMixin, generics.ListAPIView):
+    """GET /api/risk/high/  — all currently high-risk students (one row each)"""
+    serializer_class   = CurrentRiskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering           = '-calculated_at'
+    conditional_timestamp = 'calculated_at'
+
+    def cache_scopes(self):
+        return ['high']
+
+    def get_queryset(self):
+        return CurrentRisk.objects.filter(category='high').select_related('student')
+
+class CurrentRiskView(ConditionalListMixin, generics.ListAPIView):
+    """GET /api/risk/current/?category=medium  — current risk of every student, highest first"""
+    serializer_class   = CurrentRiskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    ordering           = '-score'
+    conditional_timestamp = 'calculated_at'
+
+    def get_queryset(self):
+        queryset = CurrentRisk.objects.select_related('student')
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+        return queryset
+
+class AsyncStudentRiskView(AsyncCachedListMixin, AsyncListView):
+    """GET /api/async/risk/?student_id=5  — StudentRiskView on the async ORM"""
+    serializer_class      = RiskScoreSerializer
+    pagination_class      = LatestRiskPagination
+    ordering              = '-calculated_at'
+    conditional_timestamp = 'calculated_at'
+
+    def cache_scopes(self):
+        return [f"student:{self.request.query_params.get('student_id')}"]
+
+    def get_queryset(self):
+        student_id = self.request.query_params.get('student_id')
+        return RiskScore.objects.filter(student_id=student_id).select_related('student')
+
+class AsyncAllHighRiskView(AsyncCachedListMixin, AsyncListView):
+    """GET /api/async/risk/high/  — AllHighRiskView on the async ORM"""
+    serializer_class      = CurrentRiskSerializer
+    ordering              = '-calculated_at'
+    conditional_timestamp = 'calculated_at'
+
+    def cache_scopes(self):
+        return ['high']
 
     def get_queryset(self):
-        return RiskScore.objects.filter(category='high').order_by('-calculated_at')
+        return CurrentRisk.objects.filter(category='high').select_related('student')
@@ -20,4 +20,9 @@ class RegisterSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model  = User
-        fields = ['id', 'username', 'email', 'role', 'phone', 'department']
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'role', 'phone', 'department']
+
+class StudentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model  = User
+        fields = ['id', 'username', 'email', 'department']
@@ -1,8 +1,6 @@
 from rest_framework import generics, permissions
-from rest_framework.response import Response
-from rest_framework.views import APIView
 from .models import User
-from .serializers import RegisterSerializer, UserSerializer
+from .serializers import RegisterSerializer, UserSerializer, StudentSerializer
 
 class RegisterView(generics.CreateAPIView):
     queryset           = User.objects.all()
@@ -16,10 +14,11 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
-class StudentListView(APIView):
+class StudentListView(generics.ListAPIView):
     """GET /api/users/students/ — returns all users with role=student"""
+    serializer_class   = StudentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering           = 'id'
 
-    def get(self, request):
-        students = User.objects.filter(role='student').values('id', 'username', 'email', 'department')
-        return Response(list(students))
+    def get_queryset(self):
+        return User.objects.filter(role='student').only('id', 'username', 'email', 'department')
@@ -4,19 +4,23 @@ ASGI Configuration — supports both HTTP and WebSockets
 
 import os
 from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+# Set up Django before importing anything that reads settings or models
+http_application = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from django.urls import path
 from apps.alerts.consumers import AlertConsumer
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+from config.websocket_auth import JWTAuthMiddleware
 
 application = ProtocolTypeRouter({
     # Normal HTTP requests
-    'http': get_asgi_application(),
+    'http': http_application,
 
-    # WebSocket connections for live alerts
-    'websocket': AuthMiddlewareStack(
+    # WebSocket connections for live alerts — ws/alerts/?token=<JWT access token>
+    'websocket': JWTAuthMiddleware(
         URLRouter([
             path('ws/alerts/', AlertConsumer.as_asgi()),
         ])
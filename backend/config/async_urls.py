@@ -0,0 +1,20 @@
+"""
+Async twins of the hot read endpoints — same query parameters and responses
+as the routes they mirror (see config/async_views.py).
+"""
+
+from django.urls import path
+from apps.alerts.views import AsyncMyAlertsView
+from apps.attendance.views import AsyncAttendanceListView
+from apps.grades.views import AsyncStudentGradesView
+from apps.interventions.views import AsyncInterventionListView
+from apps.risk.views import AsyncStudentRiskView, AsyncAllHighRiskView
+
+urlpatterns = [
+    path('alerts/',             AsyncMyAlertsView.as_view(),         name='my-alerts-async'),
+    path('risk/',               AsyncStudentRiskView.as_view(),      name='student-risk-async'),
+    path('risk/high/',          AsyncAllHighRiskView.as_view(),      name='high-risk-list-async'),
+    path('attendance/list/',    AsyncAttendanceListView.as_view(),   name='attendance-list-async'),
+    path('grades/list/',        AsyncStudentGradesView.as_view(),    name='grades-list-async'),
+    path('interventions/list/', AsyncInterventionListView.as_view(), name='intervention-list-async'),
+]
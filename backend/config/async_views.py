@@ -0,0 +1,118 @@
+"""
+Native async list views for the hot read endpoints, routed under /api/async/
+(config/async_urls.py) next to their DRF twins.
+
+DRF 3.14 views are synchronous: under ASGI each request is handed to a
+thread that serves it from the first middleware to the last byte. These are
+plain Django async views built from the same parts — serializer, keyset
+pagination, ETag fingerprint, risk cache — with every read awaited:
+
+    AsyncJWTAuthentication   simplejwt's checks; the user is loaded with aget()
+    AsyncListView            authenticate → fingerprint (304?) → page → serialize
+
+so a request waiting on the database or a slow client is a suspended
+coroutine on the event loop. The JSON body and ETag are the same as the
+sync endpoint's. Only IsAuthenticated is checked — the permission every
+twin uses.
+"""
+
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from config.conditional import add_etag, fingerprint_aggregates, list_etag, not_modified
+from config.pagination import KeysetPagination
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    async def aauthenticate(self, request):
+        """authenticate() for async views → (user, token), or None without a Bearer header."""
+        header = self.get_header(request)
+        raw_token = None if header is None else self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)   # signature and expiry: no I/O
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """get_user() with the async ORM."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class AsyncListView(View):
+    """
+    GET-only list endpoint. Subclasses set serializer_class, ordering and
+    conditional_timestamp and build get_queryset() from self.request (a DRF
+    Request, so query_params works) without evaluating it.
+    """
+    serializer_class      = None
+    pagination_class      = KeysetPagination
+    ordering              = None
+    conditional_timestamp = None
+    list_stamp            = None
+    authentication_class  = AsyncJWTAuthentication
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.request = await self.initial(request)
+        except exceptions.APIException as exc:
+            return self.error_response(request, exc)
+
+        queryset = self.get_queryset()
+        self.list_stamp = await queryset.order_by().aaggregate(**fingerprint_aggregates(self.conditional_timestamp))
+        etag = list_etag(self.request, self.list_stamp)
+        response = not_modified(request, etag)
+        if response is None:
+            response = self.render(await self.alist(queryset))
+        return add_etag(response, etag)
+
+    async def initial(self, request):
+        """The DRF Request of the authenticated user; raises NotAuthenticated / AuthenticationFailed."""
+        authenticated = await self.authentication_class().aauthenticate(request)
+        if authenticated is None:
+            raise exceptions.NotAuthenticated()
+        drf_request = Request(request)
+        drf_request.user, drf_request.auth = authenticated
+        return drf_request
+
+    async def alist(self, queryset):
+        """The response data: one page of `queryset`, serialized."""
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, self.request, view=self)
+        serializer = self.serializer_class(page, many=True, context={'request': self.request, 'view': self})
+        return paginator.get_paginated_response(serializer.data).data
+
+    def render(self, data, status=200):
+        return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+    def error_response(self, request, exc):
+        """The 401 DRF would send: the error detail and a WWW-Authenticate challenge."""
+        response = self.render(exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail},
+                               exc.status_code)
+        response['WWW-Authenticate'] = self.authentication_class().authenticate_header(request)
+        return response
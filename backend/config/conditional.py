@@ -0,0 +1,76 @@
+"""
+Conditional GET (ETag) shared by the list endpoints.
+
+Each list view names the timestamp its rows get whenever they are written
+(`conditional_timestamp`, e.g. 'updated_at'). Before the page is fetched,
+one aggregate over the view's filtered queryset fingerprints the list:
+
+    COUNT(*)            a row left the list (deleted, alert marked read)
+    MAX(pk)             a row was added
+    MAX(<timestamp>)    a row was changed
+
+The strong ETag is a hash of that fingerprint, the full request URL (cursor,
+page size) and the user. Django's get_conditional_response answers
+If-None-Match with 304 Not Modified before the page query and the
+serializer run. Polling clients send the ETag back and get an empty 304
+until the list changes. There is no Last-Modified: MAX(<timestamp>) moves
+backwards when the newest row leaves the list, so If-Modified-Since would
+answer 304 for a list that changed.
+The async views (config/async_views.py) use the same helpers. The view
+keeps the aggregate as `list_stamp`; a view that caches its body
+(apps/risk/views.py) keys the entry by it, so the ETag sent always
+describes the body sent with it.
+
+Related rows shown in the output (e.g. student_name) are not part of the
+fingerprint; bump REPRESENTATION whenever a list serializer's output
+changes, so no client keeps an ETag for the old format.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+
+REPRESENTATION = 1
+
+
+def fingerprint_aggregates(timestamp):
+    """aggregate() arguments of a list fingerprint, for the `timestamp` field."""
+    return dict(rows=Count('pk'), last_pk=Max('pk'), modified=Max(timestamp))
+
+
+def list_etag(request, stamp):
+    """Strong ETag of a list from its aggregated fingerprint."""
+    source = repr((REPRESENTATION, request.user.pk, request.get_full_path(),
+                   stamp['rows'], stamp['last_pk'], stamp['modified'] and stamp['modified'].isoformat()))
+    return quote_etag(hashlib.sha1(source.encode()).hexdigest())
+
+
+def not_modified(request, etag):
+    """A 304 response when the client's copy is current, else None."""
+    return get_conditional_response(request, etag=etag)
+
+
+def add_etag(response, etag):
+    response['ETag'] = etag
+    # Clients may keep the body, but must revalidate it on every poll
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalListMixin:
+    conditional_timestamp = None   # field stamped on every write, e.g. 'updated_at'
+    list_stamp            = None   # the aggregated fingerprint, once list_fingerprint() ran
+
+    def list_fingerprint(self):
+        """ETag of the list this request would return."""
+        self.list_stamp = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            **fingerprint_aggregates(self.conditional_timestamp))
+        return list_etag(self.request, self.list_stamp)
+
+    def list(self, request, *args, **kwargs):
+        etag = self.list_fingerprint()
+        response = not_modified(request, etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return add_etag(response, etag)
@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination shared by every list endpoint.
+
+Each list view declares the `ordering` it already sorts by (e.g. '-date');
+the primary key is appended as a tiebreaker in the same direction, so every
+row has a unique position (date, id). Pages are fetched with
+`WHERE (date, id) < (last date seen, last id seen)` instead of OFFSET, so
+page 500 costs the same as page 1 and rows tied on the date are neither
+skipped nor repeated. Each list has a composite index on
+(filter, field, id) to serve that query in order.
+
+Clients follow the `next` / `previous` links; `?page_size=` overrides the
+default from settings (capped at max_page_size).
+
+DRF's paginate_queryset builds the page query and reads it in one go; here
+it is split into page_query() and set_page(), so the async views
+(config/async_views.py) can read the same page with the async ORM.
+"""
+
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size         = 500
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        ordering = (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering += ('-pk' if ordering[0].startswith('-') else 'pk',)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        """The row's values of every ordering field, as the JSON list stored in the cursor."""
+        get = instance.__getitem__ if isinstance(instance, dict) else lambda name: getattr(instance, name)
+        return json.dumps([str(get(field.lstrip('-'))) for field in ordering], separators=(',', ':'))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.page_query(queryset, request, view)
+        return None if page is None else self.set_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page = self.page_query(queryset, request, view)
+        return None if page is None else self.set_page([row async for row in page])
+
+    def page_query(self, queryset, request, view=None):
+        """The unevaluated query of the requested page, plus one row to tell whether another follows."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor   = self.decode_cursor(request)
+        offset, reverse, position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._after(self._decode_position(position), reverse))
+        return queryset[offset:offset + self.page_size + 1]
+
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _after(self, values, reverse):
+        """
+        Rows past `values` in the direction being read, compared as a tuple:
+        (a, b) < (x, y)  ⇔  a < x  OR  (a = x AND b < y).
+        """
+        condition = Q(pk__in=[])
+        for i, field in enumerate(self.ordering):
+            # (cursor reversed) XOR (field descending) → rows before the position
+            lookup = 'lt' if reverse != field.startswith('-') else 'gt'
+            equal  = {f.lstrip('-'): v for f, v in zip(self.ordering[:i], values)}
+            condition |= Q(**equal, **{f"{field.lstrip('-')}__{lookup}": values[i]})
+        return condition
+
+    def set_page(self, results):
+        """Set the page and its next / previous positions from the rows page_query() selected."""
+        offset, reverse, position = self.cursor or (0, False, None)
+        self.page = list(results[:self.page_size])
+
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            # Read backwards: put the page back in display order
+            self.page = list(reversed(self.page))
+            self.has_next,     self.next_position     = position is not None or offset > 0, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next,     self.next_position     = following is not None, following
+            self.has_previous, self.previous_position = position is not None or offset > 0, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
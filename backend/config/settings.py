@@ -34,11 +34,13 @@ INSTALLED_APPS = [
     'apps.risk',
     'apps.alerts',
     'apps.interventions',
+    'apps.monitoring',
 ]
 
 # ── Middleware ────────────────────────────────────────────
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',          # must be FIRST
+    'apps.monitoring.middleware.MetricsMiddleware',   # times everything below it
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -123,6 +125,9 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
+    # Cursor pagination on every list endpoint — see config/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetPagination',
+    'PAGE_SIZE': config('API_PAGE_SIZE', default=50, cast=int),
 }
 
 # ── JWT Settings ──────────────────────────────────────────
@@ -141,12 +146,92 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # ── Django Channels (WebSockets for live alerts) ──────────
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-        # For production replace with Redis:
-        # 'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        # 'CONFIG': {'hosts': [('127.0.0.1', 6379)]},
+# 'memory' (default) delivers only inside one process: enough for
+# `runserver` or a single ASGI worker, where alerts are raised by the same
+# process that holds the counselors' sockets. As soon as alerts come from
+# another process (several ASGI workers, `risk_worker`), pick a shared layer:
+#   'redis'     channels_redis at CHANNEL_LOCATION (needs channels-redis)
+#   'database'  apps/alerts/layers.py: tables in the project database, no
+#               extra service, polled by each process; on SQLite it also
+#               switches the database to WAL (apps/alerts/apps.py)
+CHANNEL_BACKEND = config('CHANNEL_BACKEND', default='memory')
+
+if CHANNEL_BACKEND == 'redis':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG':  {'hosts': [config('CHANNEL_LOCATION', default='redis://127.0.0.1:6379/2')]},
+        },
+    }
+elif CHANNEL_BACKEND == 'database':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'apps.alerts.layers.DatabaseChannelLayer',
+            'CONFIG': {
+                'expiry':   60,    # seconds before an undelivered message is dropped
+                'capacity': 100,   # max waiting messages per channel
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+    }
+
+# ── Caches ────────────────────────────────────────────────
+# 'risk' is the read-through cache of apps/risk/cache.py: the responses of
+# /api/risk/ and /api/risk/high/ and per-student risk features. Entries are
+# invalidated when a new score is saved, so the backend must be shared.
+#   memory  private to each process, which could not invalidate the others'
+#           entries — nothing is cached, risk reads go to the database
+#   file    shared by every process on the host (CACHE_LOCATION directory);
+#           every write lists the directory, fine for a few thousand entries
+#   redis   shared by every host (CACHE_LOCATION url); give the server a
+#           maxmemory and maxmemory-policy allkeys-lru
+CACHE_BACKEND = config('CACHE_BACKEND', default='memory')
+
+_RISK_CACHES = {
+    'memory': ('django.core.cache.backends.locmem.LocMemCache', 'risk'),
+    'file':   ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis':  ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'risk': {
+        'BACKEND':  _RISK_CACHES[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=_RISK_CACHES[CACHE_BACKEND][1]),
+        'TIMEOUT':  config('CACHE_TIMEOUT', default=60, cast=int),
+    },
+}
+if CACHE_BACKEND != 'redis':
+    # Evict the least recently used tenth when full (the file backend evicts at random)
+    CACHES['risk']['OPTIONS'] = {
+        'MAX_ENTRIES':    config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+        'CULL_FREQUENCY': 10,
+    }
+
+# ── Risk recalculation ────────────────────────────────────
+# 'inline' scores a student right after the transaction that changed its
+# attendance, grades or incidents commits, in the same process. 'queue'
+# writes a RiskRecomputeJob in that transaction instead; run
+# `python manage.py risk_worker` to score the queued students.
+RISK_RECOMPUTE_MODE = config('RISK_RECOMPUTE_MODE', default='inline')
+
+# ── Logging ───────────────────────────────────────────────
+# Our apps and the ML engine (predict.py) log to the console;
+# LOG_LEVEL=DEBUG also shows every risk-recalculation signal.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'apps':    {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO')},
+        'predict': {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO')},
     },
 }
 
@@ -0,0 +1,158 @@
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.alerts.models import Alert
+from apps.alerts.views import AlertSerializer
+from apps.attendance.models import AttendanceLog
+from apps.attendance.serializers import AttendanceSerializer
+from apps.grades.models import GradeRecord
+from apps.grades.serializers import GradeSerializer
+from apps.interventions.models import Intervention
+from apps.interventions.views import InterventionSerializer
+from apps.risk.models import CurrentRisk, RiskScore
+from apps.users.models import User
+
+
+class ConditionalListTests(TestCase):
+    """ETag revalidation of the list endpoints (config/conditional.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.counselor = User.objects.create(username='counselor', role='counselor')
+        cls.student = User.objects.create(username='student', role='student')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.counselor)
+
+    def endpoints(self):
+        """(url, serializer, create a row) of every conditional list without a response cache."""
+        today, student, counselor = timezone.now().date(), self.student, self.counselor
+        marks = iter(range(1000))
+        alert_types = iter(dict(Alert.TYPE_CHOICES))   # one unread alert per type
+        return [
+            (f"/api/attendance/list/?student_id={student.id}", AttendanceSerializer,
+             lambda: AttendanceLog.objects.create(student=student, marked_by=counselor, status='present',
+                                                  date=today, class_name=f"class{next(marks)}")),
+            (f"/api/grades/list/?student_id={student.id}", GradeSerializer,
+             lambda: GradeRecord.objects.create(student=student, entered_by=counselor, subject='Math',
+                                                exam_type='quiz', score=70, date=today)),
+            (f"/api/interventions/list/?student_id={student.id}", InterventionSerializer,
+             lambda: Intervention.objects.create(student=student, counselor=counselor, action_type='counseling')),
+            ('/api/alerts/', AlertSerializer,
+             lambda: Alert.objects.create(student=student, sent_to=counselor, alert_type=next(alert_types), message='')),
+        ]
+
+    def test_matching_etag_is_answered_before_the_page_is_read(self):
+        for url, serializer, create in self.endpoints():
+            with self.subTest(url=url):
+                create()
+                etag = self.client.get(url)['ETag']
+                # One query: the fingerprint aggregate; no page query, no serializer
+                with mock.patch.object(serializer, 'to_representation') as represent, self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                represent.assert_not_called()
+
+    def test_etag_changes_with_every_write(self):
+        for url, _, create in self.endpoints():
+            with self.subTest(url=url):
+                row = create()
+                etags = [self.client.get(url)['ETag']]
+                create()
+                etags.append(self.client.get(url)['ETag'])
+                row.save()   # an edit stamps updated_at
+                etags.append(self.client.get(url)['ETag'])
+                if isinstance(row, Alert):
+                    self.client.patch(f"/api/alerts/{row.id}/read/")
+                else:
+                    row.delete()
+                etags.append(self.client.get(url)['ETag'])
+                self.assertEqual(len(set(etags)), 4, etags)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etags[-1]).status_code, 304)
+
+    def test_newest_row_leaving_the_list_is_a_change(self):
+        for alert_type in ('attendance', 'high_risk'):
+            Alert.objects.create(student=self.student, sent_to=self.counselor, alert_type=alert_type, message='')
+        first = self.client.get('/api/alerts/')
+        self.assertNotIn('Last-Modified', first)
+
+        newest = Alert.objects.get(alert_type='high_risk')
+        self.client.patch(f"/api/alerts/{newest.id}/read/")
+        # MAX(updated_at) of the unread list went back in time; the client must still get the change
+        for headers in ({'HTTP_IF_NONE_MATCH': first['ETag']},
+                        {'HTTP_IF_MODIFIED_SINCE': http_date(timezone.now().timestamp())}):
+            with self.subTest(headers=list(headers)):
+                again = self.client.get('/api/alerts/', **headers)
+                self.assertEqual(again.status_code, 200)
+                self.assertEqual(len(again.json()['results']), 1)
+
+
+class AsyncListViewTests(TestCase):
+    """The /api/async/ twins answer like their sync views (config/async_views.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.counselor = User.objects.create(username='counselor', role='counselor')
+        students = [User.objects.create(username=f"student{i}", role='student') for i in range(3)]
+        cls.student = students[0]
+        today = timezone.now().date()
+        for i, (student, alert_type) in enumerate(zip(students, dict(Alert.TYPE_CHOICES))):
+            AttendanceLog.objects.create(student=cls.student, marked_by=cls.counselor, status='present',
+                                         date=today, class_name=f"class{i}")
+            GradeRecord.objects.create(student=cls.student, entered_by=cls.counselor, subject='Math',
+                                       exam_type='quiz', score=60 + i, date=today)
+            Intervention.objects.create(student=cls.student, counselor=cls.counselor, action_type='counseling')
+            Alert.objects.create(student=student, sent_to=cls.counselor, alert_type=alert_type, message='')
+            RiskScore.objects.create(student=cls.student, score=50 + i, category='medium')
+            risk = RiskScore.objects.create(student=student, score=90, category='high')
+            CurrentRisk.objects.create(student=student, risk_score=risk, score=90, category='high',
+                                       calculated_at=risk.calculated_at)
+        cls.token = str(AccessToken.for_user(cls.counselor))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def urls(self):
+        """(sync url, async twin) of every async endpoint, two rows per page."""
+        query = f"?student_id={self.student.id}&page_size=2"
+        return [(f"/api/{path}{query}", f"/api/async/{path}{query}")
+                for path in ('alerts/', 'risk/', 'risk/high/', 'attendance/list/', 'grades/list/',
+                             'interventions/list/')]
+
+    @staticmethod
+    def cursor(link):
+        return parse_qs(urlsplit(link).query)['cursor'] if link else None
+
+    def test_same_pages_as_the_sync_view(self):
+        for sync_url, async_url in self.urls():
+            with self.subTest(url=async_url):
+                pages = 0
+                while async_url:   # three rows: a full page, then the one its cursor points to
+                    expected, actual = self.client.get(sync_url).json(), self.client.get(async_url).json()
+                    self.assertEqual(actual['results'], expected['results'])
+                    self.assertEqual(self.cursor(actual['next']), self.cursor(expected['next']))
+                    sync_url, async_url, pages = expected['next'], actual['next'], pages + 1
+                self.assertEqual(pages, 2)
+
+    def test_missing_or_invalid_token_is_unauthorized(self):
+        for _, url in self.urls():
+            for credentials in ({}, {'HTTP_AUTHORIZATION': 'Bearer not-a-jwt'}):
+                with self.subTest(url=url, credentials=credentials):
+                    self.client.credentials(**credentials)
+                    self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_matching_etag_is_not_modified(self):
+        for _, url in self.urls():
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual((response.status_code, response.content), (304, b''))
@@ -17,6 +17,8 @@ urlpatterns = [
     path('api/risk/',          include('apps.risk.urls')),
     path('api/alerts/',        include('apps.alerts.urls')),
     path('api/interventions/', include('apps.interventions.urls')),
+    path('api/metrics/',       include('apps.monitoring.urls')),
+    path('api/async/',         include('config.async_urls')),
 ]
 
 # ── Full API Reference ────────────────────────────────────
@@ -29,6 +31,7 @@ urlpatterns = [
 #
 #  ATTENDANCE
 #  POST   /api/attendance/           → teacher marks attendance
+#  POST   /api/attendance/bulk/      → teacher marks a whole class roster
 #  GET    /api/attendance/list/      → get student attendance history
 #
 #  GRADES
@@ -37,7 +40,8 @@ urlpatterns = [
 #
 #  RISK
 #  GET    /api/risk/?student_id=X    → get risk scores for student
-#  GET    /api/risk/high/            → all high-risk students
+#  GET    /api/risk/high/            → all currently high-risk students
+#  GET    /api/risk/current/         → current risk of every student
 #
 #  ALERTS
 #  GET    /api/alerts/               → counselor's unread alerts
@@ -46,3 +50,14 @@ urlpatterns = [
 #  INTERVENTIONS
 #  POST   /api/interventions/        → counselor assigns action
 #  GET    /api/interventions/list/   → get student's interventions
+#
+#  MONITORING
+#  GET    /api/metrics/              → Prometheus metrics (admins only)
+#
+#  ASYNC READS (same responses, async views — config/async_views.py)
+#  GET    /api/async/alerts/                     → /api/alerts/
+#  GET    /api/async/risk/?student_id=X          → /api/risk/
+#  GET    /api/async/risk/high/                  → /api/risk/high/
+#  GET    /api/async/attendance/list/?student_id=X
+#  GET    /api/async/grades/list/?student_id=X
+#  GET    /api/async/interventions/list/?student_id=X
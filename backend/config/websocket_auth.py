@@ -0,0 +1,38 @@
+"""
+JWT authentication for WebSockets.
+
+The API authenticates with `Authorization: Bearer <access token>`, but a
+browser cannot set headers on a WebSocket handshake, so the access token is
+sent in the query string instead:
+
+    ws://127.0.0.1:8000/ws/alerts/?token=<access token>
+
+JWTAuthMiddleware validates it with the same checks as the async API views
+(AsyncJWTAuthentication: signature, expiry, user active) and puts the user
+in scope['user']; a missing or invalid token leaves an AnonymousUser, which
+the consumer refuses.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from config.async_views import AsyncJWTAuthentication
+
+
+async def user_from_token(raw_token):
+    """The user an access token belongs to, or AnonymousUser if it does not check out."""
+    authentication = AsyncJWTAuthentication()
+    try:
+        return await authentication.aget_user(authentication.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        scope = dict(scope, user=await user_from_token(token[0]) if token else AnonymousUser())
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,34 @@
+import api from './axios'
+
+// ws://127.0.0.1:8000/ws/alerts/ — same host as the REST API
+const socketURL = () => api.defaults.baseURL.replace(/^http/, 'ws').replace(/\/api\/?$/, '/ws/alerts/')
+
+// Live alerts for the logged-in counselor/admin. Browsers cannot send an
+// Authorization header on a WebSocket, so the JWT goes in the query string.
+// Reconnects with back-off until the returned function is called.
+export const subscribeToAlerts = (onAlert) => {
+  let socket = null
+  let retry = null
+  let delay = 1000
+  let stopped = false
+
+  const connect = () => {
+    const token = localStorage.getItem('access_token')
+    if (!token || stopped) return
+    socket = new WebSocket(`${socketURL()}?token=${encodeURIComponent(token)}`)
+    socket.onopen = () => { delay = 1000 }
+    socket.onmessage = (event) => onAlert(JSON.parse(event.data))
+    socket.onclose = () => {
+      if (stopped) return
+      retry = setTimeout(connect, delay)
+      delay = Math.min(delay * 2, 30000)
+    }
+  }
+
+  connect()
+  return () => {
+    stopped = true
+    clearTimeout(retry)
+    socket?.close()
+  }
+}
@@ -1,7 +1,10 @@
-import api from './axios'
+import api, { firstPage } from './axios'
 
 // Teacher marks attendance
 export const markAttendance  = (data)      => api.post('/attendance/', data)
 
-// Get attendance history for a student
-export const getAttendance   = (studentId) => api.get(`/attendance/list/?student_id=${studentId}`)
+// Teacher marks a whole class roster in one request
+export const markRoster      = (data)      => api.post('/attendance/bulk/', data)
+
+// Get attendance history for a student (most recent page)
+export const getAttendance   = (studentId) => api.get(`/attendance/list/?student_id=${studentId}`).then(firstPage)
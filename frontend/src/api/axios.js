@@ -24,3 +24,19 @@ api.interceptors.response.use(
 )
 
 export default api
+
+// List endpoints are cursor-paginated: { next, previous, results }.
+// firstPage keeps the rest of the app working with a plain array in `res.data`.
+export const firstPage = (res) => ({ ...res, data: res.data.results })
+
+// Follow `next` links to collect every row of a paginated list
+export const fetchAll = async (url) => {
+  const rows = []
+  let next = url
+  while (next) {
+    const res = await api.get(next)
+    rows.push(...res.data.results)
+    next = res.data.next
+  }
+  return { data: rows }
+}
@@ -1,17 +1,21 @@
-import api from './axios'
+import api, { firstPage, fetchAll } from './axios'
+
+// ── Users ───────────────────────────────────
+export const getStudents    = ()          => fetchAll('/users/students/')
 
 // ── Grades ──────────────────────────────────
 export const addGrade       = (data)      => api.post('/grades/', data)
-export const getGrades      = (studentId) => api.get(`/grades/list/?student_id=${studentId}`)
+export const getGrades      = (studentId) => api.get(`/grades/list/?student_id=${studentId}`).then(firstPage)
 
 // ── Risk ────────────────────────────────────
-export const getRiskScores  = (studentId) => api.get(`/risk/?student_id=${studentId}`)
-export const getHighRisk    = ()          => api.get('/risk/high/')
+export const getRiskScores  = (studentId) => api.get(`/risk/?student_id=${studentId}`).then(firstPage)
+export const getHighRisk    = ()          => api.get('/risk/high/').then(firstPage)
+export const getCurrentRisk = ()          => fetchAll('/risk/current/')
 
 // ── Alerts ──────────────────────────────────
-export const getMyAlerts    = ()          => api.get('/alerts/')
+export const getMyAlerts    = ()          => api.get('/alerts/').then(firstPage)
 export const markAlertRead  = (id)        => api.patch(`/alerts/${id}/read/`)
 
 // ── Interventions ────────────────────────────
 export const addIntervention    = (data)      => api.post('/interventions/', data)
-export const getInterventions   = (studentId) => api.get(`/interventions/list/?student_id=${studentId}`)
+export const getInterventions   = (studentId) => api.get(`/interventions/list/?student_id=${studentId}`).then(firstPage)
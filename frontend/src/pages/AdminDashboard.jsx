@@ -1,7 +1,6 @@
 import { useState, useEffect } from "react";
 import Sidebar from "../components/common/Sidebar";
-import { getHighRisk } from "../api/otherAPIs";
-import api from "../api/axios";
+import { getHighRisk, getCurrentRisk, getStudents } from "../api/otherAPIs";
 import {
   PieChart,
   Pie,
@@ -117,25 +116,16 @@ export default function AdminDashboard() {
   useEffect(() => {
     Promise.all([
       getHighRisk(),
-      api.get("/risk/high/"),
-      api.get("/users/students/"),
-      api.get("/risk/?student_id=0").catch(() => ({ data: [] })),
+      getStudents(),
     ])
-      .then(([hr, , s]) => {
+      .then(([hr, s]) => {
         setHighRisk(hr.data);
         setStudents(s.data);
       })
       .finally(() => setLoading(false));
 
-    // Fetch all risk scores across all students
-    api.get("/users/students/").then(async (res) => {
-      const allScores = [];
-      for (const student of res.data) {
-        const r = await api.get(`/risk/?student_id=${student.id}`);
-        if (r.data.length > 0) allScores.push(r.data[0]);
-      }
-      setAllRisk(allScores);
-    });
+    // Current risk of every student — one row each, in a single request
+    getCurrentRisk().then((res) => setAllRisk(res.data));
   }, []);
 
   // ── Compute chart data ──────────────────────────────────
@@ -665,7 +655,8 @@ export default function AdminDashboard() {
                 fontWeight: "700",
                 boxShadow: "0 0 10px rgba(239,68,68,0.2)",
               }}>
-              {highRisk.length} students
+              {/* highRisk is only the first page; the full count comes from allRisk */}
+              {allRisk.length ? riskCounts.high : highRisk.length} students
             </span>
           </div>
           {highRisk.length === 0 ? (
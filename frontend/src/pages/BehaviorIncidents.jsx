@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react'
 import Sidebar from '../components/common/Sidebar'
 import api from '../api/axios'
+import { getStudents, getInterventions } from '../api/otherAPIs'
 
 const INCIDENT_TYPES = [
   { value: 'misconduct',    label: '😤 Misconduct',         desc: 'Disruptive behavior in class' },
@@ -36,7 +37,7 @@ export default function BehaviorIncidents() {
 
   // Load students
   useEffect(() => {
-    api.get('/users/students/')
+    getStudents()
       .then(res => setStudents(res.data))
       .finally(() => setLoading(false))
   }, [])
@@ -44,7 +45,7 @@ export default function BehaviorIncidents() {
   // Load existing incidents for selected student
   useEffect(() => {
     if (form.student) {
-      api.get(`/interventions/list/?student_id=${form.student}`)
+      getInterventions(form.student)
         .then(res => setIncidents(res.data))
         .catch(() => setIncidents([]))
     }
@@ -68,7 +69,7 @@ export default function BehaviorIncidents() {
       setResult({ type: 'success', msg: '✅ Incident recorded! Risk score will update automatically.' })
 
       // Reload incidents
-      const res = await api.get(`/interventions/list/?student_id=${form.student}`)
+      const res = await getInterventions(form.student)
       setIncidents(res.data)
       setForm(prev => ({ ...prev, description: '' }))
     } catch (err) {
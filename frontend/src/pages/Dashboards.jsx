@@ -5,6 +5,7 @@ import {
   getHighRisk,
   addIntervention,
 } from "../api/otherAPIs";
+import { subscribeToAlerts } from "../api/alertsSocket";
 import Sidebar from "../components/common/Sidebar";
 import RiskBadge from "../components/common/RiskBadge";
 
@@ -20,6 +21,13 @@ export function CounselorDashboard() {
     getMyAlerts()
       .then((res) => setAlerts(res.data))
       .finally(() => setLoading(false));
+
+    // New alerts are pushed over ws/alerts/ — no polling
+    return subscribeToAlerts((alert) =>
+      setAlerts((prev) =>
+        prev.some((a) => a.id === alert.id) ? prev : [alert, ...prev],
+      ),
+    );
   }, []);
 
   const handleRead = async (id) => {
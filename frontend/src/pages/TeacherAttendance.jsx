@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
-import { markAttendance } from '../api/attendanceAPI'
+import { markRoster } from '../api/attendanceAPI'
 import Sidebar from '../components/common/Sidebar'
-import api from '../api/axios'
+import { getStudents } from '../api/otherAPIs'
 
 export default function TeacherAttendance() {
   const today = new Date().toISOString().split('T')[0]
@@ -16,7 +16,7 @@ export default function TeacherAttendance() {
 
   // Load real students from database
   useEffect(() => {
-    api.get('/users/students/')
+    getStudents()
       .then(res => {
         setStudents(res.data)
         // Initialize all as present
@@ -38,15 +38,11 @@ export default function TeacherAttendance() {
   const handleSubmit = async () => {
     setSubmitting(true); setResult(null)
     try {
-      const promises = students.map(s =>
-        markAttendance({
-          student:    s.id,
-          date:       date,
-          status:     statuses[s.id],
-          class_name: className,
-        })
-      )
-      await Promise.all(promises)
+      await markRoster({
+        date:       date,
+        class_name: className,
+        records:    students.map(s => ({ student: s.id, status: statuses[s.id] })),
+      })
       setResult({ type: 'success', msg: `✅ Attendance saved for ${students.length} students! Risk scores are updating...` })
     } catch (err) {
       setResult({ type: 'error', msg: `❌ Error: ${JSON.stringify(err.response?.data || 'Failed')}` })
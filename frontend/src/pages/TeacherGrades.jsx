@@ -1,7 +1,6 @@
 import { useState, useEffect } from 'react'
 import Sidebar from '../components/common/Sidebar'
-import api from '../api/axios'
-import { addGrade, getGrades } from '../api/otherAPIs'
+import { addGrade, getGrades, getStudents } from '../api/otherAPIs'
 
 export default function TeacherGrades() {
   const [students, setStudents] = useState([])
@@ -21,7 +20,7 @@ export default function TeacherGrades() {
 
   // Load all students from DB
   useEffect(() => {
-    api.get('/users/students/')
+    getStudents()
       .then(res => setStudents(res.data))
       .finally(() => setLoading(false))
   }, [])
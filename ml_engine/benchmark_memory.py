@@ -0,0 +1,100 @@
+"""
+Memory per worker process: unpickled sklearn model vs memory-mapped compiled forest.
+
+Starts N worker processes the way an ASGI/WSGI server would, lets each load
+the model and score a batch, then reads every worker's memory while all of
+them are alive. RSS counts shared pages in full for every process; PSS splits
+them between the processes sharing them, and USS is what a worker has to
+itself — those two show what the memory map saves.
+
+Run from ml_engine/:  python benchmark_memory.py --workers 8
+Linux only (reads /proc/self/smaps_rollup).
+"""
+
+import argparse
+import multiprocessing
+import os
+
+MODES = ['pickle', 'mmap']
+
+
+def memory_kb():
+    """VmRSS, Pss and private (USS) kilobytes of the calling process."""
+    stats = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                stats[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': stats['Rss'],
+        'pss': stats['Pss'],
+        'uss': stats.get('Private_Clean', 0) + stats.get('Private_Dirty', 0),
+    }
+
+
+def worker(mode, barrier, results):
+    import warnings
+    import numpy as np
+    warnings.filterwarnings('ignore')
+
+    before = memory_kb()['rss']
+    if mode == 'pickle':
+        # What every worker did before: its own unpickled copy of the forest
+        import pickle
+        from registry import resolve
+        with open(resolve()[1], 'rb') as f:
+            model = pickle.load(f)
+    else:
+        from forest import load_forest
+        from registry import resolve
+        model = load_forest(resolve()[2])
+
+    rng = np.random.default_rng(os.getpid())
+    X   = np.column_stack([rng.uniform(30, 100, 2000), rng.uniform(20, 100, 2000), rng.integers(0, 8, 2000)])
+    model.predict_proba(X)
+
+    barrier.wait()            # every worker loaded — measure while all of them are alive
+    stats = memory_kb()
+    stats['load'] = stats['rss'] - before
+    results.put(stats)
+    barrier.wait()            # keep the pages mapped until everyone has measured
+
+
+def run(mode, workers):
+    ctx     = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs   = [ctx.Process(target=worker, args=(mode, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return stats
+
+
+def main():
+    import warnings
+    warnings.filterwarnings('ignore')
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    from predict import get_forest
+    get_forest()   # make sure the memory-mapped export exists before the workers start
+
+    print(f"{args.workers} workers — per-worker averages in MB\n")
+    print(f"{'mode':<8} | {'RSS':>7} | {'PSS':>7} | {'USS':>7} | {'load Δ RSS':>10} | {'total PSS':>9}")
+    print("-" * 64)
+    for mode in MODES:
+        stats = run(mode, args.workers)
+        avg   = {k: sum(s[k] for s in stats) / len(stats) / 1024 for k in stats[0]}
+        total = sum(s['pss'] for s in stats) / 1024
+        print(f"{mode:<8} | {avg['rss']:>7.1f} | {avg['pss']:>7.1f} | {avg['uss']:>7.1f} | "
+              f"{avg['load']:>10.1f} | {total:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
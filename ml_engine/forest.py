@@ -0,0 +1,360 @@
+"""
+Compiled random-forest evaluator.
+
+sklearn's predict_proba validates the input and dispatches every tree
+separately, which costs several milliseconds even for one 3-feature row.
+compile_forest() flattens a fitted RandomForestClassifier into a handful of
+node arrays, and CompiledForest evaluates all trees for a whole batch at once
+with plain NumPy indexing — through small per-tree lookup grids derived from
+the nodes, or by walking the nodes level by level when the grids would be big.
+
+    forest = compile_forest(model)
+    save_forest(forest, 'model/risk_model.forest')
+    forest = load_forest('model/risk_model.forest')
+    proba  = forest.predict_proba(X)      # same numbers as model.predict_proba(X)
+
+The saved forest is a directory of raw .npy arrays (grids included) that
+load_forest memory-maps read-only, so every worker process on a host shares
+one copy of the pages instead of unpickling its own.
+
+Run from ml_engine/ to re-export the current model version:  python forest.py
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from collections import namedtuple
+
+import numpy as np
+
+# Rows × trees evaluated per chunk; small enough for the index arrays to stay in cache
+CHUNK_NODES = 1 << 16
+
+# Lookup tables are built when all trees together have at most this many cells;
+# bigger forests are walked level by level instead
+MAX_GRID_CELLS = 1 << 22
+
+# While walking, (row, tree) pairs that reached a leaf are dropped every few
+# levels. Most paths end well before max_depth, but compacting costs a few passes itself.
+COMPACT_EVERY = 3
+
+_Grid = namedtuple('_Grid', 'edges bins strides offsets leaves')
+
+
+class CompiledForest:
+    """
+    All trees of a forest in flat arrays, numbered breadth-first so the two
+    children of node i are left[i] and left[i] + 1. A leaf points to itself
+    and has an infinite threshold, so extra steps never move off it.
+    """
+
+    def __init__(self, feature, threshold, left, value, roots, classes, max_depth, grid=None):
+        # Arrays are used as given (possibly read-only memory maps), never copied
+        self.feature   = feature
+        self.threshold = threshold
+        self.left      = left
+        self.value     = value        # per-node class distribution (only leaves are read)
+        self.roots     = roots
+        self.classes_  = classes
+        self.max_depth = int(max_depth)
+        self.is_leaf   = left == np.arange(len(left))
+        self._grid     = grid
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    # ── Evaluation ────────────────────────────────────────────
+    def apply(self, X):
+        """Leaf index (into the flat arrays) reached by every row in every tree: trees × rows."""
+        # sklearn compares float32 features against float64 thresholds — do the same
+        X = np.asarray(X, dtype=np.float32)
+        return self._lookup(X) if self._grid is not None else self._walk(X)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2-D array, got shape {X.shape}")
+
+        proba = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        step  = max(1, CHUNK_NODES // max(self.n_trees, 1))
+        for start in range(0, len(X), step):
+            # Reducing over the leading (tree) axis adds tree by tree, in the same
+            # order as sklearn, so the probabilities match bit for bit
+            leaves = self.value[self.apply(X[start:start + step])]      # trees × rows × classes
+            proba[start:start + step] = leaves.sum(axis=0) / self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def _walk(self, X):
+        """Move every (row, tree) pair one level down per step, all trees at once."""
+        flat  = X.ravel()
+        nodes = np.repeat(self.roots, len(X))
+        base  = np.tile(np.arange(len(X)) * X.shape[1], self.n_trees)    # row offset into `flat`
+
+        leaves, pending = None, None
+        for depth in range(1, self.max_depth + 1):
+            go_right = flat.take(base + self.feature.take(nodes)) > self.threshold.take(nodes)
+            nodes    = self.left.take(nodes) + go_right
+
+            if depth % COMPACT_EVERY == 0 and depth < self.max_depth:
+                if leaves is None:
+                    leaves, pending = np.empty_like(nodes), np.arange(nodes.size)
+                done = self.is_leaf.take(nodes)
+                leaves[pending[done]] = nodes[done]
+                walking = ~done
+                nodes, pending, base = nodes[walking], pending[walking], base[walking]
+                if not nodes.size:
+                    break
+
+        if leaves is None:
+            leaves = nodes
+        else:
+            leaves[pending] = nodes
+        return leaves.reshape(self.n_trees, len(X))
+
+    def _lookup(self, X):
+        """Find every (row, tree) leaf in one pass through the per-tree grids."""
+        grid  = self._grid
+        X     = X.astype(np.float64)
+        cells = grid.offsets[:, None]
+        for f, edges in enumerate(grid.edges):
+            rank  = np.searchsorted(edges, X[:, f], side='left')    # forest thresholds below x
+            cells = cells + grid.bins[f][:, rank] * grid.strides[:, f, None]
+        return grid.leaves[cells]
+
+    def _build_grid(self):
+        """
+        Every tree cuts each feature at its own thresholds, so a row's bin along
+        each feature (how many of those thresholds it exceeds) picks one cell of
+        the tree's grid, and every cell lies inside exactly one leaf. Built from
+        the node arrays when the grids are small enough to keep in memory.
+        """
+        internal = ~self.is_leaf
+        if not internal.any():
+            return None
+        n_features = int(self.feature[internal].max()) + 1
+        ends = np.append(self.roots[1:], len(self.left))
+
+        cuts = [
+            [np.unique(self.threshold[r:e][internal[r:e] & (self.feature[r:e] == f)]) for f in range(n_features)]
+            for r, e in zip(self.roots, ends)
+        ]
+        shapes = [tuple(len(c) + 1 for c in tree_cuts) for tree_cuts in cuts]
+        if sum(int(np.prod(shape)) for shape in shapes) > MAX_GRID_CELLS:
+            return None
+
+        # A row's rank among all thresholds of the forest gives its bin in every tree
+        edges = [np.unique(np.concatenate([tree_cuts[f] for tree_cuts in cuts])) for f in range(n_features)]
+        bins  = [
+            np.stack([np.concatenate([[0], np.searchsorted(tree_cuts[f], edges[f], side='right')]) for tree_cuts in cuts])
+            for f in range(n_features)
+        ]
+
+        tables, strides = [], []
+        for root, tree_cuts, shape in zip(self.roots, cuts, shapes):
+            table = np.empty(shape, dtype=np.intp)
+            stack = [(root, [(0, n) for n in shape])]
+            while stack:
+                node, box = stack.pop()
+                if self.is_leaf[node]:
+                    table[tuple(slice(lo, hi) for lo, hi in box)] = node
+                    continue
+                f     = self.feature[node]
+                split = np.searchsorted(tree_cuts[f], self.threshold[node]) + 1
+                lo, hi = box[f]
+                stack.append((self.left[node],     box[:f] + [(lo, split)] + box[f + 1:]))
+                stack.append((self.left[node] + 1, box[:f] + [(split, hi)] + box[f + 1:]))
+            tables.append(table.ravel())
+            strides.append([n // table.itemsize for n in table.strides])
+
+        sizes = np.array([len(t) for t in tables])
+        return _Grid(
+            edges   = edges,
+            bins    = bins,
+            strides = np.array(strides, dtype=np.intp),
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp),
+            leaves  = np.concatenate(tables),
+        )
+
+
+def _leaf_distributions(tree):
+    """What tree.predict_proba returns for a row ending on each node."""
+    import sklearn
+    from sklearn.utils.fixes import parse_version
+
+    value = tree.tree_.value[:, 0, :tree.n_classes_].astype(np.float64)
+    if parse_version(sklearn.__version__) < parse_version('1.4'):
+        # Older releases store weighted counts and normalise at predict time
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value /= normalizer
+    return value
+
+
+def _breadth_first(tree):
+    """Node order in which both children of a node are adjacent."""
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != -1:
+            order += [tree.children_left[node], tree.children_right[node]]
+    return np.asarray(order)
+
+
+def compile_forest(model):
+    """Flatten a fitted RandomForestClassifier into a CompiledForest."""
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    features, thresholds, lefts, values, roots = [], [], [], [], []
+    offset, depth = 0, 0
+    for estimator in model.estimators_:
+        tree  = estimator.tree_
+        order = _breadth_first(tree)
+        new_id = np.empty(tree.node_count, dtype=np.int64)
+        new_id[order] = np.arange(tree.node_count)
+
+        children = tree.children_left[order]
+        leaf     = children == -1
+        roots.append(offset)
+        features.append(np.where(leaf, 0, tree.feature[order]))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold[order]))
+        lefts.append(np.where(leaf, np.arange(tree.node_count), new_id[children]) + offset)
+        values.append(_leaf_distributions(estimator)[order])
+
+        offset += tree.node_count
+        depth   = max(depth, tree.max_depth)
+
+    # Indices are kept as native intp so take() and fancy indexing never convert them
+    forest = CompiledForest(
+        feature   = np.concatenate(features).astype(np.intp),
+        threshold = np.concatenate(thresholds).astype(np.float64),
+        left      = np.concatenate(lefts).astype(np.intp),
+        value     = np.concatenate(values),
+        roots     = np.asarray(roots, dtype=np.intp),
+        classes   = np.asarray(model.classes_).astype(str),
+        max_depth = depth,
+    )
+    forest._grid = forest._build_grid()
+    return forest
+
+
+# ── Artifact on disk ──────────────────────────────────────────
+def _arrays(forest):
+    arrays = {
+        'feature': forest.feature, 'threshold': forest.threshold,
+        'left': forest.left, 'value': forest.value, 'roots': forest.roots,
+    }
+    grid = forest._grid
+    if grid is not None:
+        arrays.update(grid_strides=grid.strides, grid_offsets=grid.offsets, grid_leaves=grid.leaves)
+        for f, (edges, bins) in enumerate(zip(grid.edges, grid.bins)):
+            arrays[f'grid_edges_{f}'] = edges
+            arrays[f'grid_bins_{f}']  = bins
+    return arrays
+
+
+def source_digest(model_path):
+    """SHA-256 of the pickle an export is compiled from."""
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_source(path):
+    """The source_digest recorded in the export at `path`, or None (missing, or exported without one)."""
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            return json.load(f).get('source')
+    except (OSError, ValueError):
+        return None
+
+
+def save_forest(forest, path, overwrite=True, source=None):
+    """
+    Write the forest as a directory of .npy files, moved into place with a
+    rename so a reader never sees half an export. With overwrite=False an
+    existing export is kept (several workers may race to create it).
+    `source` (source_digest of the pickle) is recorded in meta.json, so a
+    stale export can be told from a current one.
+    Returns True if this call's export is the one at `path`.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in _arrays(forest).items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({
+            'classes':    [str(c) for c in forest.classes_],
+            'max_depth':  forest.max_depth,
+            'grid_features': len(forest._grid.edges) if forest._grid is not None else None,
+            'source':     source,
+        }, f)
+
+    old = None
+    if overwrite and os.path.exists(path):
+        old = f"{path}.old-{os.getpid()}"
+        os.rename(path, old)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # Someone else exported first — theirs is just as good
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    finally:
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    return True
+
+
+def load_forest(path, mmap=True):
+    """Open a saved forest; with mmap=True the arrays stay on disk as shared, read-only pages."""
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+
+    def array(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+
+    grid = None
+    if meta['grid_features'] is not None:
+        n = meta['grid_features']
+        grid = _Grid(
+            edges   = [array(f'grid_edges_{f}') for f in range(n)],
+            bins    = [array(f'grid_bins_{f}') for f in range(n)],
+            strides = array('grid_strides'),
+            offsets = array('grid_offsets'),
+            leaves  = array('grid_leaves'),
+        )
+    return CompiledForest(
+        feature   = array('feature'),
+        threshold = array('threshold'),
+        left      = array('left'),
+        value     = array('value'),
+        roots     = array('roots'),
+        classes   = np.asarray(meta['classes']),
+        max_depth = meta['max_depth'],
+        grid      = grid,
+    )
+
+
+def artifact_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+if __name__ == '__main__':
+    import pickle
+    from registry import resolve
+
+    version, model_path, forest_path = resolve()
+    with open(model_path, 'rb') as f:
+        forest = compile_forest(pickle.load(f))
+    save_forest(forest, forest_path, source=source_digest(model_path))
+    print(f"Compiled {forest.n_trees} trees ({len(forest.feature)} nodes) of version {version} → {forest_path}")
+    print(f"  {artifact_size(forest_path) / 1024:.0f} KB, max depth {forest.max_depth}, "
+          f"{'grid lookup' if forest._grid is not None else 'level-by-level walk'}")
@@ -1,51 +1,162 @@
+"""
+Synthetic student data, fully vectorized.
 
-import pandas as pd
-import numpy as np
+Every student gets a risk profile (low / medium / high) and features drawn
+from that profile's ranges. generate_histories() expands students into the
+raw rows the backend stores — one attendance mark per school day, grades
+and incident records — whose aggregates match the student's features, so
+seeded databases score like the training data.
+
+Run from ml_engine/:
+    python generate_data.py                                   # 500 students → data/students.csv
+    python generate_data.py --students 2000000 --out data/students_2m.csv
+    python generate_data.py --students 1000 --histories data/histories   # + raw per-day CSVs
+
+The backend loads histories straight into the database with
+`python manage.py seed_load` (apps/monitoring).
+"""
+
+import argparse
 import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+PROFILES  = np.array(['low', 'medium', 'high'])
+PROFILE_P = [0.5, 0.3, 0.2]
+
+# Per-profile ranges, indexed like PROFILES
+ATTENDANCE = np.array([[80, 100], [60, 80], [30, 65]], dtype=float)
+GRADE      = np.array([[60, 100], [40, 65], [20, 50]], dtype=float)
+INCIDENTS  = np.array([[0, 2], [1, 4], [3, 8]])     # [low, high)
+
+SUBJECTS     = np.array(['Math', 'Physics', 'Chemistry', 'English', 'Computer Science'])
+EXAM_TYPES   = np.array(['quiz', 'midterm', 'final', 'assignment'])
+ACTION_TYPES = np.array(['counseling', 'parent_meet', 'academic_help', 'behavior', 'escalation'])
+INTERVENTION_STATUS = np.array(['pending', 'done', 'escalated'])
 
-np.random.seed(42)
-NUM_STUDENTS = 500
+# An absence that is not "present" is marked late this often
+LATE_SHARE = 0.3
 
-data = []
 
-for i in range(NUM_STUDENTS):
-    # Randomly assign a risk profile
-    profile = np.random.choice(['low', 'medium', 'high'], p=[0.5, 0.3, 0.2])
+def _rng(seed):
+    return np.random.default_rng(seed)
 
-    if profile == 'low':
-        attendance_pct = np.random.uniform(80, 100)
-        grade_avg      = np.random.uniform(60, 100)
-        incidents      = np.random.randint(0, 2)
 
-    elif profile == 'medium':
-        attendance_pct = np.random.uniform(60, 80)
-        grade_avg      = np.random.uniform(40, 65)
-        incidents      = np.random.randint(1, 4)
+def generate_students(n, seed=42):
+    """
+    n students as a DataFrame with attendance_pct, grade_avg, incidents and
+    risk_label — the training CSV layout.
+    """
+    rng     = _rng(seed)
+    profile = rng.choice(len(PROFILES), size=n, p=PROFILE_P)
 
-    else:  
-        attendance_pct = np.random.uniform(30, 65)
-        grade_avg      = np.random.uniform(20, 50)
-        incidents      = np.random.randint(3, 8)
+    def within(ranges):
+        lo, hi = ranges[profile, 0], ranges[profile, 1]
+        return lo + (hi - lo) * rng.random(n)
 
-    # Add some noise to make data realistic
-    attendance_pct = min(100, max(0, attendance_pct + np.random.normal(0, 3)))
-    grade_avg      = min(100, max(0, grade_avg      + np.random.normal(0, 4)))
+    # Noise makes the profiles overlap a little, like real data
+    attendance_pct = np.clip(within(ATTENDANCE) + rng.normal(0, 3, n), 0, 100)
+    grade_avg      = np.clip(within(GRADE) + rng.normal(0, 4, n), 0, 100)
+    incidents      = rng.integers(INCIDENTS[profile, 0], INCIDENTS[profile, 1])
 
-    data.append({
-        'attendance_pct': round(attendance_pct, 2),
-        'grade_avg':      round(grade_avg, 2),
+    return pd.DataFrame({
+        'attendance_pct': attendance_pct.round(2),
+        'grade_avg':      grade_avg.round(2),
         'incidents':      incidents,
-        'risk_label':     profile,
+        'risk_label':     PROFILES[profile],
     })
 
-df = pd.DataFrame(data)
 
-# Save to CSV
-os.makedirs('data', exist_ok=True)
-df.to_csv('data/students.csv', index=False)
+def school_days(days, end=None):
+    """Weekdays among the `days` calendar days ending at `end` (default today)."""
+    end   = np.datetime64(end or date.today(), 'D')
+    dates = np.arange(end - np.timedelta64(days - 1, 'D'), end + np.timedelta64(1, 'D'))
+    return dates[np.is_busday(dates)]
+
+
+def generate_histories(students, days=30, end=None, seed=42):
+    """
+    Raw rows for the students of generate_students():
+
+        attendance     student, date, status                  one per school day
+        grades         student, date, subject, exam_type, score   one per week (at least one)
+        interventions  student, scheduled, action_type, status    `incidents` rows
+
+    `student` is the position of the student in `students`; dates are numpy
+    datetime64[D]. Returns a dict of DataFrames.
+    """
+    rng = _rng(seed)
+    n   = len(students)
+    end = np.datetime64(end or date.today(), 'D')
+    attendance_pct = students['attendance_pct'].to_numpy() / 100
+    grade_avg      = students['grade_avg'].to_numpy()
+    incidents      = students['incidents'].to_numpy()
+
+    # ── Attendance: each day present with the student's own probability
+    dates   = school_days(days, end)
+    student = np.repeat(np.arange(n), len(dates))
+    u       = rng.random(len(student))
+    p       = attendance_pct[student]
+    status  = np.where(u < p, 'present', np.where(u < p + (1 - p) * LATE_SHARE, 'late', 'absent'))
+    attendance = pd.DataFrame({'student': student, 'date': np.tile(dates, n), 'status': status})
+
+    # ── Grades: scattered around the student's average
+    per_student = max(1, days // 7)
+    student = np.repeat(np.arange(n), per_student)
+    offsets = rng.integers(0, days, len(student))
+    grades  = pd.DataFrame({
+        'student':   student,
+        'date':      end - offsets.astype('timedelta64[D]'),
+        'subject':   SUBJECTS[rng.integers(0, len(SUBJECTS), len(student))],
+        'exam_type': EXAM_TYPES[rng.integers(0, len(EXAM_TYPES), len(student))],
+        'score':     np.clip(rng.normal(grade_avg[student], 8), 0, 100).round(1),
+    })
+
+    # ── Interventions: one row per incident
+    student = np.repeat(np.arange(n), incidents)
+    offsets = rng.integers(0, days, len(student))
+    interventions = pd.DataFrame({
+        'student':     student,
+        'scheduled':   end - offsets.astype('timedelta64[D]'),
+        'action_type': ACTION_TYPES[rng.integers(0, len(ACTION_TYPES), len(student))],
+        'status':      INTERVENTION_STATUS[rng.integers(0, len(INTERVENTION_STATUS), len(student))],
+    })
+
+    return {'attendance': attendance, 'grades': grades, 'interventions': interventions}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic student data')
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='data/students.csv', help='Aggregate training CSV')
+    parser.add_argument('--histories', metavar='DIR', help='Also write raw attendance/grades/interventions CSVs here')
+    parser.add_argument('--days', type=int, default=30, help='Length of the raw histories in calendar days')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    df = generate_students(args.students, args.seed)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    df.to_csv(args.out, index=False)
+    print(f"Generated {args.students} student records in {time.perf_counter() - started:.1f}s → {args.out}")
+
+    if args.histories:
+        started = time.perf_counter()
+        os.makedirs(args.histories, exist_ok=True)
+        for name, table in generate_histories(df, args.days, seed=args.seed).items():
+            path = os.path.join(args.histories, f"{name}.csv")
+            table.to_csv(path, index=False)
+            print(f"  {len(table):>10} {name} rows → {path}")
+        print(f"Histories written in {time.perf_counter() - started:.1f}s")
+
+    print(f"\nRisk distribution:")
+    print(df['risk_label'].value_counts())
+    print(f"\nSample data:")
+    print(df.head(10))
+
 
-print(f"Generated {NUM_STUDENTS} student records")
-print(f"\nRisk distribution:")
-print(df['risk_label'].value_counts())
-print(f"\nSample data:")
-print(df.head(10))
+if __name__ == '__main__':
+    main()
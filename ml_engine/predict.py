@@ -1,34 +1,222 @@
+import logging
 import pickle
 import numpy as np
 import os
+import threading
+import time
+from functools import lru_cache
 
-# Path to saved model
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'model', 'risk_model.pkl')
+from forest import compile_forest, export_source, load_forest, save_forest, source_digest
+from registry import LEGACY_VERSION, artifact_paths, pointer_signature, resolve
+
+logger = logging.getLogger(__name__)
+
+# Path to the unversioned model, served until the first `registry.py publish`
+MODEL_PATH, FOREST_PATH = artifact_paths(LEGACY_VERSION)
+
+# Column order the model was trained on
+FEATURES = ['attendance_pct', 'grade_avg', 'incidents']
+
+# Prediction cache: how many distinct feature vectors to remember (0 turns it off),
+# and an optional step that attendance_pct / grade_avg are rounded to first (0 = 2 decimals)
+CACHE_SIZE    = int(os.environ.get('RISK_CACHE_SIZE', 4096))
+CACHE_QUANTUM = float(os.environ.get('RISK_CACHE_QUANTUM', 0))
+# How often (seconds) the CURRENT pointer is stat-ed for a newly published model
+MODEL_CHECK_INTERVAL = float(os.environ.get('RISK_MODEL_CHECK_SECONDS', 2))
+
+# Load model once when Django starts (apps.risk ready hook), not on every request.
+# _active is (version, compiled forest, pickle path) and is only ever replaced as
+# a whole, so a reader always gets a matching version and forest.
+_active = None
+_model  = None      # (version, sklearn model) — loaded only when asked for
+
+_signature   = None
+_last_check  = 0.0
+_swap_lock   = threading.Lock()
+_loading     = False
+_cache_totals = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _load(version, model_path, forest_path):
+    # The first start after training exports the compiled forest from the pickle, and
+    # so does one after the pickle was replaced: an export is served only if it records
+    # the digest of the pickle next to it
+    source = source_digest(model_path)
+    if export_source(forest_path) != source:
+        if os.path.exists(forest_path):
+            logger.info("Compiled forest of version %s does not match its pickle, exporting it again", version)
+        with open(model_path, 'rb') as f:
+            save_forest(compile_forest(pickle.load(f)), forest_path,
+                        overwrite=os.path.exists(forest_path), source=source)
+    return version, load_forest(forest_path), model_path
+
+
+def get_active_model():
+    """(version, compiled forest) serving right now — memory-mapped, shared by all workers."""
+    global _active, _signature
+    _check_for_new_version()
+    if _active is None:
+        # First use in this process: nothing to serve yet, so load in the foreground
+        with _swap_lock:
+            if _active is None:
+                _active = _load(*resolve())
+                # Taken after loading — the first load may create the legacy forest export itself
+                _signature = pointer_signature()
+    version, forest, _ = _active
+    return version, forest
+
+
+def get_forest():
+    return get_active_model()[1]
 
-# Load model once when Django starts (not on every request)
-_model = None
 
 def get_model():
+    # The sklearn model behind the active version (training / benchmarks only)
     global _model
-    if _model is None:
-        with open(MODEL_PATH, 'rb') as f:
-            _model = pickle.load(f)
-    return _model
+    version, _ = get_active_model()
+    if _model is None or _model[0] != version:
+        with open(_active[2], 'rb') as f:
+            _model = (version, pickle.load(f))
+    return _model[1]
 
 
-def predict_risk(attendance_pct, grade_avg, incidents):
-    # Predict risk through ML model,
+def current_model_version():
+    return get_active_model()[0]
+
+
+def _check_for_new_version():
+    # Throttled stat() of the CURRENT pointer; a change starts a background load
+    # and requests keep using the old model until the new one is ready.
+    global _last_check, _signature, _loading
+    now = time.monotonic()
+    if _active is None or now - _last_check < MODEL_CHECK_INTERVAL:
+        return
+    _last_check = now
+
+    signature = pointer_signature()
+    if signature == _signature:
+        return
+    with _swap_lock:
+        if _loading:
+            return
+        # Recorded now, so a version that fails to load is not retried until the pointer moves again
+        _signature, _loading = signature, True
+    threading.Thread(target=_swap_in_background, name='risk-model-loader', daemon=True).start()
+
+
+def _swap_in_background():
+    global _active, _loading, _signature
     try:
-        model    = get_model()
-        features = np.array([[attendance_pct, grade_avg, incidents]])
+        loaded  = _load(*resolve())
+        _active = loaded                      # one assignment — the swap is atomic
+        # Again after loading — a legacy export written by _load changes the signature
+        _signature = pointer_signature()
+        clear_prediction_cache()
+        _cache_totals['invalidations'] += 1
+        logger.info("Risk model version %s loaded", loaded[0])
+    except Exception as e:
+        logger.error("Could not load the new risk model: %s — still serving %s", e, _active[0])
+    finally:
+        _loading = False
+
+
+def _as_matrix(features):
+    # DataFrame → pick the training columns in order; anything else → N×3 float array
+    if hasattr(features, 'columns'):
+        features = features[FEATURES].to_numpy()
+    return np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+
 
-        category = model.predict(features)[0]         
-        proba    = model.predict_proba(features)[0]
-        score    = round(float(max(proba)) * 100, 2)
+def _predict(forest, matrix):
+    proba = forest.predict_proba(matrix)
+    best  = proba.argmax(axis=1)
 
+    categories = forest.classes_[best]
+    scores     = np.round(proba[np.arange(len(best)), best] * 100, 2)
+    return categories, scores
+
+
+def predict_risk_batch_with_version(features):
+    """predict_risk_batch, plus the model version that produced the predictions."""
+    version, forest = get_active_model()
+    matrix = _as_matrix(features).copy()
+    # Rounded like predict_risk's, so a student gets the same score from either path
+    matrix[:, :2] = _quantize_columns(matrix[:, :2])
+    categories, scores = _predict(forest, matrix)
+    return categories, scores, version
+
+
+def predict_risk_batch(features):
+    """
+    Predict risk for many students at once.
+    `features` is an N×3 array (or a DataFrame with the FEATURES columns).
+    Returns (categories, scores) as arrays of length N.
+
+    A single predict_proba pass gives both outputs: the category is the most
+    probable class (exactly what model.predict returns) and the score is its
+    probability as a percentage. Attendance and grade are rounded first, the
+    same way predict_risk rounds them (RISK_CACHE_QUANTUM, else 2 decimals).
+    The pass runs on the compiled forest, which returns the same
+    probabilities as sklearn without its per-call overhead.
+    """
+    categories, scores, _ = predict_risk_batch_with_version(features)
+    return categories, scores
+
+
+def _quantize(value):
+    # The same float operations as _quantize_columns (np.round(x, 2) is rint(x * 100) / 100),
+    # so predict_risk and predict_risk_batch infer on identical values
+    value = float(value)
+    if CACHE_QUANTUM > 0:
+        value = round(value / CACHE_QUANTUM) * CACHE_QUANTUM
+    return round(value * 100) / 100
+
+
+def _quantize_columns(values):
+    if CACHE_QUANTUM > 0:
+        values = np.round(values / CACHE_QUANTUM) * CACHE_QUANTUM
+    return np.round(values, 2)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_prediction(forest, attendance_pct, grade_avg, incidents):
+    # Keyed on the forest object too, so an entry can never outlive its model version.
+    # Errors are raised, never cached.
+    categories, scores = _predict(forest, _as_matrix([[attendance_pct, grade_avg, incidents]]))
+    return str(categories[0]), float(scores[0])
+
+
+def clear_prediction_cache():
+    info = _cached_prediction.cache_info()
+    _cache_totals['hits']   += info.hits
+    _cache_totals['misses'] += info.misses
+    _cached_prediction.cache_clear()
+
+
+def prediction_cache_info():
+    # Counters are totals since the process started, across invalidations
+    info = _cached_prediction.cache_info()
+    return {
+        'hits':          _cache_totals['hits'] + info.hits,
+        'misses':        _cache_totals['misses'] + info.misses,
+        'size':          info.currsize,
+        'maxsize':       info.maxsize,
+        'invalidations': _cache_totals['invalidations'],
+    }
+
+
+def predict_risk_with_version(attendance_pct, grade_avg, incidents):
+    """(category, score, model version); a feature vector seen before skips inference. Raises on failure."""
+    version, forest = get_active_model()
+    category, score = _cached_prediction(forest, _quantize(attendance_pct), _quantize(grade_avg), int(incidents))
+    return category, score, version
+
+
+def predict_risk(attendance_pct, grade_avg, incidents):
+    # Predict risk through ML model,
+    try:
+        category, score, _ = predict_risk_with_version(attendance_pct, grade_avg, incidents)
         return category, score
     except Exception as e:
-        print(f"Error in prediction: {e}")
+        logger.warning("Error in prediction: %s", e)
         return "error", 0.0
-
-    
@@ -0,0 +1,155 @@
+"""
+Versioned model artifacts and the pointer to the one being served.
+
+    model/
+      versions/
+        20260301-120000/
+          risk_model.pkl
+          risk_model.forest/     compiled, memory-mappable (see forest.py)
+        20260415-090000/
+          ...
+      CURRENT                    name of the version workers serve
+
+publish() writes a complete version directory first and only then replaces
+CURRENT with a single os.replace, so a worker sees either the old pointer or
+the new one, never half a model. Running workers notice the new pointer with
+a stat() call and swap the model in without a restart (see predict.py).
+Until the first publish, model/risk_model.pkl is served as version 'legacy'.
+
+Run from ml_engine/:
+    python registry.py list                       # versions, * marks the current one
+    python registry.py use 20260301-120000        # roll forward or back
+    python registry.py publish --from model/risk_model.pkl [--version name]
+"""
+
+import argparse
+import os
+import pickle
+import re
+import shutil
+import time
+
+from forest import compile_forest, save_forest, source_digest
+
+MODEL_DIR      = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model')
+VERSIONS_DIR   = os.path.join(MODEL_DIR, 'versions')
+CURRENT_PATH   = os.path.join(MODEL_DIR, 'CURRENT')
+LEGACY_VERSION = 'legacy'
+
+MODEL_FILE  = 'risk_model.pkl'
+FOREST_FILE = 'risk_model.forest'
+
+VERSION_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,39}$')
+
+
+def artifact_paths(version):
+    """(pickle path, compiled forest path) of a version."""
+    folder = MODEL_DIR if version == LEGACY_VERSION else os.path.join(VERSIONS_DIR, version)
+    return os.path.join(folder, MODEL_FILE), os.path.join(folder, FOREST_FILE)
+
+
+def current_version():
+    try:
+        with open(CURRENT_PATH) as f:
+            return f.read().strip() or LEGACY_VERSION
+    except FileNotFoundError:
+        return LEGACY_VERSION
+
+
+def resolve():
+    """(version, pickle path, compiled forest path) that should be served right now."""
+    version = current_version()
+    return (version, *artifact_paths(version))
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def pointer_signature():
+    """
+    Cheap fingerprint of what should be served: it changes whenever CURRENT
+    is replaced — or, before the first publish, when the legacy files are.
+    """
+    current = _stat(CURRENT_PATH)
+    if current is not None:
+        return current
+    model_path, forest_path = artifact_paths(LEGACY_VERSION)
+    return _stat(model_path), _stat(os.path.join(forest_path, 'meta.json'))
+
+
+def list_versions():
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(VERSIONS_DIR)
+        if VERSION_RE.match(name) and os.path.isfile(os.path.join(VERSIONS_DIR, name, MODEL_FILE))
+    )
+
+
+def set_current(version):
+    """Point every worker at `version` — one atomic rename."""
+    if version != LEGACY_VERSION and version not in list_versions():
+        raise ValueError(f"Unknown model version: {version}")
+    tmp = f"{CURRENT_PATH}.tmp-{os.getpid()}"
+    with open(tmp, 'w') as f:
+        f.write(version + '\n')
+    os.replace(tmp, CURRENT_PATH)
+
+
+def publish(model, version=None, make_current=True):
+    """
+    Store a fitted model (pickle + compiled forest) as a new version and,
+    by default, make it the current one. Returns the version name.
+    """
+    version = version or time.strftime('%Y%m%d-%H%M%S')
+    if not VERSION_RE.match(version) or version == LEGACY_VERSION:
+        raise ValueError(f"Invalid version name: {version!r}")
+    final = os.path.join(VERSIONS_DIR, version)
+    if os.path.exists(final):
+        raise ValueError(f"Model version {version} already exists")
+
+    # Build the whole version aside, then move it into place in one rename
+    tmp = f"{final}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    with open(os.path.join(tmp, MODEL_FILE), 'wb') as f:
+        pickle.dump(model, f)
+    save_forest(compile_forest(model), os.path.join(tmp, FOREST_FILE),
+                source=source_digest(os.path.join(tmp, MODEL_FILE)))
+    os.rename(tmp, final)
+
+    if make_current:
+        set_current(version)
+    return version
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage versioned risk models')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='Show stored versions')
+    use = commands.add_parser('use', help='Make a stored version the current one')
+    use.add_argument('version')
+    pub = commands.add_parser('publish', help='Store a pickled model as a new version')
+    pub.add_argument('--from', dest='source', default=artifact_paths(LEGACY_VERSION)[0])
+    pub.add_argument('--version')
+    pub.add_argument('--no-switch', action='store_true', help='Store it without making it current')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        current = current_version()
+        for name in list_versions() + [LEGACY_VERSION]:
+            print(f"{'*' if name == current else ' '} {name}")
+    elif args.command == 'use':
+        set_current(args.version)
+        print(f"Current model version: {args.version}")
+    else:
+        with open(args.source, 'rb') as f:
+            model = pickle.load(f)
+        version = publish(model, args.version, make_current=not args.no_switch)
+        print(f"Published {args.source} as version {version}"
+              + ('' if args.no_switch else ' (now current)'))
@@ -1,63 +1,254 @@
-import pandas as pd
-import numpy as np
-import pickle
+"""
+Train, compare and publish the risk model.
+
+Runs a cross-validated grid search over one model family in parallel on all
+cores, then measures every candidate the way it will be served (compiled
+forest): single-row p50/p99 latency and batch throughput. The most accurate
+candidate whose single-row p99 fits the latency budget is published as a new
+model version (see registry.py).
+
+Run from ml_engine/:
+    python train_model.py                                   # default grid, publish the winner
+    python train_model.py --rows 100000 --family extra_trees
+    python train_model.py --param n_estimators=50,100 --param max_depth=8,none
+    python train_model.py --latency-budget-ms 0.5 --no-publish
+"""
+
+import argparse
+import itertools
 import os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score
-from sklearn.preprocessing import LabelEncoder
-
-# ── Load data ─────────────────────────────────────────────
-print("Loading training data...")
-df = pd.read_csv('data/students.csv')
-
-# ── Features and labels ───────────────────────────────────
-X = df[['attendance_pct', 'grade_avg', 'incidents']].values
-y = df['risk_label'].values   
-
-# ── Split into train/test ─────────────────────────────────
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"Training samples : {len(X_train)}")
-print(f"Testing  samples : {len(X_test)}")
-
-# ── Train RandomForest ────────────────────────────────────
-print("\n Training Random Forest model...")
-model = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=10,
-    random_state=42,
-    class_weight='balanced',   
-)
-model.fit(X_train, y_train)
-
-# ── Evaluate ──────────────────────────────────────────────
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-
-print(f"\n Model Accuracy: {accuracy * 100:.1f}%")
-print("\n Detailed Report:")
-print(classification_report(y_test, y_pred))
-
-# ── Save model ────────────────────────────────────────────
-os.makedirs('model', exist_ok=True)
-model_path = 'model/risk_model.pkl'
-with open(model_path, 'wb') as f:
-    pickle.dump(model, f)
-
-print(f" Model saved to: {model_path}")
-
-# ── Quick test ────────────────────────────────────────────
-print("\nQuick test predictions:")
-test_cases = [
-    [95, 80, 0],   # should be LOW
-    [65, 50, 2],   # should be MEDIUM
-    [45, 35, 5],   # should be HIGH
-]
-for case in test_cases:
-    pred  = model.predict([case])[0]
-    proba = model.predict_proba([case])[0]
-    score = round(max(proba) * 100, 1)
-    print(f"  Attendance:{case[0]}% | Grade:{case[1]} | Incidents:{case[2]} → {pred.upper()} (confidence: {score}%)")
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+
+from forest import compile_forest
+from registry import publish
+
+FEATURES = ['attendance_pct', 'grade_avg', 'incidents']
+LABEL    = 'risk_label'
+
+# Only forests of decision trees — that is what the compiled evaluator serves
+FAMILIES = {
+    'random_forest': RandomForestClassifier,
+    'extra_trees':   ExtraTreesClassifier,
+}
+FIXED_PARAMS = {'class_weight': 'balanced', 'random_state': 42, 'n_jobs': 1}
+
+DEFAULT_GRID = {
+    'n_estimators':     [50, 100, 200],
+    'max_depth':        [6, 10, None],
+    'min_samples_leaf': [1, 5],
+}
+
+SINGLE_ROW_CALLS = 300
+BATCH_ROWS       = 10_000
+
+
+# ── Arguments ─────────────────────────────────────────────
+def _parse_value(text):
+    if text.lower() == 'none':
+        return None
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(params):
+    """['n_estimators=50,100', 'max_depth=8,none'] → {'n_estimators': [50, 100], 'max_depth': [8, None]}"""
+    if not params:
+        return dict(DEFAULT_GRID)
+    grid = {}
+    for param in params:
+        name, sep, values = param.partition('=')
+        if not sep or not values:
+            raise SystemExit(f"--param expects name=v1,v2,... — got {param!r}")
+        name = name.strip()
+        if name in FIXED_PARAMS:
+            raise SystemExit(f"--param {name} cannot be searched: every candidate uses "
+                             f"{name}={FIXED_PARAMS[name]!r} (FIXED_PARAMS)")
+        grid[name] = [_parse_value(v.strip()) for v in values.split(',')]
+    return grid
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train, compare and publish the risk model')
+    parser.add_argument('--data', default='data/students.csv', help='Training CSV (default: data/students.csv)')
+    parser.add_argument('--rows', type=int, help='Use a random sample of this many rows (default: all)')
+    parser.add_argument('--family', choices=sorted(FAMILIES), default='random_forest')
+    parser.add_argument('--param', action='append', metavar='NAME=V1,V2',
+                        help='Grid values for one hyperparameter; repeat for more (default grid if omitted)')
+    parser.add_argument('--cv', type=int, default=5, help='Cross-validation folds')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Parallel jobs for search and fitting (-1 = all cores)')
+    parser.add_argument('--latency-budget-ms', type=float, default=1.0,
+                        help='Largest single-row p99 latency a published model may have')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--version', help='Version name to publish under (default: timestamp)')
+    parser.add_argument('--no-publish', action='store_true', help='Report only, do not publish')
+    return parser.parse_args(argv)
+
+
+# ── Data ──────────────────────────────────────────────────
+def load_data(path, rows=None):
+    df = pd.read_csv(path)
+    if rows is not None:
+        if rows > len(df):
+            print(f"  {path} has only {len(df)} rows — using all of them")
+        else:
+            df = df.sample(n=rows, random_state=42)
+    return df[FEATURES].to_numpy(dtype=float), df[LABEL].to_numpy()
+
+
+# ── Latency of the served (compiled) model ────────────────
+def measure_latency(forest, X):
+    rows = X[np.random.default_rng(0).integers(0, len(X), SINGLE_ROW_CALLS)]
+    forest.predict_proba(rows[:1])   # warm-up
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        forest.predict_proba(row[None, :])
+        times.append(time.perf_counter() - start)
+
+    batch = X[np.random.default_rng(1).integers(0, len(X), BATCH_ROWS)]
+    start = time.perf_counter()
+    forest.predict_proba(batch)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'p50_ms':     float(np.percentile(times, 50) * 1e3),
+        'p99_ms':     float(np.percentile(times, 99) * 1e3),
+        'batch_rows_s': BATCH_ROWS / elapsed,
+    }
+
+
+# ── Pipeline ──────────────────────────────────────────────
+def search(family, grid, X_train, y_train, cv, n_jobs):
+    """Cross-validated accuracy of every grid point, all folds in parallel."""
+    grid_search = GridSearchCV(
+        FAMILIES[family](**FIXED_PARAMS), grid,
+        scoring='accuracy', cv=StratifiedKFold(cv, shuffle=True, random_state=42),
+        n_jobs=n_jobs, refit=False,
+    )
+    grid_search.fit(X_train, y_train)
+    results = grid_search.cv_results_
+    return [
+        {'params': params, 'cv_accuracy': mean, 'cv_std': std}
+        for params, mean, std in zip(results['params'], results['mean_test_score'], results['std_test_score'])
+    ]
+
+
+def _fit(family, params, X, y):
+    return FAMILIES[family](**FIXED_PARAMS, **params).fit(X, y)
+
+
+def evaluate(family, candidates, X_train, y_train, X_test, y_test, n_jobs):
+    """Fit every candidate on the training split (in parallel), then time each one alone."""
+    models = Parallel(n_jobs=n_jobs)(
+        delayed(_fit)(family, c['params'], X_train, y_train) for c in candidates
+    )
+    for candidate, model in zip(candidates, models):
+        forest = compile_forest(model)
+        candidate['model']         = model
+        candidate['test_accuracy'] = accuracy_score(y_test, model.predict(X_test))
+        candidate.update(measure_latency(forest, X_test))
+    return candidates
+
+
+def choose(candidates, budget_ms):
+    """Most accurate candidate within the latency budget; ties go to the faster one."""
+    fitting = [c for c in candidates if c['p99_ms'] <= budget_ms]
+    if not fitting:
+        return None
+    return max(fitting, key=lambda c: (round(c['cv_accuracy'], 4), -c['p99_ms']))
+
+
+def _describe(params):
+    return ' '.join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def report(candidates, chosen, budget_ms):
+    print(f"\n{'':2}{'parameters':<48} {'cv acc':>7} {'± std':>6} {'test':>6} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'batch rows/s':>13}")
+    print("  " + "-" * 100)
+    for c in sorted(candidates, key=lambda c: -c['cv_accuracy']):
+        mark = '*' if c is chosen else ('x' if c['p99_ms'] > budget_ms else ' ')
+        print(f"{mark:2}{_describe(c['params']):<48} {c['cv_accuracy'] * 100:>6.1f}% {c['cv_std'] * 100:>5.1f} "
+              f"{c['test_accuracy'] * 100:>5.1f}% {c['p50_ms']:>7.3f} {c['p99_ms']:>7.3f} {c['batch_rows_s']:>13,.0f}")
+    print(f"\n  * chosen   x over the {budget_ms} ms single-row p99 budget")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid = parse_grid(args.param)
+
+    # ── Load data ─────────────────────────────────────────
+    print("Loading training data...")
+    X, y = load_data(args.data, args.rows)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=42, stratify=y
+    )
+    print(f"Training samples : {len(X_train)}")
+    print(f"Testing  samples : {len(X_test)}")
+
+    # ── Search ────────────────────────────────────────────
+    n_candidates = len(list(itertools.product(*grid.values())))
+    print(f"\n Searching {n_candidates} {args.family} candidates × {args.cv} folds "
+          f"(n_jobs={args.n_jobs}, {os.cpu_count()} cores)...")
+    started    = time.perf_counter()
+    candidates = search(args.family, grid, X_train, y_train, args.cv, args.n_jobs)
+    print(f" Search took {time.perf_counter() - started:.1f}s")
+
+    # ── Evaluate ──────────────────────────────────────────
+    print("\n Fitting candidates and measuring serving latency...")
+    candidates = evaluate(args.family, candidates, X_train, y_train, X_test, y_test, args.n_jobs)
+    chosen = choose(candidates, args.latency_budget_ms)
+    report(candidates, chosen, args.latency_budget_ms)
+
+    if chosen is None:
+        fastest = min(candidates, key=lambda c: c['p99_ms'])
+        raise SystemExit(f"\nNo candidate fits the {args.latency_budget_ms} ms budget "
+                         f"(fastest: {_describe(fastest['params'])} at {fastest['p99_ms']:.3f} ms)")
+
+    model = chosen['model']
+    print(f"\n Chosen: {args.family} {_describe(chosen['params'])}")
+    print("\n Detailed Report:")
+    print(classification_report(y_test, model.predict(X_test)))
+
+    # ── Check compiled forest ─────────────────────────────
+    # predict.py serves flat node arrays; they must give exactly sklearn's probabilities
+    # (checked with a real error, not assert, so `python -O` cannot skip it)
+    forest = compile_forest(model)
+    if not (forest.predict_proba(X_train) == model.predict_proba(X_train)).all():
+        raise SystemExit("Compiled forest differs from sklearn on the training rows — not publishing")
+
+    # ── Publish model ─────────────────────────────────────
+    # New version directory + atomic CURRENT switch; running workers pick it up without a restart
+    if args.no_publish:
+        print(" Not published (--no-publish)")
+    else:
+        version = publish(model, args.version)
+        print(f" Model published as version {version} (model/versions/{version}/)")
+
+    # ── Quick test ────────────────────────────────────────
+    print("\nQuick test predictions:")
+    test_cases = [
+        [95, 80, 0],   # should be LOW
+        [65, 50, 2],   # should be MEDIUM
+        [45, 35, 5],   # should be HIGH
+    ]
+    for case in test_cases:
+        proba = forest.predict_proba(np.array([case], dtype=float))[0]
+        pred  = forest.classes_[proba.argmax()]
+        score = round(max(proba) * 100, 1)
+        print(f"  Attendance:{case[0]}% | Grade:{case[1]} | Incidents:{case[2]} → {pred.upper()} (confidence: {score}%)")
+
+
+if __name__ == '__main__':
+    main()